@@ -0,0 +1,145 @@
+""" Builder scaling benchmark.
+
+Generates tree scenarios (:func:`benchmarks.scenarios.tree`) of increasing node count, and times each startup phase
+separately:
+
+* ``load``: ``ConfigBuilder(path)``, yaml parsing of the root and every ``nodesetPath`` file, and their assembly
+* ``config``: ``ConfigBuilder.build``
+* ``components``: ``ScenarioBuilder.build_components``, node construction, registration and handler consolidation
+* ``edges``: ``ScenarioBuilder.build_edges``
+
+``clone_ms``, reported next to the phases and left out of ``total_ms``, is the time :meth:`.NodeSet.clone` takes to
+build a copy of the scenario built, the alternative to a full build in parameter sweeps.
+
+Every repetition starts from cold caches (yaml cache and class path cache), the median is reported. Next to the
+timings, ``slope_<phase>`` is the log-log slope between a size and the previous one: 1 is linear, 2 quadratic. Slopes
+above ``--superlinear`` are marked in the table, which is where a builder phase stops scaling.
+
+usage::
+
+    python -m benchmarks.bench_builder --sizes 10 100 1000 10000 100000 --json builder.json
+    python -m benchmarks.bench_builder --depth 5 --density 2 --compare builder.json
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict , Any , List
+
+from src.quantcerebro import ConfigBuilder , ScenarioBuilder
+from src.quantcerebro.utils import yaml_cache , clear_class_cache
+
+from benchmarks import scenarios
+from benchmarks.common import write_results , load_results , compare , print_table , print_comparison
+
+PHASES = ("load" , "config" , "components" , "edges")
+
+
+def time_phases(path: str) -> Dict[ str , float ]:
+    """milliseconds spent in each phase of one cold build"""
+    yaml_cache.invalidate()
+    clear_class_cache()
+    gc.collect()
+
+    clock = time.perf_counter
+    timings = dict()
+    start = clock()
+    config_builder = ConfigBuilder(path)
+    timings[ "load" ] = (clock() - start) * 1e3
+
+    start = clock()
+    nodeset_config = config_builder.build()
+    timings[ "config" ] = (clock() - start) * 1e3
+
+    scenario_builder = ScenarioBuilder(nodeset_config)
+    start = clock()
+    scenario_builder.build_components()
+    timings[ "components" ] = (clock() - start) * 1e3
+
+    start = clock()
+    scenario = scenario_builder.build_edges()
+    timings[ "edges" ] = (clock() - start) * 1e3
+
+    start = clock()
+    scenario.clone()
+    timings[ "clone" ] = (clock() - start) * 1e3
+    return timings
+
+
+def slope(small: Dict[ str , Any ] , large: Dict[ str , Any ] , key: str) -> float:
+    if small[ key ] <= 0 or large[ key ] <= 0:
+        return float("nan")
+    return math.log(large[ key ] / small[ key ]) / math.log(large[ "nodes" ] / small[ "nodes" ])
+
+
+def run(directory: str , sizes: List[ int ] , repeat: int , **shape) -> List[ Dict[ str , Any ] ]:
+    rows = [ ]
+    for size in sizes:
+        generated = scenarios.tree(directory , size , **shape)
+        runs = [ time_phases(generated.path) for _ in range(repeat) ]
+
+        row = {"case": generated.case , "nodes": size , "edges": generated.edges}
+        for phase in PHASES:
+            row[ f"{phase}_ms" ] = statistics.median(r[ phase ] for r in runs)
+        row[ "total_ms" ] = sum(row[ f"{phase}_ms" ] for phase in PHASES)
+        row[ "clone_ms" ] = statistics.median(r[ "clone" ] for r in runs)
+        row[ "us_per_node" ] = row[ "total_ms" ] / size * 1e3
+
+        if rows:
+            for phase in PHASES + ("total" ,):
+                row[ f"slope_{phase}" ] = round(slope(rows[ -1 ] , row , f"{phase}_ms") , 2)
+        rows.append(row)
+    return rows
+
+
+def mark_superlinear(rows: List[ Dict[ str , Any ] ] , threshold: float) -> List[ Dict[ str , Any ] ]:
+    marked = [ ]
+    for row in rows:
+        row = dict(row)
+        for key , value in row.items():
+            if key.startswith("slope_") and isinstance(value , float) and value > threshold:
+                row[ key ] = f"{value}*"
+        marked.append(row)
+    return marked
+
+
+def main(argv: List[ str ] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes" , type=int , nargs="+" , default=[ 10 , 100 , 1_000 , 10_000 , 100_000 ])
+    parser.add_argument("--depth" , type=int , default=3 , help="nodeset levels, default 3")
+    parser.add_argument("--branching" , type=int , default=4 , help="child nodesets per nodeset, default 4")
+    parser.add_argument("--density" , type=float , default=1.0 , help="average out edges per node, default 1")
+    parser.add_argument("--classes" , type=int , default=64 , help="distinct node classes, default 64")
+    parser.add_argument("--repeat" , type=int , default=3)
+    parser.add_argument("--superlinear" , type=float , default=1.2 , help="slope marked with *, default 1.2")
+    parser.add_argument("--json" , help="write results to this file")
+    parser.add_argument("--compare" , help="baseline result file to compare against")
+    parser.add_argument("--tolerance" , type=float , default=0.1)
+    args = parser.parse_args(argv)
+
+    shape = dict(depth=args.depth , branching=args.branching , density=args.density , classes=args.classes)
+    with tempfile.TemporaryDirectory(prefix="quantcerebro-bench-") as directory:
+        rows = run(directory , args.sizes , args.repeat , **shape)
+
+    print_table(mark_superlinear(rows , args.superlinear) ,
+                [ "nodes" , "edges" ] + [ f"{p}_ms" for p in PHASES ] + [ "total_ms" , "clone_ms" , "us_per_node" ] +
+                [ f"slope_{p}" for p in PHASES + ("total" ,) ])
+    if args.json:
+        write_results(args.json , "builder" , rows , sizes=args.sizes , repeat=args.repeat , **shape)
+
+    if args.compare:
+        changes = [ c for c in compare(load_results(args.compare) , {"results": rows} , args.tolerance)
+                    if c[ "metric" ].endswith("_ms") ]
+        print()
+        print_comparison(changes)
+        return 1 if any(c[ "regression" ] for c in changes) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
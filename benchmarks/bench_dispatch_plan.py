@@ -0,0 +1,91 @@
+""" Per-emit overhead of the name based dispatch path against a compiled :class:`.DispatchPlan`.
+
+A producer fans out to ``--fanout`` sinks. Every variant delivers the same tick to the same handlers:
+
+* ``nodeset.notify_handlers``: lookup through the root nodeset, the path used by scenario code
+* ``node.notify_handlers``: the producer node's own method
+* ``event.emit``: eventkit event, already looked up
+* ``plan.producer``: compiled direct handle
+
+usage::
+
+    python -m benchmarks.bench_dispatch_plan --fanout 1 4 16 --emits 200000 --json plan.json
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable , Dict , List
+
+from src.quantcerebro import NodeSet , NodeSetConfig , ScenarioBuilder , EdgeConfig
+
+from benchmarks.common import write_results , print_table
+from benchmarks.nodes import BenchConfig , Tick
+
+PRODUCER = "producer"
+EVENT = "Relay0.Tick"
+
+
+def build(fanout: int) -> NodeSet:
+    nodeset_config = NodeSetConfig("bench" , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet")
+    nodeset_config.add_child_config(BenchConfig(PRODUCER , "benchmarks.nodes.BenchConfig" , "benchmarks.nodes.Relay0" ,
+                                                PRODUCER))
+    for i in range(fanout):
+        name = f"sink{i}"
+        nodeset_config.add_child_config(BenchConfig(name , "benchmarks.nodes.BenchConfig" , "benchmarks.nodes.Sink" ,
+                                                    name))
+        nodeset_config.add_edge_config(EdgeConfig(PRODUCER , name , "benchmarks.nodes.Tick" , "event"))
+
+    return ScenarioBuilder(nodeset_config).build()
+
+
+def time_per_emit(emit: Callable , emits: int) -> float:
+    """nanoseconds per call, best of three runs"""
+    tick = Tick(0 , 1.0)
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        for _ in range(emits):
+            emit(tick)
+        best = min(best , (time.perf_counter_ns() - start) / emits)
+    return best
+
+
+def run(fanouts: List[ int ] , emits: int) -> List[ Dict ]:
+    rows = [ ]
+    for fanout in fanouts:
+        scenario = build(fanout)
+        producer = scenario.get_child_node(PRODUCER)
+        plan = scenario.compile_dispatch_plan()
+        variants = {
+            "nodeset.notify_handlers": lambda tick: scenario.notify_handlers(PRODUCER , EVENT , tick) ,
+            "node.notify_handlers": lambda tick: producer.notify_handlers(PRODUCER , EVENT , tick) ,
+            "event.emit": producer.event_emitter.get_event(EVENT).emit ,
+            "plan.producer": plan.producer(EVENT) ,
+        }
+        for variant , emit in variants.items():
+            ns = time_per_emit(emit , emits)
+            rows.append({"case": f"{variant}-{fanout}" , "fanout": fanout , "variant": variant , "ns_per_emit": round(ns , 1) ,
+                         "ns_per_delivery": round(ns / fanout , 1)})
+
+        expected = 3 * emits * len(variants)
+        counts = {scenario.get_child_node(f"sink{i}").model.count for i in range(fanout)}
+        assert counts == {expected} , f"every variant should reach every sink: {counts} != {expected}"
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fanout" , type=int , nargs="+" , default=[ 1 , 4 , 16 ])
+    parser.add_argument("--emits" , type=int , default=100_000)
+    parser.add_argument("--json" , help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.fanout , args.emits)
+    print_table(rows , [ "fanout" , "variant" , "ns_per_emit" , "ns_per_delivery" ])
+    if args.json:
+        write_results(args.json , "dispatch_plan" , rows , fanout=args.fanout , emits=args.emits)
+
+
+if __name__ == "__main__":
+    main()
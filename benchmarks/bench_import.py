@@ -0,0 +1,93 @@
+""" Package import time benchmark.
+
+Short-lived tools and worker processes import quantcerebro on every start. Each case runs its import statement in a
+fresh interpreter, with ``src`` on ``sys.path`` so that the package imports as ``quantcerebro``, as installed:
+
+* ``package``: ``import quantcerebro``, public names resolve on first access
+* ``node``: ``from quantcerebro import Node , NodeConfig``, what a module defining nodes needs
+* ``build``: ``from quantcerebro import build_scenario``
+* ``all``: ``from quantcerebro import *``
+
+``import_ms`` is the median time spent in the statement, ``modules`` the number of modules it loaded, and
+``duplicates`` the number of quantcerebro modules loaded a second time under another name (``src.quantcerebro...``),
+which should be 0.
+
+usage::
+
+    python -m benchmarks.bench_import --json import.json
+    python -m benchmarks.bench_import --compare import.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict , Any , List
+
+from benchmarks.common import write_results , load_results , compare , print_table , print_comparison
+
+CASES = {
+    "package": "import quantcerebro" ,
+    "node": "from quantcerebro import Node , NodeConfig" ,
+    "build": "from quantcerebro import build_scenario" ,
+    "all": "from quantcerebro import *" ,
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# run by a fresh interpreter, prints the import time and the modules loaded
+PROBE = """
+import json , sys , time
+sys.path.insert(0 , {src!r})
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{"import_ms": elapsed * 1e3 , "modules": len(loaded) ,
+                  "duplicates": sum(1 for m in loaded if m.startswith("src.quantcerebro"))}}))
+"""
+
+
+def time_import(statement: str) -> Dict[ str , Any ]:
+    probe = PROBE.format(src=os.path.join(ROOT , "src") , statement=statement)
+    output = subprocess.run([ sys.executable , "-c" , probe ] , capture_output=True , text=True , check=True ,
+                            cwd=ROOT).stdout
+    return json.loads(output)
+
+
+def run(repeat: int) -> List[ Dict[ str , Any ] ]:
+    rows = [ ]
+    for case , statement in CASES.items():
+        runs = [ time_import(statement) for _ in range(repeat) ]
+        rows.append({"case": case , "import_ms": statistics.median(r[ "import_ms" ] for r in runs) ,
+                     "modules": runs[ -1 ][ "modules" ] , "duplicates": runs[ -1 ][ "duplicates" ]})
+    return rows
+
+
+def main(argv: List[ str ] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat" , type=int , default=7)
+    parser.add_argument("--json" , help="write results to this file")
+    parser.add_argument("--compare" , help="baseline result file to compare against")
+    parser.add_argument("--tolerance" , type=float , default=0.1)
+    args = parser.parse_args(argv)
+
+    rows = run(args.repeat)
+    print_table(rows , [ "case" , "import_ms" , "modules" , "duplicates" ])
+    if args.json:
+        write_results(args.json , "import" , rows , repeat=args.repeat)
+
+    if args.compare:
+        changes = compare(load_results(args.compare) , {"results": rows} , args.tolerance)
+        print()
+        print_comparison(changes)
+        return 1 if any(c[ "regression" ] for c in changes) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
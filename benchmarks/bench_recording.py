@@ -0,0 +1,90 @@
+""" Event recording and replay benchmark.
+
+On generated fan-out scenarios (:func:`benchmarks.scenarios.fanout`), for each size:
+
+* ``live``: emits per second of the source event, not recorded
+* ``recorded``: the same with a :class:`.Recorder` writing the log, every delivery of the fan-out is recorded too
+* ``replay``: :func:`.replay` of that log into a fresh scenario, as fast as possible: source events re-injected per
+  second, the fan-out deriving the rest
+
+``bytes_per_event`` is the log size per recorded event. Tick payloads have a fixed layout, they are stored as raw
+struct bytes.
+
+usage::
+
+    python -m benchmarks.bench_recording --json recording.json
+    python -m benchmarks.bench_recording --compare recording.json
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Dict , Any , List
+
+from src.quantcerebro import build_scenario
+from src.quantcerebro.recording import Recorder , replay
+
+from benchmarks import scenarios
+from benchmarks.common import write_results , load_results , compare , print_table , print_comparison
+from benchmarks.nodes import Tick
+
+
+def emit_rate(scenario , emits: int) -> float:
+    emit = scenario.get_child_node(scenarios.SOURCE).event_emitter.get_event(scenarios.SOURCE_EVENT).emit
+    tick = Tick(0 , 1.0)
+    start = time.perf_counter()
+    for _ in range(emits):
+        emit(tick)
+    return emits / (time.perf_counter() - start)
+
+
+def run_case(directory: str , generated: scenarios.GeneratedScenario , emits: int) -> List[ Dict[ str , Any ] ]:
+    log_path = os.path.join(directory , f"{generated.case}.qclog")
+    live = emit_rate(build_scenario(generated.path) , emits)
+
+    scenario = build_scenario(generated.path)
+    with Recorder(log_path , scenario.event_emitter) as recorder:
+        recorded = emit_rate(scenario , emits)
+
+    start = time.perf_counter()
+    replayed = replay(log_path , build_scenario(generated.path))
+    replay_rate = replayed / (time.perf_counter() - start)
+
+    bytes_per_event = os.path.getsize(log_path) / recorder.count
+    return [ {"case": f"live-{generated.case}" , "throughput_per_s": live} ,
+             {"case": f"recorded-{generated.case}" , "throughput_per_s": recorded ,
+              "bytes_per_event": bytes_per_event} ,
+             {"case": f"replay-{generated.case}" , "throughput_per_s": replay_rate} ]
+
+
+def main(argv: List[ str ] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fanout" , type=int , nargs="*" , default=[ 1 , 8 , 64 ])
+    parser.add_argument("--emits" , type=int , default=20_000)
+    parser.add_argument("--json" , help="write results to this file")
+    parser.add_argument("--compare" , help="baseline result file to compare against")
+    parser.add_argument("--tolerance" , type=float , default=0.1)
+    args = parser.parse_args(argv)
+
+    rows = [ ]
+    with tempfile.TemporaryDirectory(prefix="quantcerebro-bench-") as directory:
+        for generated in scenarios.generate(directory , "fanout" , args.fanout):
+            rows.extend(run_case(directory , generated , args.emits))
+
+    print_table(rows , [ "case" , "throughput_per_s" , "bytes_per_event" ])
+    if args.json:
+        write_results(args.json , "recording" , rows , fanout=args.fanout , emits=args.emits)
+
+    if args.compare:
+        changes = compare(load_results(args.compare) , {"results": rows} , args.tolerance)
+        print()
+        print_comparison(changes)
+        return 1 if any(c[ "regression" ] for c in changes) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+""" Runtime dispatch benchmark on generated scenarios.
+
+Scenarios are generated as yaml (:mod:`benchmarks.scenarios`) and built with :func:`.build_scenario`, then the source
+event is emitted through ``scenario.notify_handlers``, the path scenario code uses. For each case it reports
+
+* ``throughput_per_s``: emits per second over a tight loop, and ``deliveries_per_s``: handler calls per second
+* ``p50_ns`` ... ``p99.9_ns``: latency of one emit, i.e. until every (synchronous) handler it causes has returned.
+  Samples include one timer call, see ``environment.timer_overhead_ns`` in the output
+
+With ``--profile`` the scenarios are built with profiling enabled (:mod:`.profiling`), comparing the two runs gives
+the profiling overhead.
+
+The callable case times a call to the provider through the caller's registered interface, next to a direct call
+(``callable-direct``) as reference.
+
+usage::
+
+    python -m benchmarks.bench_runtime --json current.json
+    python -m benchmarks.bench_runtime --json current.json --compare baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from typing import Callable , Dict , Any , List
+
+from src.quantcerebro import build_scenario , NodeSet
+
+from benchmarks import scenarios
+from benchmarks.common import percentiles , write_results , load_results , compare , print_table , \
+    print_comparison
+from benchmarks.nodes import Tick
+
+
+def measure(call: Callable , argument: Any , emits: int , warmup: int) -> Dict[ str , float ]:
+    for _ in range(warmup):
+        call(argument)
+
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(emits):
+        call(argument)
+    elapsed = clock() - start
+
+    samples = [ 0 ] * emits
+    for i in range(emits):
+        t0 = clock()
+        call(argument)
+        samples[ i ] = clock() - t0
+
+    result = {"throughput_per_s": emits / elapsed * 1e9}
+    result.update(percentiles(samples))
+    return result
+
+
+def delivered(scenario: NodeSet) -> int:
+    return sum(node.model.count for node in scenario.get_child_nodes() if node.name != scenarios.SOURCE)
+
+
+def run_event_case(generated: scenarios.GeneratedScenario , emits: int , warmup: int ,
+                   profile: bool = False) -> Dict[ str , Any ]:
+    scenario = build_scenario(generated.path , profile=profile)
+
+    def emit(tick: Tick):
+        scenario.notify_handlers(scenarios.SOURCE , scenarios.SOURCE_EVENT , tick)
+
+    row = {"case": generated.case , "deliveries": generated.deliveries}
+    row.update(measure(emit , Tick(0 , 1.0) , emits , warmup))
+    row[ "deliveries_per_s" ] = row[ "throughput_per_s" ] * generated.deliveries
+
+    expected = (warmup + 2 * emits) * generated.deliveries
+    if delivered(scenario) != expected:
+        raise Exception(f"{generated.case}: {delivered(scenario)} handler calls, expected {expected}")
+    return row
+
+
+def run_callable_case(generated: scenarios.GeneratedScenario , emits: int , warmup: int ,
+                      profile: bool = False) -> List[ Dict[ str , Any ] ]:
+    scenario = build_scenario(generated.path , profile=profile)
+    caller = scenario.get_child_node("caller")
+    provider = scenario.get_child_node("provider")
+    interfaces = caller.registered_interfaces
+
+    def through_interface(x: float):
+        return interfaces[ "Sink.Quote" ].quote(x)
+
+    def direct(x: float):
+        return provider.quote(x)
+
+    rows = [ ]
+    for case , call in ((generated.case , through_interface) , ("callable-direct" , direct)):
+        row = {"case": case}
+        row.update(measure(call , 1.0 , emits , warmup))
+        rows.append(row)
+    return rows
+
+
+def run(directory: str , shapes: Dict[ str , List[ int ] ] , emits: int , warmup: int ,
+        profile: bool = False) -> List[ Dict[ str , Any ] ]:
+    rows = [ ]
+    for shape , sizes in shapes.items():
+        for generated in scenarios.generate(directory , shape , sizes):
+            rows.append(run_event_case(generated , emits , warmup , profile))
+    rows.extend(run_callable_case(scenarios.callable_pair(directory) , emits , warmup , profile))
+    return rows
+
+
+def main(argv: List[ str ] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fanout" , type=int , nargs="*" , default=[ 1 , 8 , 64 ])
+    parser.add_argument("--chain" , type=int , nargs="*" , default=[ 1 , 8 , 32 ])
+    parser.add_argument("--diamond" , type=int , nargs="*" , default=[ 2 , 8 ])
+    parser.add_argument("--emits" , type=int , default=20_000)
+    parser.add_argument("--warmup" , type=int , default=1_000)
+    parser.add_argument("--profile" , action="store_true" , help="build the scenarios with profiling enabled")
+    parser.add_argument("--json" , help="write results to this file")
+    parser.add_argument("--compare" , help="baseline result file to compare against")
+    parser.add_argument("--tolerance" , type=float , default=0.1 ,
+                        help="relative change flagged as a regression, default 0.1")
+    args = parser.parse_args(argv)
+
+    shapes = {"fanout": args.fanout , "chain": args.chain , "diamond": args.diamond}
+    with tempfile.TemporaryDirectory(prefix="quantcerebro-bench-") as directory:
+        rows = run(directory , shapes , args.emits , args.warmup , args.profile)
+
+    print_table(rows , [ "case" , "throughput_per_s" , "deliveries_per_s" , "p50_ns" , "p90_ns" , "p99_ns" ,
+                         "p99.9_ns" ])
+    parameters = dict(shapes , emits=args.emits , warmup=args.warmup , profile=args.profile)
+    if args.json:
+        write_results(args.json , "runtime" , rows , **parameters)
+
+    if args.compare:
+        changes = compare(load_results(args.compare) , {"results": rows} , args.tolerance)
+        print()
+        print_comparison(changes)
+        return 1 if any(c[ "regression" ] for c in changes) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
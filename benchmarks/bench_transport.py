@@ -0,0 +1,147 @@
+""" Cross-process transport benchmark: pipe against shared memory ring.
+
+A producer process sends ``--messages`` records of a fixed layout dataclass (:mod:`.transport`) to the parent, which
+reads one field of each record:
+
+* ``pipe``: ``Connection.send`` / ``Connection.recv``, the default transport of out-of-process nodesets
+* ``shm``: :meth:`.RingBuffer.put` / :meth:`.RingBuffer.drain`, the record is written into a slot once and read in
+  place
+
+Records are a sequence number, a price and a float64 array of ``--sizes`` elements. Each case reports
+``throughput_per_s`` (records per second) and ``mb_per_s`` (payload megabytes per second). The time includes the
+producer's writes, the transfer and the consumer's reads, from the start signal to the last record read.
+
+usage::
+
+    python -m benchmarks.bench_transport --json transport.json
+    python -m benchmarks.bench_transport --sizes 1 1024 --compare transport.json
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import re
+import sys
+import time
+from dataclasses import make_dataclass
+from typing import Dict , Any , List
+
+import numpy
+
+from src.quantcerebro.transport import RingBuffer , SlotLayout , array_field , BLOCK
+
+from benchmarks.common import write_results , load_results , compare , print_table , print_comparison
+
+TRANSPORTS = ("pipe" , "shm")
+RING_BYTES = 64 << 20  # most memory a ring takes, large records get fewer slots
+
+
+def frame_class(size: int) -> type:
+    """dataclass "Frame<size>" of this module, records picklable by reference for the pipe transport"""
+    return getattr(sys.modules[ __name__ ] , f"Frame{size}")
+
+
+_GENERATED = re.compile(r"^Frame(\d+)$")
+
+
+def __getattr__(name: str) -> type:
+    match = _GENERATED.match(name)
+    if match is None:
+        raise AttributeError(f"module {__name__} has no attribute {name}")
+    klazz = make_dataclass(name , [ ("seq" , int) , ("price" , float) ,
+                                    ("levels" , numpy.ndarray , array_field((int(match.group(1)) ,))) ])
+    klazz.__module__ = __name__
+    globals()[ name ] = klazz
+    return klazz
+
+
+def produce(transport: str , conn , ring: RingBuffer , size: int , messages: int):
+    frame = frame_class(size)(0 , 1.0 , numpy.ones(size))
+    conn.recv()  # start signal
+    if transport == "pipe":
+        for seq in range(messages):
+            frame.seq = seq
+            conn.send(frame)
+    else:
+        for seq in range(messages):
+            frame.seq = seq
+            ring.put(frame)
+    conn.close()
+
+
+def run_case(transport: str , size: int , messages: int , slots: int) -> Dict[ str , Any ]:
+    context = multiprocessing.get_context()
+    conn , child_conn = context.Pipe()
+    ring = None
+    if transport == "shm":
+        slots = max(min(slots , RING_BYTES // SlotLayout(frame_class(size)).size) , 2)
+        ring = RingBuffer(frame_class(size) , slots , BLOCK , block_timeout=60.0)
+    process = context.Process(target=produce , args=(transport , child_conn , ring , size , messages))
+    process.start()
+
+    checksum = 0
+    clock = time.perf_counter
+    start = clock()
+    conn.send(True)
+    if transport == "pipe":
+        for _ in range(messages):
+            checksum += conn.recv().levels[ 0 ]
+    else:
+        received = 0
+
+        def read(frame):
+            nonlocal checksum
+            checksum += frame.levels[ 0 ]
+
+        while received < messages:
+            received += ring.drain(read)
+    elapsed = clock() - start
+
+    process.join()
+    conn.close()
+    if ring is not None:
+        ring.unlink()
+    if checksum != messages:
+        raise Exception(f"{transport}-{size}: read {checksum} records, expected {messages}")
+
+    payload = frame_class(size)(0 , 0.0 , numpy.zeros(size)).levels.nbytes + 16
+    return {"case": f"{transport}-{size}" , "payload_bytes": payload , "throughput_per_s": messages / elapsed ,
+            "mb_per_s": messages * payload / elapsed / 1e6}
+
+
+def run(sizes: List[ int ] , messages: int , slots: int) -> List[ Dict[ str , Any ] ]:
+    rows = [ ]
+    for size in sizes:
+        # fewer records of the large payloads, the pipe would take minutes otherwise
+        count = max(min(messages , messages * 1024 // max(size , 1)) , 100)
+        for transport in TRANSPORTS:
+            rows.append(run_case(transport , size , count , slots))
+    return rows
+
+
+def main(argv: List[ str ] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__ , formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes" , type=int , nargs="+" , default=[ 1 , 64 , 1024 , 65536 ] ,
+                        help="float64 elements per record")
+    parser.add_argument("--messages" , type=int , default=100_000 , help="records per case, fewer for large sizes")
+    parser.add_argument("--slots" , type=int , default=1024 , help="ring size of the shm transport")
+    parser.add_argument("--json" , help="write results to this file")
+    parser.add_argument("--compare" , help="baseline result file to compare against")
+    parser.add_argument("--tolerance" , type=float , default=0.1)
+    args = parser.parse_args(argv)
+
+    rows = run(args.sizes , args.messages , args.slots)
+    print_table(rows , [ "case" , "payload_bytes" , "throughput_per_s" , "mb_per_s" ])
+    if args.json:
+        write_results(args.json , "transport" , rows , sizes=args.sizes , messages=args.messages , slots=args.slots)
+
+    if args.compare:
+        changes = compare(load_results(args.compare) , {"results": rows} , args.tolerance)
+        print()
+        print_comparison(changes)
+        return 1 if any(c[ "regression" ] for c in changes) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
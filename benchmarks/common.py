@@ -0,0 +1,130 @@
+""" Result handling shared by the benchmarks: percentiles, machine-readable output and comparison between two runs.
+
+Every benchmark writes the same json layout::
+
+    {
+        "benchmark": "runtime",
+        "environment": {"python": "3.11.4", "platform": "...", "commit": "d42539e", ...},
+        "parameters": {...},
+        "results": [ {"case": "fanout-16", "throughput_per_s": 123456.0, "p50_ns": 812.0, ...}, ... ]
+    }
+
+Rows are matched between two files by ``case``. Metrics ending in ``_per_s`` are better when higher, every other numeric
+metric is better when lower.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict , Any , List , Sequence , Iterable , Optional
+
+PERCENTILES = (50 , 90 , 99 , 99.9)
+
+
+def percentiles(samples: Sequence[ float ] , qs: Iterable[ float ] = PERCENTILES) -> Dict[ str , float ]:
+    """nearest-rank percentiles, keyed "p50_ns", "p99.9_ns", ..."""
+    ordered = sorted(samples)
+    result = dict()
+    for q in qs:
+        rank = max(math.ceil(q / 100 * len(ordered)) - 1 , 0)
+        result[ f"p{q:g}_ns" ] = float(ordered[ rank ])
+    return result
+
+
+def timer_overhead_ns(samples: int = 10_000) -> float:
+    """median cost of one perf_counter_ns pair, included in every latency sample"""
+    clock = time.perf_counter_ns
+    deltas = [ ]
+    for _ in range(samples):
+        start = clock()
+        deltas.append(clock() - start)
+    deltas.sort()
+    return float(deltas[ len(deltas) // 2 ])
+
+
+def environment() -> Dict[ str , Any ]:
+    try:
+        commit = subprocess.run([ "git" , "rev-parse" , "--short" , "HEAD" ] , capture_output=True , text=True ,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version() ,
+        "implementation": platform.python_implementation() ,
+        "platform": platform.platform() ,
+        "cpu_count": os.cpu_count() ,
+        "commit": commit ,
+        "timer_overhead_ns": timer_overhead_ns() ,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S") ,
+    }
+
+
+def write_results(path: str , benchmark: str , rows: List[ Dict[ str , Any ] ] , **parameters):
+    document = {"benchmark": benchmark , "environment": environment() , "parameters": parameters , "results": rows}
+    with open(path , "w") as stream:
+        json.dump(document , stream , indent=2)
+
+
+def load_results(path: str) -> Dict[ str , Any ]:
+    with open(path , "r") as stream:
+        return json.load(stream)
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_s")
+
+
+def compare(baseline: Dict[ str , Any ] , current: Dict[ str , Any ] , tolerance: float = 0.1) -> List[ Dict ]:
+    """
+    relative change of every metric present in both runs
+    :param baseline: loaded result document of the reference version
+    :param current: loaded result document of the version under test
+    :param tolerance: relative change beyond which a worse metric is flagged as a regression
+    :return: one row per (case, metric), with "change" > 0 meaning better
+    """
+    reference = {r[ "case" ]: r for r in baseline[ "results" ]}
+    rows = [ ]
+    for row in current[ "results" ]:
+        base = reference.get(row[ "case" ])
+        if base is None:
+            continue
+        for metric , value in row.items():
+            old = base.get(metric)
+            if not isinstance(value , (int , float)) or not isinstance(old , (int , float)) or old == 0:
+                continue
+            change = (value - old) / old
+            if not higher_is_better(metric):
+                change = -change
+            rows.append({"case": row[ "case" ] , "metric": metric , "baseline": old , "current": value ,
+                         "change": change , "regression": change < -tolerance})
+    return rows
+
+
+def print_table(rows: List[ Dict[ str , Any ] ] , columns: Optional[ List[ str ] ] = None , stream=sys.stdout):
+    if not rows:
+        return
+    columns = columns or list(rows[ 0 ].keys())
+    cells = [ [ _format(r.get(c)) for c in columns ] for r in rows ]
+    widths = [ max(len(c) , *(len(line[ i ]) for line in cells)) for i , c in enumerate(columns) ]
+    print("  ".join(c.rjust(w) for c , w in zip(columns , widths)) , file=stream)
+    for line in cells:
+        print("  ".join(v.rjust(w) for v , w in zip(line , widths)) , file=stream)
+
+
+def print_comparison(rows: List[ Dict[ str , Any ] ] , stream=sys.stdout):
+    table = [ dict(r , change=f"{r[ 'change' ] * 100:+.1f}%" , regression="REGRESSION" if r[ "regression" ] else "")
+              for r in rows ]
+    print_table(table , [ "case" , "metric" , "baseline" , "current" , "change" , "regression" ] , stream)
+
+
+def _format(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value , float):
+        return f"{value:.1f}"
+    return str(value)
@@ -0,0 +1,97 @@
+""" Generic nodes for synthetic benchmark scenarios.
+
+Event names are "<predecessor class name>.<edge dataclass name>", so predecessors that should have distinct events need
+distinct classes. Any ``RelayN``/``SinkN`` attribute of this module (``Relay0``, ``Relay1``, ...) is a subclass of
+:class:`Relay`/:class:`Sink` created on first access, which gives generated yaml files as many node classes as they need.
+
+Successors accept any incoming event or interface: their handler and interface maps answer every key.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict , Any , Callable
+
+from src.quantcerebro import Node , NodeConfig
+
+
+@dataclass
+class Tick:
+    seq: int
+    price: float
+
+
+class Quote:
+    """callable edge class, implemented by every bench node"""
+
+    def quote(self , x: float) -> float:
+        raise NotImplementedError
+
+
+@dataclass
+class BenchConfig(NodeConfig):
+
+    @classmethod
+    def from_dict(cls , config_dict: Dict) -> BenchConfig:
+        name = config_dict[ "name" ]
+        return cls(name , config_dict[ "configClass" ] , config_dict[ "nodeClass" ] , name)
+
+
+class BenchModel:
+    def __init__(self):
+        self.count = 0
+
+
+class AnyKey(dict):
+    """mapping that answers every key with the same value"""
+
+    def __init__(self , value: Any):
+        super().__init__()
+        self.value = value
+
+    def __missing__(self , key):
+        return self.value
+
+
+class Sink(Node , Quote):
+    """counts received ticks"""
+
+    def init_model(self) -> BenchModel:
+        return BenchModel()
+
+    def on_tick(self , tick: Tick):
+        self.model.count += 1
+
+    def quote(self , x: float) -> float:
+        return x
+
+    def consolidate_implemented_handlers(self):
+        self._imp_handler_map = AnyKey(self.on_tick)
+
+    def consolidate_implemented_interfaces(self):
+        self._imp_interface_map = AnyKey(self)
+
+
+class Relay(Sink):
+    """counts received ticks and forwards them to its own successors"""
+
+    def __init__(self , node_config: BenchConfig):
+        super().__init__(node_config)
+        self.tick_event = f"{type(self).__name__}.{Tick.__name__}"
+
+    def on_tick(self , tick: Tick):
+        self.model.count += 1
+        self.event_emitter.get_event(self.tick_event).emit(tick)
+
+
+_GENERATED = re.compile(r"^(Relay|Sink)(\d+)$")
+
+
+def __getattr__(name: str) -> Callable:
+    match = _GENERATED.match(name)
+    if match is None:
+        raise AttributeError(f"module {__name__} has no attribute {name}")
+    base = Relay if match.group(1) == "Relay" else Sink
+    klazz = type(name , (base ,) , {"__module__": __name__})
+    globals()[ name ] = klazz
+    return klazz
@@ -0,0 +1,206 @@
+""" Synthetic scenario yaml generator.
+
+Each generator writes scenario files into a directory and returns a :class:`GeneratedScenario`. The scenarios use the
+nodes of :mod:`benchmarks.nodes`: every event scenario has a ``source`` node emitting ``Relay0.Tick``.
+
+* :func:`fanout`: source -> N sinks
+* :func:`chain`: N levels of nested nodesets, each level a sub-scenario file (``nodesetPath``) holding one relay and
+  the next level, the last level holds the sink
+* :func:`diamond`: source -> N relays -> one sink
+* :func:`callable_pair`: a caller node with a callable edge to a provider node
+* :func:`tree`: builder scaling scenario, a tree of nested nodesets of configurable node count, depth and edge density
+"""
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict , Any , List
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+NODESET_CLASS = "src.quantcerebro.nodeset.NodeSet"
+NODESET_CONFIG_CLASS = "src.quantcerebro.nodeset.NodeSetConfig"
+CONFIG_CLASS = "benchmarks.nodes.BenchConfig"
+TICK = "benchmarks.nodes.Tick"
+QUOTE = "benchmarks.nodes.Quote"
+
+SOURCE = "source"
+SOURCE_EVENT = "Relay0.Tick"
+
+
+@dataclass
+class GeneratedScenario:
+    """
+    :param path: root scenario file
+    :param shape: generator name
+    :param size: generator size parameter
+    :param deliveries: handler calls caused by one emit of the source event
+    :param edges: number of configured edges
+    """
+    path: str
+    shape: str
+    size: int
+    deliveries: int
+    edges: int = 0
+
+    @property
+    def case(self) -> str:
+        return f"{self.shape}-{self.size}"
+
+
+def node(name: str , node_class: str) -> Dict[ str , Any ]:
+    return {"name": name , "nodeClass": f"benchmarks.nodes.{node_class}"}
+
+
+def node_config(name: str) -> Dict[ str , Any ]:
+    return {"name": name , "configClass": CONFIG_CLASS}
+
+
+def edge(pred: str , succ: str , edge_type: str = "event" , edge_class: str = TICK) -> Dict[ str , Any ]:
+    return {"pred": pred , "succ": succ , "edgeType": edge_type , "edgeClass": edge_class}
+
+
+def scenario_dict(name: str) -> Dict[ str , Any ]:
+    return {"name": name , "nodesetClass": NODESET_CLASS , "nodesetConfigClass": NODESET_CONFIG_CLASS ,
+            "components": [ ] , "edges": [ ] , "componentConfigs": [ ]}
+
+
+def add_node(scenario: Dict[ str , Any ] , name: str , node_class: str):
+    scenario[ "components" ].append(node(name , node_class))
+    scenario[ "componentConfigs" ].append(node_config(name))
+
+
+def add_nodeset(scenario: Dict[ str , Any ] , name: str , path: str):
+    scenario[ "components" ].append({"name": name , "nodesetClass": NODESET_CLASS})
+    scenario[ "componentConfigs" ].append({"name": name , "nodesetPath": path})
+
+
+def write(directory: str , file_name: str , scenario: Dict[ str , Any ]) -> str:
+    os.makedirs(directory , exist_ok=True)
+    path = os.path.abspath(os.path.join(directory , file_name))
+    with open(path , "w") as stream:
+        yaml.dump(scenario , stream , Dumper=SafeDumper , sort_keys=False)
+    return path
+
+
+def fanout(directory: str , size: int) -> GeneratedScenario:
+    scenario = scenario_dict(f"fanout_{size}")
+    add_node(scenario , SOURCE , "Relay0")
+    for i in range(size):
+        add_node(scenario , f"sink{i}" , "Sink")
+        scenario[ "edges" ].append(edge(SOURCE , f"sink{i}"))
+    return GeneratedScenario(write(directory , f"fanout_{size}.yml" , scenario) , "fanout" , size , size)
+
+
+def chain(directory: str , size: int) -> GeneratedScenario:
+    # written deepest first, each level references the file of the next one
+    path = None
+    for level in reversed(range(size)):
+        scenario = scenario_dict(f"level{level}")
+        relay = SOURCE if level == 0 else f"relay{level}"
+        add_node(scenario , relay , f"Relay{level}")
+        if path is None:
+            add_node(scenario , "sink" , "Sink")
+            scenario[ "edges" ].append(edge(relay , "sink"))
+        else:
+            add_nodeset(scenario , f"L{level + 1}" , path)
+            scenario[ "edges" ].append(edge(relay , f"L{level + 1}.relay{level + 1}"))
+        path = write(directory , f"chain_{size}_level{level}.yml" , scenario)
+    return GeneratedScenario(path , "chain" , size , size)
+
+
+def diamond(directory: str , size: int) -> GeneratedScenario:
+    scenario = scenario_dict(f"diamond_{size}")
+    add_node(scenario , SOURCE , "Relay0")
+    add_node(scenario , "join" , "Sink")
+    for i in range(size):
+        # distinct classes, so each branch emits its own event
+        add_node(scenario , f"branch{i}" , f"Relay{i + 1}")
+        scenario[ "edges" ].append(edge(SOURCE , f"branch{i}"))
+        scenario[ "edges" ].append(edge(f"branch{i}" , "join"))
+    return GeneratedScenario(write(directory , f"diamond_{size}.yml" , scenario) , "diamond" , size , 2 * size)
+
+
+def callable_pair(directory: str) -> GeneratedScenario:
+    scenario = scenario_dict("callable")
+    add_node(scenario , "provider" , "Sink")
+    add_node(scenario , "caller" , "Sink")
+    scenario[ "edges" ].append(edge("provider" , "caller" , "callable" , QUOTE))
+    return GeneratedScenario(write(directory , "callable.yml" , scenario) , "callable" , 1 , 1)
+
+
+def tree(directory: str , size: int , depth: int = 3 , branching: int = 4 , density: float = 1.0 ,
+         classes: int = 64 , seed: int = 0) -> GeneratedScenario:
+    """
+    nodes spread evenly over a tree of nodesets, every nodeset but the root is a sub-scenario file (``nodesetPath``)
+    :param size: number of nodes
+    :param depth: number of nodeset levels, 1 is a single flat scenario file
+    :param branching: child nodesets per nodeset
+    :param density: average number of outgoing event edges per node
+    :param classes: number of distinct node classes. Nodes of one class share their event, as in any scenario, so
+        classes are given to contiguous blocks of nodes and edges only go from a node to a node of a later block: the
+        event graph, whose vertices are classes, is acyclic. Nodes of the last block have no outgoing edge
+    :param seed: random seed of the edge placement
+    """
+    rng = random.Random(seed)
+
+    # nodesets in breadth first order, each knows its children
+    names = [ "root" ]
+    children: Dict[ str , List[ str ] ] = {"root": [ ]}
+    level = [ "root" ]
+    for _ in range(depth - 1):
+        next_level = [ ]
+        for parent in level:
+            for _ in range(branching):
+                name = f"S{len(names)}"
+                names.append(name)
+                children[ parent ].append(name)
+                children[ name ] = [ ]
+                next_level.append(name)
+        level = next_level
+
+    documents = {name: scenario_dict(name) for name in names}
+    owner: List[ str ] = [ ]
+    class_of = [ i * classes // size for i in range(size) ]
+    for i in range(size):
+        nodeset = names[ i % len(names) ]
+        owner.append(nodeset)
+        add_node(documents[ nodeset ] , f"n{i}" , f"Relay{class_of[ i ]}")
+
+    # first node of the next class block, by node
+    block_end = [ size ] * size
+    for i in reversed(range(size - 1)):
+        block_end[ i ] = i + 1 if class_of[ i + 1 ] != class_of[ i ] else block_end[ i + 1 ]
+
+    edges = 0
+    for i in range(size):
+        if block_end[ i ] == size:
+            continue
+        # binomial-ish out degree with mean ``density``
+        degree = int(density) + (rng.random() < density - int(density))
+        for succ in {rng.randrange(block_end[ i ] , size) for _ in range(degree)}:
+            documents[ owner[ i ] ][ "edges" ].append(edge(f"n{i}" , f"{owner[ succ ]}.n{succ}"))
+            edges += 1
+
+    # children are written before their parents, which reference their file
+    paths: Dict[ str , str ] = dict()
+    prefix = f"tree_{size}_d{depth}"
+    for name in reversed(names):
+        for child in children[ name ]:
+            add_nodeset(documents[ name ] , child , paths[ child ])
+        paths[ name ] = write(directory , f"{prefix}_{name}.yml" , documents[ name ])
+
+    return GeneratedScenario(paths[ "root" ] , "tree" , size , 0 , edges)
+
+
+GENERATORS = {"fanout": fanout , "chain": chain , "diamond": diamond}
+
+
+def generate(directory: str , shape: str , sizes: List[ int ]) -> List[ GeneratedScenario ]:
+    return [ GENERATORS[ shape ](directory , size) for size in sizes ]
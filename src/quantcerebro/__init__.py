@@ -10,10 +10,115 @@ See docs for complete documentation.
 __version__ = '0.1.0'
 __docformat__ = 'reStructuredText'
 
-from .builder import ScenarioBuilder , ConfigBuilder
-from .meta import PredecessorTemplate , SuccessorTemplate , ScenarioComponent , Config
-from .nodeset import NodeSet , NodeSetConfig
-from .node import Node , NodeConfig
-from .dependencies import EdgeConfig , Dependency , EventDependency , CallableDependency
-from .event import NodeEvent , NodeEventOp , GraphEvent , GraphEventEmitter
-from .utils import load_yaml , load_class
+# standard lib imports
+from importlib import import_module
+
+# typing.TYPE_CHECKING without importing typing, which takes most of the package import time. Type checkers treat the
+# name as true
+TYPE_CHECKING = False
+
+# public name -> module defining it. Modules are imported on first access of one of their names, importing the package
+# alone, e.g. in a worker process, does not import yaml, eventkit or asyncio
+_LAZY_NAMES = {
+    "ScenarioBuilder": "builder" ,
+    "ConfigBuilder": "builder" ,
+    "build_scenario": "builder" ,
+    "compile_scenario": "builder" ,
+    "PredecessorTemplate": "meta" ,
+    "SuccessorTemplate": "meta" ,
+    "ScenarioComponent": "meta" ,
+    "Config": "meta" ,
+    "NodeSet": "nodeset" ,
+    "NodeSetConfig": "nodeset" ,
+    "Node": "node" ,
+    "NodeConfig": "node" ,
+    "DeferredModel": "node" ,
+    "deferred_models": "node" ,
+    "EdgeConfig": "dependencies" ,
+    "Dependency": "dependencies" ,
+    "EventDependency": "dependencies" ,
+    "CallableDependency": "dependencies" ,
+    "NodeInbox": "inbox" ,
+    "AsyncDispatcher": "inbox" ,
+    "Conflator": "conflation" ,
+    "InterfaceCache": "caching" ,
+    "CachedInterface": "caching" ,
+    "CallBatcher": "callbatch" ,
+    "BatchingInterface": "callbatch" ,
+    "PendingResult": "callbatch" ,
+    "batch_method": "callbatch" ,
+    "RecordBatch": "batch" ,
+    "batch_handler": "batch" ,
+    "batch_event_name": "batch" ,
+    "DispatchPlan": "dispatch" ,
+    "compile_dispatch_plan": "dispatch" ,
+    "Profiler": "profiling" ,
+    "LatencyHistogram": "profiling" ,
+    "RemoteNodeSet": "remote" ,
+    "RemoteNode": "remote" ,
+    "RingBuffer": "transport" ,
+    "SlotLayout": "transport" ,
+    "array_field": "transport" ,
+    "Recorder": "recording" ,
+    "EventLog": "recording" ,
+    "LogEntry": "recording" ,
+    "replay": "recording" ,
+    "NodeEvent": "event" ,
+    "NodeEventOp": "event" ,
+    "GraphEvent": "event" ,
+    "GraphEventEmitter": "event" ,
+    "load_yaml": "utils" ,
+    "load_yaml_cached": "utils" ,
+    "YamlCache": "utils" ,
+    "load_class": "utils" ,
+    "import_time_report": "utils" ,
+    "clear_class_cache": "utils" ,
+    "ScenarioSnapshot": "snapshot" ,
+    "save_snapshot": "snapshot" ,
+    "load_snapshot": "snapshot" ,
+    "rebuild_scenario": "rebuild" ,
+    "diff_configs": "rebuild" ,
+    "ScenarioDiff": "rebuild" ,
+    "SweepRunner": "sweep" ,
+    "SweepResult": "sweep" ,
+    "grid": "sweep"
+}
+
+__all__ = list(_LAZY_NAMES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(import_module(f".{module_name}" , __name__) , name)
+    # later accesses find the name without going through __getattr__
+    globals()[ name ] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .builder import ScenarioBuilder , ConfigBuilder , build_scenario , compile_scenario
+    from .meta import PredecessorTemplate , SuccessorTemplate , ScenarioComponent , Config
+    from .nodeset import NodeSet , NodeSetConfig
+    from .node import Node , NodeConfig , DeferredModel , deferred_models
+    from .dependencies import EdgeConfig , Dependency , EventDependency , CallableDependency
+    from .inbox import NodeInbox , AsyncDispatcher
+    from .conflation import Conflator
+    from .caching import InterfaceCache , CachedInterface
+    from .callbatch import CallBatcher , BatchingInterface , PendingResult , batch_method
+    from .batch import RecordBatch , batch_handler , batch_event_name
+    from .dispatch import DispatchPlan , compile_dispatch_plan
+    from .profiling import Profiler , LatencyHistogram
+    from .remote import RemoteNodeSet , RemoteNode
+    from .transport import RingBuffer , SlotLayout , array_field
+    from .recording import Recorder , EventLog , LogEntry , replay
+    from .event import NodeEvent , NodeEventOp , GraphEvent , GraphEventEmitter
+    from .utils import load_yaml , load_yaml_cached , YamlCache , load_class , import_time_report , clear_class_cache
+    from .snapshot import ScenarioSnapshot , save_snapshot , load_snapshot
+    from .rebuild import rebuild_scenario , diff_configs , ScenarioDiff
+    from .sweep import SweepRunner , SweepResult , grid
@@ -0,0 +1,121 @@
+""" Batched emission for :class:`.EventDependency` edges.
+
+A predecessor emits a block of records in one call with ``notify_handlers_batch``, instead of one ``notify_handlers``
+per record. A block is a :class:`RecordBatch`: columns typed after the edge dataclass, given as a dict of equally long
+sequences (lists, numpy arrays) or as a numpy structured array.
+
+Every event edge has a companion batch event (:func:`batch_event_name`). Handlers decorated with :func:`batch_handler`
+receive whole blocks, and single emitted records wrapped in a one-row block. Other handlers keep receiving single
+records: blocks are unpacked into edge dataclass instances for them. The single record path is left untouched.
+
+    .. code-block:: python
+
+        class Strategy(Node):
+
+            @batch_handler
+            def on_ticks(self, ticks: RecordBatch):
+                prices = ticks.column("price")
+                ...
+"""
+# standard lib imports
+from __future__ import annotations
+
+from dataclasses import fields , is_dataclass
+from typing import Any , Callable , Dict , Iterable , Iterator , List , Sequence , Type
+
+# 3rd-party imports
+...
+
+BATCH_EVENT_SUFFIX = "[batch]"
+
+
+def batch_event_name(event_name: str) -> str:
+    """name of the batch event companion of an event"""
+    return event_name + BATCH_EVENT_SUFFIX
+
+
+def batch_handler(handler: Callable) -> Callable:
+    """declare that an event handler accepts :class:`RecordBatch` blocks"""
+    handler.__batch_handler__ = True
+    return handler
+
+
+def is_batch_handler(handler: Callable) -> bool:
+    """whether a handler (or the function of a bound method) is declared with :func:`batch_handler`"""
+    return getattr(handler , "__batch_handler__" , False)
+
+
+class RecordBatch:
+    """
+    Block of records of an edge dataclass, stored column-wise
+
+    :param data_class: edge dataclass the columns are typed after
+    :param columns: dict of equally long sequences keyed by field name, or a numpy structured array
+    """
+    __slots__ = ("data_class" , "columns" , "_length")
+
+    def __init__(self , data_class: Type , columns: Any):
+        if not is_dataclass(data_class):
+            raise TypeError(f"{data_class} is not a dataclass")
+
+        names = getattr(getattr(columns , "dtype" , None) , "names" , None)
+        if names is not None:
+            # numpy structured array, each column is a zero-copy view
+            columns = {name: columns[ name ] for name in names}
+
+        missing = [ f.name for f in fields(data_class) if f.name not in columns ]
+        if missing:
+            raise KeyError(f"columns {missing} of {data_class.__name__} missing from batch")
+
+        lengths = {len(c) for c in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"columns of a batch must have the same length, got {sorted(lengths)}")
+
+        self.data_class = data_class
+        self.columns: Dict[ str , Sequence ] = columns
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls , data_class: Type , records: Iterable[ Any ]) -> RecordBatch:
+        """build a batch from dataclass instances"""
+        records = list(records)
+        return cls(data_class , {f.name: [ getattr(r , f.name) for r in records ] for f in fields(data_class)})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self , name: str) -> Sequence:
+        return self.columns[ name ]
+
+    def records(self) -> Iterator[ Any ]:
+        """unpack the batch into edge dataclass instances"""
+        columns: List[ Sequence ] = [ ]
+        for f in fields(self.data_class):
+            column = self.columns[ f.name ]
+            # numpy columns yield numpy scalars when iterated, tolist converts to python values in one go
+            columns.append(column.tolist() if hasattr(column , "tolist") else column)
+
+        data_class = self.data_class
+        for row in zip(*columns):
+            yield data_class(*row)
+
+
+def unpacking_handler(handler: Callable) -> Callable:
+    """adapt a single record handler to receive batches"""
+
+    def deliver(batch: RecordBatch):
+        for record in batch.records():
+            handler(record)
+
+    deliver.__wrapped__ = handler
+    return deliver
+
+
+def packing_handler(handler: Callable , data_class: Type) -> Callable:
+    """adapt a batch handler to receive single records, as one-row batches"""
+
+    def deliver(record):
+        handler(RecordBatch.from_records(data_class , (record ,)))
+
+    deliver.__wrapped__ = handler
+    return deliver
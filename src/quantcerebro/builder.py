@@ -66,6 +66,10 @@ Configuration File keywords:
 
             this field will overwrite ``nodesetClass`` of a sub-scenario, where sub-scenario is identified by ``componentConfigs.nodesetpath``
 
+    * ``components.outOfProcess``: optional, nodeset components only: ``true`` to build and run the nodeset in a worker
+      process, see :mod:`.remote`. Events a worker emits to nodes of this process are only delivered when the
+      scenario pumps them, see :func:`build_scenario`
+
 * ``edges``: dependency section, which specifies dependencies among components
 
     * ``edges.pred``: predecessor component name
@@ -81,6 +85,41 @@ Configuration File keywords:
 
     * ``edges.edgeClass``: data class that handles the dependency data from pred to succ.
 
+    * ``edges.backpressure``: optional, event edges in asyncio dispatch mode only: ``block``, ``drop-oldest`` or
+      ``drop-newest``, see :mod:`.inbox`
+
+    * ``edges.queueSize``: optional, event edges in asyncio dispatch mode only: size of the successor's inbox. The
+      inbox is per successor node, shared by all its incoming event edges: its size is the largest ``queueSize`` among
+      them. ``block`` backpressure parks up to as many messages again behind it, and drops beyond, see :mod:`.inbox`
+
+    * ``edges.transport``: optional, event edges crossing a process boundary only: ``pipe`` (default) or ``shm``, see
+      :mod:`.transport`
+
+    * ``edges.ringSize``: optional, shm transport only: number of slots of the ring buffer
+
+    * ``edges.overflow``: optional, shm transport only: ``block``, ``drop-newest`` or ``spill``
+
+    * ``edges.conflate``: optional, event edges only: ``true`` to deliver only the latest pending update to the
+      successor, see :mod:`.conflation`
+
+    * ``edges.conflateKey``: optional, event edges only: edge dataclass field updates are conflated by, implies
+      ``conflate``
+
+    * ``edges.cache``: optional, callable edges only: ``true`` to memoize the interface's method calls, see
+      :mod:`.caching`
+
+    * ``edges.cacheSize``: optional, callable edges only: number of results kept, implies ``cache``
+
+    * ``edges.cacheTtl``: optional, callable edges only: seconds a result is valid for, implies ``cache``
+
+    * ``edges.batch``: optional, callable edges only: ``true`` to collect the interface's calls and dispatch them to
+      its batch methods, see :mod:`.callbatch`. An edge cannot both cache and batch calls
+
+    * ``edges.batchSize``: optional, callable edges only: calls collected before they are dispatched, implies
+      ``batch``
+
+    * ``edges.batchWindow``: optional, callable edges only, asyncio: seconds calls are collected for, implies ``batch``
+
 * ``componentConfigs``:     config section for component configs that used to initialise component a component
 
     * ``componentConfigs.name``:    component name as reference, there must be a one-to-one mapping with component section.
@@ -94,13 +133,22 @@ Configuration File keywords:
 # standard lib imports
 from __future__ import annotations
 
-from typing import cast , List , Tuple , Dict , Any
+import copy
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import Executor , ThreadPoolExecutor , ProcessPoolExecutor , Future
+from typing import cast , List , Tuple , Dict , Any , Set , Optional
 
 # Local application/library specific imports.
-from src.quantcerebro.node import NodeConfig , Config , ScenarioComponent
-from src.quantcerebro.utils import load_class ,  load_yaml
-from src.quantcerebro.dependencies import Dependency , EdgeConfig , EventDependency , CallableDependency
-from src.quantcerebro.nodeset import NodeSetConfig , NodeSet
+from .node import Node , NodeConfig , Config , ScenarioComponent , deferred_models
+from .utils import load_class , load_yaml_cached , import_time_report
+from .dependencies import Dependency , EdgeConfig , EventDependency , CallableDependency
+from .nodeset import NodeSetConfig , NodeSet
+from .inbox import AsyncDispatcher
+from .remote import RemoteNodeSet , wire_remote_edge
+from .snapshot import ScenarioSnapshot , collect_class_paths , module_files , file_signatures , \
+    save_snapshot , load_snapshot
 
 # 3rd-party imports
 ...
@@ -108,26 +156,142 @@ from src.quantcerebro.nodeset import NodeSetConfig , NodeSet
 
 
 
-def build_scenario(file_path:str) -> NodeSet:
+logger = logging.getLogger(__name__)
+
+
+def build_scenario(file_path:str , snapshot_path: Optional[ str ] = None , lazy: bool = False ,
+                   parallel: bool = False , dispatch: str = "sync" , profile: bool = False) -> NodeSet:
+    """
+    build a scenario from a yaml file. Once built, the time spent importing node modules is available from
+    :func:`.import_time_report`, the slowest imports are logged at debug level.
+
+    :param file_path: scenario yaml file
+    :param snapshot_path: optional precompiled snapshot, see :func:`compile_scenario`. A fresh snapshot is used instead
+        of the yaml files, a missing or stale one is (re)compiled and written back.
+    :param lazy: defer every node's ``init_model`` to its first use, see :class:`ScenarioBuilder`
+    :param parallel: run every node's ``init_model`` concurrently, see :class:`ScenarioBuilder`
+    :param dispatch: "sync", or "async" to deliver events through per-node inboxes, see :class:`ScenarioBuilder`
+    :param profile: time every handler and interface, see :mod:`.profiling`
+
+    .. note::
+
+        when the scenario has ``outOfProcess`` nodesets, events crossing from a worker to this process are queued
+        until the scenario delivers them, on the calling thread: call :meth:`.NodeSet.pump_remote` from the main loop,
+        :meth:`.NodeSet.sync_remote` to wait for everything emitted so far, or :meth:`.RemoteNodeSet.attach` each
+        nodeset of :meth:`.NodeSet.remote_nodesets` to an asyncio loop. Events crossing to a worker are delivered
+        by the worker without any call. Stop the workers with :meth:`.NodeSet.stop_remote`.
+    """
+    if snapshot_path is None:
+        config_builder = ConfigBuilder(file_path)
+        scenario_config = config_builder.build()
+        scenario_builder = ScenarioBuilder(scenario_config , lazy=lazy , parallel=parallel , dispatch=dispatch ,
+                                           profile=profile)
+        scenario = scenario_builder.build()
+    else:
+        snapshot = load_snapshot(snapshot_path , file_path)
+        if snapshot is None:
+            snapshot = compile_scenario(file_path , snapshot_path)
+        scenario_builder = ScenarioBuilder(snapshot.nodeset_config , lazy=lazy , parallel=parallel , dispatch=dispatch ,
+                                           profile=profile)
+        scenario = scenario_builder.build_components()
+        try:
+            scenario_builder.build_edges(snapshot.edges)
+        except BaseException:
+            scenario.stop_remote()
+            raise
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for module_path , seconds in import_time_report()[ :10 ]:
+            logger.debug(f"import {module_path}: {seconds * 1000:.1f}ms")
+    return scenario
+
+
+def compile_scenario(file_path: str , snapshot_path: Optional[ str ] = None) -> ScenarioSnapshot:
+    """
+    build the composite config of a yaml scenario, and compile it, along with its flattened edges and referenced class
+    paths, into a :class:`.ScenarioSnapshot`
+    :param file_path: scenario yaml file
+    :param snapshot_path: when given, the snapshot is written to this path
+    :return: the compiled snapshot
+    """
     config_builder = ConfigBuilder(file_path)
     scenario_config = config_builder.build()
-    scenario_builder = ScenarioBuilder(scenario_config)
-    return scenario_builder.build()
+    class_paths = collect_class_paths(scenario_config)
+
+    snapshot = ScenarioSnapshot(
+        source=os.path.realpath(file_path) ,
+        nodeset_config=scenario_config ,
+        edges=ScenarioBuilder.collect_edges(scenario_config) ,
+        class_paths=class_paths ,
+        files=file_signatures(config_builder.source_files + module_files(class_paths)))
+
+    if snapshot_path is not None:
+        save_snapshot(snapshot , snapshot_path)
+    return snapshot
 
 
 class ScenarioBuilder:
     """
     Builds a composite scenario from composite config.
+
+    In lazy mode, nodes are constructed without calling ``init_model``: each node's model is built on first use, by a
+    handler or interface that accesses it (or explicitly through :meth:`.Node.materialize_model`). Dependencies are
+    still wired at build time. :meth:`deferred_report` tells how much model construction was deferred.
+
+    In parallel mode, nodes are constructed and registered one by one as usual but without their model, then every
+    ``init_model`` runs concurrently, see :meth:`build_models`. Each node class picks a thread or a process pool
+    through :attr:`.Node.model_executor`; threads only help models whose construction releases the GIL (file and
+    network I/O, numpy), pure python work needs the process pool.
+
+    In asyncio dispatch mode (``dispatch="async"``), event edges deliver through a bounded inbox and consumer task per
+    successor node instead of calling handlers synchronously, see :mod:`.inbox`. The scenario's
+    :class:`.AsyncDispatcher` is ``scenario.dispatcher``, start it from a coroutine before emitting.
+
+    A nodeset config marked ``out_of_process`` is built in a worker process, the scenario holds a
+    :class:`.RemoteNodeSet` in its place, see :mod:`.remote`. Workers are started by :meth:`build_components`, and
+    build their subtree while the parent builds the rest of the scenario. Workers started by a build that fails are
+    stopped before the error propagates.
     """
 
-    def __init__(self , nodeset_config: NodeSetConfig):
+    def __init__(self , nodeset_config: NodeSetConfig , lazy: bool = False , parallel: bool = False ,
+                 max_workers: Optional[ int ] = None , thread_executor: Optional[ Executor ] = None ,
+                 process_executor: Optional[ Executor ] = None , dispatch: str = "sync" , profile: bool = False ,
+                 scenario: Optional[ NodeSet ] = None):
         """
         :param nodeset_config: composite scenario config
+        :param lazy: defer model construction of every node to its first use
+        :param parallel: build models concurrently, ignored in lazy mode
+        :param max_workers: size of the pools created in parallel mode
+        :param thread_executor: executor for "thread" models, a pool is created (and shut down) when not given
+        :param process_executor: executor for "process" models, a pool is created (and shut down) when not given
+        :param dispatch: "sync" or "async" event delivery
+        :param profile: enable profiling on the scenario before dependencies are registered, see :mod:`.profiling`
+        :param scenario: built scenario to add components and dependencies to, instead of a new one, see
+            :func:`.rebuild_scenario`. Its dispatch mode and profiling are kept, dispatch and profile are ignored
         """
+        if dispatch not in ("sync" , "async"):
+            raise ValueError(f"unknown dispatch mode '{dispatch}'")
         self.nodeset_config = nodeset_config
-        self.scenario: NodeSet = cast(NodeSet , ScenarioBuilder.init_component_with_config(self.nodeset_config))  # root
-        self.current_nodeset: NodeSet = self.scenario
-        self.name_stack: List[ str ] = list()
+        self.lazy = lazy
+        self.parallel = parallel and not lazy
+        self.max_workers = max_workers
+        self.thread_executor = thread_executor
+        self.process_executor = process_executor
+        self.deferred_count = 0
+        self.used_names: Set[ str ] = set()
+        if scenario is not None:
+            self.scenario: NodeSet = scenario
+            self.current_nodeset: NodeSet = scenario
+            self._consolidated = True
+            return
+
+        self.scenario = cast(NodeSet , ScenarioBuilder.init_component_with_config(self.nodeset_config))  # root
+        self.current_nodeset = self.scenario
+        if dispatch == "async":
+            self.scenario.dispatcher = AsyncDispatcher()
+        if profile:
+            self.scenario.enable_profiling()
+        self._consolidated = False
 
     def build(self) -> NodeSet:
         """
@@ -135,12 +299,16 @@ class ScenarioBuilder:
         """
         self.build_components()
 
-        self.build_edges()
+        try:
+            self.build_edges()
+        except BaseException:
+            self.scenario.stop_remote()
+            raise
 
         return self.scenario
 
     # component
-    def build_components(self) -> NodeSet:
+    def build_components(self , roots: Optional[ List[ Tuple[ str , Config ] ] ] = None) -> NodeSet:
         """
         instantiate child component level by level from the top. Stack keeps track of a nodeset by name and it's child
         configs, while stack is not empty, add each element from stack to it's parent nodeset. After components are
@@ -151,43 +319,131 @@ class ScenarioBuilder:
 
             component name should be unique in a scenario
 
+        :param roots: (parent nodeset name, config) of the subtrees to build into the scenario, the whole scenario
+            config when not given. Only these subtrees are consolidated
         :return: the scenario with all child component instantiated, but no dependencies are registered.
         """
         # stack to keep track of the leaf to construct - (name, config), it keeps track of the parent the leaf has
-        stack: List[ Tuple[ str , Config ] ] = [ (self.nodeset_config.name , self.nodeset_config) ]
-
-        # while stack is not empty
-        while stack:
-
-            parent_nodeset_name , config = stack.pop()
-            component = ScenarioBuilder.init_component_with_config(config)
-
-            self.name_check(str(component.name))
-
-            # get current nodeset
-            if parent_nodeset_name != self.current_nodeset.name:
-                self.current_nodeset = self.scenario.get_nodeset(parent_nodeset_name)
-
-            # add component to current_nodeset
-
-            # when component is a nodeset
-            if isinstance(config , NodeSetConfig):
-                # if component is not "scenario" itself, add component to current_nodeset, else do nothing
-                if component.name != self.scenario.name:
+        stack: List[ Tuple[ str , Config ] ] = [ (self.nodeset_config.name , self.nodeset_config) ] if roots is None \
+            else list(reversed(roots))
+        nodes: List[ Node ] = [ ]  # nodes in registration order, parallel mode only
+        remotes: List[ RemoteNodeSet ] = [ ]
+        added: List[ ScenarioComponent ] = [ ]  # roots given only
+        root_ids = {id(root) for _ , root in roots or ()}
+
+        try:
+            # while stack is not empty
+            while stack:
+
+                parent_nodeset_name , config = stack.pop()
+
+                # get current nodeset
+                if parent_nodeset_name != self.current_nodeset.name:
+                    self.current_nodeset = self.scenario.get_nodeset(parent_nodeset_name)
+
+                # out of process nodeset: stubs in this process, the subtree is built by the worker
+                if isinstance(config , NodeSetConfig) and config.out_of_process \
+                        and config is not self.nodeset_config:
+                    remote = RemoteNodeSet(cast(NodeSetConfig , config))
+                    for name in remote.component_names():
+                        self.name_check(str(name))
+                    self.add_component(remote , switch_to=False)
+                    remotes.append(remote)
+                    remote.start(self.lazy , self.parallel)
+                    continue
+
+                with deferred_models(self.lazy or self.parallel):
+                    component = ScenarioBuilder.init_component_with_config(config)
+
+                self.name_check(str(component.name))
+                if id(config) in root_ids:
+                    added.append(component)
+
+                # add component to current_nodeset
+
+                # when component is a nodeset
+                if isinstance(config , NodeSetConfig):
+                    # if component is not "scenario" itself, add component to current_nodeset, else do nothing
+                    if component.name != self.scenario.name:
+                        self.add_component(component)
+                        parent_nodeset_name = component.name
+
+                    # push (parent_nodeset_name, config) to stack
+                    for n in config.components:
+                        stack.append((parent_nodeset_name , n))
+                # when component is a node
+                else:
                     self.add_component(component)
-                    parent_nodeset_name = component.name
-
-                # push (parent_nodeset_name, config) to stack
-                for n in config.components:
-                    stack.append((parent_nodeset_name , n))
-            # when component is a node
-            else:
-                self.add_component(component)
-
-        self.scenario.consolidate_implemented_interfaces()
-        self.scenario.consolidate_implemented_handlers()
+                    if self.lazy:
+                        self.deferred_count += 1
+                    if self.parallel:
+                        nodes.append(cast(Node , component))
+
+            if self.lazy:
+                logger.info(f"model construction of {self.deferred_count} node(s) deferred")
+            if self.parallel:
+                self.build_models(nodes)
+            for remote in remotes:
+                remote.wait_ready()
+        except BaseException:
+            # a failed build leaves no worker running
+            for remote in remotes:
+                remote.stop()
+            raise
+
+        for component in ([ self.scenario ] if roots is None else added):
+            component.consolidate_implemented_interfaces()
+            component.consolidate_implemented_handlers()
+        self._consolidated = True
         return self.scenario
 
+    def build_models(self , nodes: List[ Node ]) -> None:
+        """
+        build the deferred models of nodes concurrently. Results are collected in the order of ``nodes``, so when
+        construction fails for several nodes the error raised is the one of the first node, and lists all of them.
+        :param nodes: nodes whose model is deferred, in registration order
+        """
+        own_executors: List[ Executor ] = [ ]
+        futures: List[ Tuple[ Node , bool , Future ] ] = [ ]
+        errors: List[ Tuple[ str , BaseException ] ] = [ ]
+        collected = False
+        try:
+            for node in nodes:
+                if node.model_executor == "process":
+                    if self.process_executor is None:
+                        self.process_executor = ProcessPoolExecutor(self.max_workers)
+                        own_executors.append(self.process_executor)
+                    future = self.process_executor.submit(build_model , node.node_config.node_class ,
+                                                          detached_config(node.node_config))
+                    futures.append((node , True , future))
+                else:
+                    if self.thread_executor is None:
+                        self.thread_executor = ThreadPoolExecutor(self.max_workers)
+                        own_executors.append(self.thread_executor)
+                    futures.append((node , False , self.thread_executor.submit(node.materialize_model)))
+
+            for node , in_process , future in futures:
+                try:
+                    model = future.result()
+                except Exception as exc:
+                    errors.append((node.name , exc))
+                    continue
+                if in_process:
+                    node.model = model
+            collected = True
+        finally:
+            # the pools created here do not outlive the call, interrupted builds do not wait for pending models
+            for executor in own_executors:
+                executor.shutdown(wait=collected , cancel_futures=not collected)
+            if self.thread_executor in own_executors:
+                self.thread_executor = None
+            if self.process_executor in own_executors:
+                self.process_executor = None
+
+        if errors:
+            names = ", ".join(name for name , _ in errors)
+            raise Exception(f"model construction failed for node(s): {names}") from errors[ 0 ][ 1 ]
+
     def add_component(self , component: ScenarioComponent , switch_to: bool = True):
         """ add a scenario component to current nodeset level, when switch_to is true and current component is a nodeset, switch to this nodeset branch
         :param component: scenario component
@@ -199,22 +455,77 @@ class ScenarioBuilder:
                 self.current_nodeset = cast(NodeSet , component)
 
     # edge
-    def build_edges(self) -> NodeSet:
+    def build_edges(self , edges: Optional[ List[ Tuple[ str , EdgeConfig ] ] ] = None) -> NodeSet:
         """
         register configured dependnecies level by level. Stack keeps track of a nodeset by name and it's child  configs,
         edge_stack keep tracks a nodeset, and it's child config dependencies. After edge_stack is fully populated,
-        iterate through and register dependencies one by one
+        iterate through and register dependencies one by one.
+
+        Implemented interfaces and handlers are consolidated once before registration, and edge endpoints are resolved
+        through the scenario's tag index, so the cost is linear in the number of edges (edge dataclasses resolve through the
+        :func:`.load_class` cache).
+        :param edges: (nodeset name, edge config) pairs as returned by :meth:`collect_edges`, collected from the scenario
+            config when not given
         :return: the scenario with all dependencies built
         """
-        stack: List[ Tuple[ str , Config ] ] = [ (self.nodeset_config.name , self.nodeset_config) ]
+        if not self._consolidated:
+            self.scenario.consolidate_implemented_interfaces()
+            self.scenario.consolidate_implemented_handlers()
+            self._consolidated = True
+
+        edge_stack = ScenarioBuilder.collect_edges(self.nodeset_config) if edges is None else list(edges)
+        while edge_stack:
+            self.build_edge(*edge_stack.pop())
+
+        for remote in self.scenario.remote_nodesets():
+            remote.wire()
+        return self.scenario
+
+    def build_edge(self , parent_nodeset_name: str , e: EdgeConfig) -> Optional[ Dependency ]:
+        """
+        register one configured dependency
+        :param parent_nodeset_name: name of the nodeset the edge is configured in
+        :return: the dependency, None when the edge is wired by a worker, see :mod:`.remote`
+        """
+        if parent_nodeset_name != self.current_nodeset.name:
+            self.set_current_nodeset(self.scenario.get_nodeset(parent_nodeset_name))
+
+        pred_node = self.scenario.get_child_node_by_tag(e.pred.split(".")[ -1 ])
+        succ_node = self.scenario.get_child_node_by_tag(e.succ.split(".")[ -1 ])
+        edge_dataclass = load_class(e.edge_dataclass)
+        if wire_remote_edge(parent_nodeset_name , e , pred_node , succ_node , edge_dataclass):
+            return None
+
+        dependency = None
+        if e.edge_type.lower() == "event":
+            inbox = None
+            if self.scenario.dispatcher is not None:
+                inbox = self.scenario.dispatcher.inbox(succ_node.name , e.queue_size)
+            dependency = EventDependency(pred_node , succ_node , edge_dataclass , inbox , e.backpressure ,
+                                         bool(e.conflate) , e.conflate_key)
+            self.add_edge(dependency)
+
+        if e.edge_type.lower() == "callable":
+            dependency = CallableDependency(pred_node , succ_node , edge_dataclass , bool(e.cache) ,
+                                            e.cache_size , e.cache_ttl , bool(e.batch) , e.batch_size ,
+                                            e.batch_window)
+            self.add_edge(dependency)
+        return dependency
+
+    @staticmethod
+    def collect_edges(nodeset_config: NodeSetConfig) -> List[ Tuple[ str , EdgeConfig ] ]:
+        """
+        flatten the edge configs of a composite config
+        :param nodeset_config: composite scenario config
+        :return: (name of the nodeset the edge is configured in, edge config) pairs, registered last to first
+        """
+        stack: List[ Tuple[ str , Config ] ] = [ (nodeset_config.name , nodeset_config) ]
         edge_stack: List[ Tuple[ str , EdgeConfig ] ] = [ ]
         while stack:
             parent_nodeset_name , config = stack.pop()
-            if parent_nodeset_name != self.current_nodeset.name:
-                self.current_nodeset = self.scenario.get_nodeset(parent_nodeset_name)
 
             if isinstance(config , NodeSetConfig):
-                if self.scenario.name != config.name:
+                if nodeset_config.name != config.name:
                     parent_nodeset_name = config.name
 
                 for n in config.components:
@@ -223,32 +534,25 @@ class ScenarioBuilder:
                 for e in config.edges:
                     edge_stack.append((parent_nodeset_name , e))
 
-        while edge_stack:
-            parent_nodeset_name , e = edge_stack.pop()
-
-            if parent_nodeset_name != self.current_nodeset.name:
-                self.set_current_nodeset(self.scenario.get_nodeset(parent_nodeset_name))
-
-            pred_node = self.scenario.get_child_node_by_tag(e.pred.split(".")[ -1 ])
-            succ_node = self.scenario.get_child_node_by_tag(e.succ.split(".")[ -1 ])
-            edge_dataclass = load_class(e.edge_dataclass)
-
-            if e.edge_type.lower() == "event":
-                event_dependency = EventDependency(pred_node , succ_node , edge_dataclass)
-                self.add_edge(event_dependency)
-
-            if e.edge_type.lower() == "callable":
-                callable_dependency = CallableDependency(pred_node , succ_node , edge_dataclass)
-                self.add_edge(callable_dependency)
-
-        return self.scenario
+        return edge_stack
 
     def add_edge(self , edge: Dependency):
         """add a dependency to a nodeset"""
-        self.scenario.consolidate_implemented_interfaces()
-        self.scenario.consolidate_implemented_handlers()
         self.current_nodeset.add_edge(edge)
 
+    def deferred_report(self) -> Dict[ str , Any ]:
+        """
+        how much model construction lazy mode deferred
+        :return: ``deferred``: number of nodes built without a model, ``materialized``: how many of them have built it
+            since, ``pending``: names of the nodes still without a model
+        """
+        pending = [ node.name for node in self.scenario.deferred_nodes() ]
+        return {
+            "deferred": self.deferred_count ,
+            "materialized": self.deferred_count - len(pending) ,
+            "pending": pending ,
+        }
+
     # auxiliaries
     def set_current_nodeset(self , nodeset: NodeSet):
         """set current nodeset pointer to the input"""
@@ -274,11 +578,11 @@ class ScenarioBuilder:
 
     def name_check(self , name: str) -> None:
         """check if name is already used"""
-        if name in self.name_stack:
+        if name in self.used_names:
             raise Exception(
                 f"name '{name}' is already used in {cast(NodeSet , self.scenario.get_child_component(name).parent).name}")
         else:
-            self.name_stack.append(name)
+            self.used_names.add(name)
 
     # def build2(self) -> NodeSet:
     #     # not used
@@ -302,6 +606,18 @@ class ScenarioBuilder:
     #     return scenario
 
 
+def build_model(node_class: str , node_config: NodeConfig) -> Any:
+    """build the model of a node in a worker process, through a throwaway instance of its node class"""
+    return load_class(node_class)(node_config).model
+
+
+def detached_config(config: Config) -> Config:
+    """shallow copy of a component config without its parent, so that pickling it does not pickle the whole tree"""
+    out = copy.copy(config)
+    out.parent = None
+    return out
+
+
 class ConfigBuilder:
     """
     ConfigBuilder takes in a yaml file, and returns a composite configuration :class:`.NodeSetConfig`
@@ -315,12 +631,26 @@ class ConfigBuilder:
     COMPONENTS = "components"
     COMPONENT_NAME = "name"
     NODE_CLASS = "nodeClass"
+    OUT_OF_PROCESS = "outOfProcess"
 
     EDGES = "edges"
     EDGE_PRED = "pred"
     EDGE_SUCC = "succ"
     EDGE_TYPE = "edgeType"
     EDGE_CLASS = "edgeClass"
+    EDGE_BACKPRESSURE = "backpressure"
+    EDGE_QUEUE_SIZE = "queueSize"
+    EDGE_TRANSPORT = "transport"
+    EDGE_RING_SIZE = "ringSize"
+    EDGE_OVERFLOW = "overflow"
+    EDGE_CONFLATE = "conflate"
+    EDGE_CONFLATE_KEY = "conflateKey"
+    EDGE_CACHE = "cache"
+    EDGE_CACHE_SIZE = "cacheSize"
+    EDGE_CACHE_TTL = "cacheTtl"
+    EDGE_BATCH = "batch"
+    EDGE_BATCH_SIZE = "batchSize"
+    EDGE_BATCH_WINDOW = "batchWindow"
 
     COMPONENT_CONFIGS = "componentConfigs"
     COMPONENT_CONFIG_NAME = "name"
@@ -329,11 +659,12 @@ class ConfigBuilder:
 
 
     def __init__(self , file_path: str):
-        self.config_dict = self.process_dict(load_yaml(file_path))
+        self.source_files: List[ str ] = [ os.path.realpath(file_path) ]  # root file and every nodesetPath loaded
+        self.config_dict = self.process_dict(load_yaml_cached(file_path))
         self.scenario_config: NodeSetConfig = cast(NodeSetConfig ,
                                                    ConfigBuilder.init_component_config_with_dict(self.config_dict))
         self.current_nodeset_config: NodeSetConfig = self.scenario_config
-        self.name_stack: List[ str ] = list()
+        self.used_names: Set[ str ] = set()
 
     def build(self) -> NodeSetConfig:
         """
@@ -388,7 +719,14 @@ class ConfigBuilder:
             if parent_nodeset_name != self.current_nodeset_config.name:
                 self.set_current_nodeset_config(self.scenario_config.get_nodeset_config(parent_nodeset_name))
 
-            ec = EdgeConfig(e[ self.EDGE_PRED ] , e[ self.EDGE_SUCC ] , e[ self.EDGE_CLASS ] , e[ self.EDGE_TYPE ])
+            ec = EdgeConfig(e[ self.EDGE_PRED ] , e[ self.EDGE_SUCC ] , e[ self.EDGE_CLASS ] , e[ self.EDGE_TYPE ] ,
+                            backpressure=e.get(self.EDGE_BACKPRESSURE) , queue_size=e.get(self.EDGE_QUEUE_SIZE) ,
+                            transport=e.get(self.EDGE_TRANSPORT) , ring_size=e.get(self.EDGE_RING_SIZE) ,
+                            overflow=e.get(self.EDGE_OVERFLOW) , conflate=e.get(self.EDGE_CONFLATE) ,
+                            conflate_key=e.get(self.EDGE_CONFLATE_KEY) , cache=e.get(self.EDGE_CACHE) ,
+                            cache_size=e.get(self.EDGE_CACHE_SIZE) , cache_ttl=e.get(self.EDGE_CACHE_TTL) ,
+                            batch=e.get(self.EDGE_BATCH) , batch_size=e.get(self.EDGE_BATCH_SIZE) ,
+                            batch_window=e.get(self.EDGE_BATCH_WINDOW))
             self.add_edge_config(ec)
 
         return self.scenario_config
@@ -406,29 +744,37 @@ class ConfigBuilder:
         """
         component_configs: List[ Dict[ str , Any ] ] = config_dict.pop(self.COMPONENT_CONFIGS) #component config section
         components: List[ Dict[ str , Any ] ] = config_dict.pop(self.COMPONENTS) # component section
+
+        # group component configs by name, so each component finds its config(s) without scanning the section
+        component_configs_by_name: Dict[ str , List[ Dict[ str , Any ] ] ] = defaultdict(list)
+        for nc in component_configs:
+            component_configs_by_name[ nc[ self.COMPONENT_CONFIG_NAME ] ].append(nc)
+
         for n in components:
-            for nc in component_configs:
-                if n[ self.COMPONENT_NAME] == nc[ self.COMPONENT_CONFIG_NAME ]:
-                    # when component is a node
-                    if self.NODE_CLASS in n.keys():
-                        nc[ self.NODE_CLASS ] = n[ self.NODE_CLASS ]
-
-                    # when component is a nodeset
-                    if self.NODESET_CLASS in n.keys():
-                        # load nodeset details
-                        new_nc = load_yaml(nc[ self.NODESET_PATH ])
-                        try:
-                            new_nc = self.process_dict(new_nc)
-                        except KeyError as exc:
-                            raise KeyError(f"nodeset {new_nc[ 'name' ]} has format issue")
-                        nc.clear()
-
-                        # update nc from new_nc
-                        for key in new_nc:
-                            nc[ key ] = new_nc[ key ]
-                        # align name -> makesure the user defined name is used in the scenario
-                        nc[ self.COMPONENT_NAME ] = n[ self.COMPONENT_NAME ]
-                        nc[ self.NODESET_CLASS ] = n[ self.NODESET_CLASS ]
+            for nc in component_configs_by_name.get(n[ self.COMPONENT_NAME ] , ()):
+                # when component is a node
+                if self.NODE_CLASS in n.keys():
+                    nc[ self.NODE_CLASS ] = n[ self.NODE_CLASS ]
+
+                # when component is a nodeset
+                if self.NODESET_CLASS in n.keys():
+                    # load nodeset details, a sub-scenario file used by many components is parsed only once
+                    new_nc = load_yaml_cached(nc[ self.NODESET_PATH ])
+                    self.source_files.append(os.path.realpath(nc[ self.NODESET_PATH ]))
+                    try:
+                        new_nc = self.process_dict(new_nc)
+                    except KeyError as exc:
+                        raise KeyError(f"nodeset {new_nc[ 'name' ]} has format issue")
+                    nc.clear()
+
+                    # update nc from new_nc
+                    for key in new_nc:
+                        nc[ key ] = new_nc[ key ]
+                    # align name -> makesure the user defined name is used in the scenario
+                    nc[ self.COMPONENT_NAME ] = n[ self.COMPONENT_NAME ]
+                    nc[ self.NODESET_CLASS ] = n[ self.NODESET_CLASS ]
+                    if self.OUT_OF_PROCESS in n:
+                        nc[ self.OUT_OF_PROCESS ] = n[ self.OUT_OF_PROCESS ]
 
         # assign updated component_config to config_dict
         config_dict[ self.COMPONENTS ] = component_configs
@@ -455,10 +801,10 @@ class ConfigBuilder:
         raise KeyError(f"input key does not have nodesetConfig or nodeConfig...{config_dict}")
 
     def name_check(self , name: str):
-        if name in self.name_stack:
+        if name in self.used_names:
             raise Exception(
                 f"name '{name}' is already used in {cast(NodeSet , self.scenario_config.get_child_component_config(name).parent).name}")
         else:
-            self.name_stack.append(name)
+            self.used_names.add(name)
 
 
@@ -0,0 +1,224 @@
+""" Memoizing :class:`.CallableDependency` edges.
+
+By default a callable edge hands the successor the predecessor's interface object itself, every call is computed. A
+caching edge hands it a :class:`CachedInterface` proxy instead: method results are memoized by method name and
+arguments, in a least recently used cache of ``cacheSize`` entries that expire ``cacheTtl`` seconds after they are
+computed:
+
+    .. code-block:: yaml
+
+        edges:
+            - pred: reference
+              succ: strategy
+              edgeType: callable
+              edgeClass: reference.ContractSpecs
+              cache: true
+              cacheSize: 4096
+              cacheTtl: 60
+
+Arguments are bound to the method's signature first, defaults included, so ``spec("ES")``, ``spec("ES", 1)`` and
+``spec(symbol="ES")`` share an entry when ``multiplier`` defaults to 1. Keys are typed, as with
+``functools.lru_cache(typed=True)``: ``spec(1)`` and ``spec(1.0)`` are cached apart, and so are ``True`` and ``1``.
+
+``cacheSize`` or ``cacheTtl`` alone imply ``cache``. Without ``cacheSize`` a cache holds :data:`DEFAULT_CACHE_SIZE`
+entries, without ``cacheTtl`` entries never expire. Only interfaces made of pure lookups should be cached: calls whose
+arguments are not hashable are forwarded uncached, attributes that are not callable are forwarded as they are, and
+exceptions are not cached. An edge batching calls, see :mod:`.callbatch`, cannot cache them: its calls return pending
+results.
+
+The predecessor invalidates the caches of the edges it serves when its data changes, every entry or the ones of a
+method and arguments:
+
+    .. code-block:: python
+
+        class Reference(Node):
+
+            def on_contract_update(self, update):
+                self.model.update(update)
+                self.invalidate_interface_caches("Reference.ContractSpecs" , "spec" , update.symbol)
+
+Counters are available per edge with :meth:`InterfaceCache.stats`, and per scenario with
+:meth:`.NodeSet.interface_cache_stats`.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any , Callable , Dict , Optional , Tuple
+
+# 3rd-party imports
+...
+
+DEFAULT_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+
+Normalizer = Callable[ [ Tuple , Dict[ str , Any ] ] , Tuple[ Tuple , Dict[ str , Any ] ] ]
+
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY , inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def call_key(method: str , args: Tuple , kwargs: Dict[ str , Any ]) -> Tuple:
+    """typed key of a call, args and kwargs as normalized by :func:`call_normalizer`"""
+    key = (method , args , tuple(type(arg) for arg in args))
+    if kwargs:
+        items = tuple(sorted(kwargs.items()))
+        key += (items , tuple(type(value) for _ , value in items))
+    return key
+
+
+def call_normalizer(method: Callable) -> Optional[ Normalizer ]:
+    """
+    function binding the arguments of a call to the method's signature, defaults applied, so that every spelling of a
+    call has the same key. Raises TypeError for arguments the method does not take
+    :return: None when the method has no signature to bind to
+    """
+    try:
+        signature = inspect.signature(method)
+    except (TypeError , ValueError):
+        return None
+    parameters = signature.parameters.values()
+    positional = sum(1 for p in parameters if p.kind in _POSITIONAL)
+    plain = positional == len(parameters)
+
+    def normalize(args: Tuple , kwargs: Dict[ str , Any ]) -> Tuple[ Tuple , Dict[ str , Any ] ]:
+        # every parameter given by position: nothing to bind
+        if plain and not kwargs and len(args) == positional:
+            return args , kwargs
+        bound = signature.bind(*args , **kwargs)
+        bound.apply_defaults()
+        return bound.args , bound.kwargs
+
+    return normalize
+
+
+class InterfaceCache:
+    """
+    LRU cache of the method results of one caching edge
+
+    :param maxsize: number of entries kept, the least recently used one is evicted beyond
+    :param ttl: seconds an entry is valid for after it is computed, entries never expire when not given
+    :param clock: time source of the expiry, seconds
+    """
+
+    def __init__(self , maxsize: Optional[ int ] = None , ttl: Optional[ float ] = None ,
+                 clock: Callable[ [ ] , float ] = time.monotonic):
+        self.maxsize = maxsize or DEFAULT_CACHE_SIZE
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.uncacheable = 0
+        # call key -> (result , expiry time or None)
+        self._entries: OrderedDict[ Tuple , Tuple[ Any , Optional[ float ] ] ] = OrderedDict()
+        # method name -> argument normalizer, of the memoized methods
+        self._normalizers: Dict[ str , Optional[ Normalizer ] ] = dict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memoize(self , name: str , method: Callable) -> Callable:
+        """memoized version of an interface method"""
+        entries , ttl , clock = self._entries , self.ttl , self.clock
+        normalize = self._normalizers[ name ] = call_normalizer(method)
+
+        def cached(*args , **kwargs):
+            if normalize is None:
+                key = call_key(name , args , kwargs)
+            else:
+                try:
+                    key = call_key(name , *normalize(args , kwargs))
+                except TypeError:
+                    # arguments the method does not take, it raises
+                    return method(*args , **kwargs)
+            try:
+                entry = entries.get(key , _MISSING)
+            except TypeError:
+                self.uncacheable += 1
+                return method(*args , **kwargs)
+
+            if entry is not _MISSING:
+                if entry[ 1 ] is None or clock() < entry[ 1 ]:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[ 0 ]
+                del entries[ key ]
+                self.expirations += 1
+
+            self.misses += 1
+            result = method(*args , **kwargs)
+            entries[ key ] = (result , None if ttl is None else clock() + ttl)
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+            return result
+
+        cached.__wrapped__ = method
+        return cached
+
+    def invalidate(self , method: Optional[ str ] = None , *args , **kwargs) -> int:
+        """
+        drop cached results
+        :param method: drop the results of this method only, every result when not given
+        :param args: drop the result of the method called with these arguments only, every result of the method when
+            neither args nor kwargs are given. They are bound to the method's signature as calls are, and match the
+            entry of a call with arguments of the same types only
+        :return: number of entries dropped
+        """
+        if method is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+        elif args or kwargs:
+            normalize = self._normalizers.get(method)
+            if normalize is not None:
+                args , kwargs = normalize(args , kwargs)
+            dropped = 1 if self._entries.pop(call_key(method , args , kwargs) , _MISSING) is not _MISSING else 0
+        else:
+            keys = [ key for key in self._entries if key[ 0 ] == method ]
+            for key in keys:
+                del self._entries[ key ]
+            dropped = len(keys)
+        self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> Dict[ str , Any ]:
+        calls = self.hits + self.misses
+        return {"hits": self.hits , "misses": self.misses , "hit_rate": self.hits / calls if calls else 0.0 ,
+                "size": len(self._entries) , "evictions": self.evictions , "expirations": self.expirations ,
+                "invalidations": self.invalidations , "uncacheable": self.uncacheable}
+
+
+class CachedInterface:
+    """
+    Proxy of a registered interface, method calls are memoized in an :class:`InterfaceCache`. Attributes that are not
+    callable are forwarded as is. A memoized method is stored on the proxy on first access, later calls find it
+    without going through ``__getattr__``.
+
+    :param target: the interface implementation
+    :param cache: cache the method results are kept in
+    """
+
+    def __init__(self , target: Any , cache: InterfaceCache):
+        object.__setattr__(self , "_target" , target)
+        object.__setattr__(self , "_cache" , cache)
+
+    def __getattr__(self , item):
+        attribute = getattr(self._target , item)
+        if not callable(attribute):
+            return attribute
+
+        method = self._cache.memoize(item , attribute)
+        object.__setattr__(self , item , method)
+        return method
+
+    def __setattr__(self , key , value):
+        setattr(self._target , key , value)
+
+    def __repr__(self):
+        return f"CachedInterface({self._target!r})"
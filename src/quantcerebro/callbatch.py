@@ -0,0 +1,268 @@
+""" Batching :class:`.CallableDependency` edges.
+
+A successor calling a predecessor interface in a loop, e.g. pricing each of 500 instruments, pays one Python round-trip
+into the predecessor per call. An interface can declare a vectorized implementation of a method with
+:func:`batch_method`: it receives the positional arguments of many calls at once and returns their results in order:
+
+    .. code-block:: python
+
+        class Pricer(Node, PricingInterface):
+
+            def price(self, instrument):
+                return self.model.price([ instrument ])[ 0 ]
+
+            @batch_method("price")
+            def price_many(self, calls):
+                return self.model.price([ instrument for instrument , in calls ])
+
+A batching edge hands the successor a :class:`BatchingInterface` proxy, calls to a method with a batch implementation
+are collected and dispatched as one call of it. Such a call returns a :class:`PendingResult` instead of the value, its
+:meth:`~PendingResult.result` dispatches the calls collected so far, if not done yet, and returns the value of its own
+call. Collect first, read afterwards:
+
+    .. code-block:: python
+
+        pending = [ pricer.price(instrument) for instrument in instruments ]   # no call to the predecessor yet
+        prices = [ p.result() for p in pending ]                             # one call of price_many
+
+A pending result is awaitable as well. Inside a running asyncio loop, the calls collected within ``batchWindow``
+seconds (0 for the current loop iteration, the default) are dispatched together, callers await their own result.
+
+Collected calls are dispatched as soon as ``batchSize`` of them are waiting as well. Methods without a batch
+implementation and attributes are forwarded as they are. A failing batch call fails every call of the batch. A
+batching edge cannot cache calls as well, see :mod:`.caching`. The edge is declared in the yaml ``edges`` section:
+
+    .. code-block:: yaml
+
+        edges:
+            - pred: pricer
+              succ: strategy
+              edgeType: callable
+              edgeClass: pricing.PricingInterface
+              batch: true
+              batchSize: 512
+
+Counters are available per edge with :meth:`CallBatcher.stats`, and per scenario with
+:meth:`.NodeSet.call_batch_stats`, :meth:`.NodeSet.flush_call_batches` dispatches every collected call of a scenario.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import Any , Callable , Dict , List , Optional , Sequence , Tuple
+
+# 3rd-party imports
+...
+
+BATCH_METHOD_ATTRIBUTE = "__batch_method__"
+
+DEFAULT_MAX_BATCH = 1024
+
+
+def batch_method(method_name: str) -> Callable[ [ Callable ] , Callable ]:
+    """
+    declare that an interface method is the vectorized implementation of another one
+    :param method_name: name of the single call method, the decorated method receives the list of its calls'
+        positional arguments and returns their results in the same order
+    """
+
+    def declare(method: Callable) -> Callable:
+        setattr(method , BATCH_METHOD_ATTRIBUTE , method_name)
+        return method
+
+    return declare
+
+
+def batch_methods(klazz: type) -> Dict[ str , str ]:
+    """single call method name -> name of its batch implementation, of an interface implementation class"""
+    out = dict()
+    for name , attribute in inspect.getmembers(klazz , callable):
+        method_name = getattr(attribute , BATCH_METHOD_ATTRIBUTE , None)
+        if method_name is not None:
+            out[ method_name ] = name
+    return out
+
+
+class PendingResult:
+    """result of a batched call, read with :meth:`result` or awaited"""
+    __slots__ = ("_batch" , "_done" , "_value" , "_error" , "_future")
+
+    def __init__(self , batch: CallBatch):
+        self._batch = batch
+        self._done = False
+        self._value = None
+        self._error: Optional[ BaseException ] = None
+        # created when awaited before the batch is dispatched
+        self._future: Optional[ asyncio.Future ] = None
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self) -> Any:
+        """value of the call, dispatching the collected calls first when they are not yet"""
+        if not self._done:
+            self._batch.flush()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def __await__(self):
+        if not self._done:
+            loop = asyncio.get_running_loop()
+            if self._future is None:
+                self._future = loop.create_future()
+            # a call collected outside the loop is dispatched by it as well
+            self._batch.schedule(loop)
+            yield from self._future
+        return self.result()
+
+    # the future-like protocol CallBatch resolves results with
+    def set_result(self , value: Any) -> None:
+        self._done , self._value = True , value
+        if self._future is not None and not self._future.done():
+            self._future.set_result(None)
+
+    def set_exception(self , error: BaseException) -> None:
+        self._done , self._error = True , error
+        if self._future is not None and not self._future.done():
+            self._future.set_result(None)
+
+    def __repr__(self):
+        return f"PendingResult({self._value!r})" if self._done else "PendingResult(<pending>)"
+
+
+class CallBatch:
+    """
+    Calls of one interface method waiting to be dispatched to its batch implementation
+
+    :param batcher: batcher owning the batch, counters are kept there
+    :param batch_call: the batch implementation
+    """
+
+    def __init__(self , batcher: CallBatcher , batch_call: Callable[ [ List[ Tuple ] ] , Sequence ]):
+        self.batcher = batcher
+        self.batch_call = batch_call
+        self._calls: List[ Tuple ] = [ ]
+        self._results: List[ Any ] = [ ]
+        self._scheduled: Optional[ asyncio.Handle ] = None
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def submit(self , *args , **kwargs) -> PendingResult:
+        if kwargs:
+            raise TypeError(f"batched calls of {self.batch_call.__name__} take positional arguments only")
+
+        result = PendingResult(self)
+        self._calls.append(args)
+        self._results.append(result)
+        self.batcher.calls += 1
+
+        if len(self._calls) >= self.batcher.max_batch:
+            self.flush()
+        else:
+            try:
+                self.schedule(asyncio.get_running_loop())
+            except RuntimeError:
+                pass
+        return result
+
+    def schedule(self , loop: asyncio.AbstractEventLoop) -> None:
+        """have the loop dispatch the collected calls once the batch window ends, unless already scheduled"""
+        if self._scheduled is None and self._calls:
+            window = self.batcher.window
+            self._scheduled = loop.call_soon(self.flush) if not window else loop.call_later(window , self.flush)
+
+    def flush(self) -> int:
+        """
+        dispatch the collected calls as one call of the batch implementation
+        :return: number of calls dispatched
+        """
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        calls , results = self._calls , self._results
+        if not calls:
+            return 0
+        self._calls , self._results = [ ] , [ ]
+
+        batcher = self.batcher
+        batcher.dispatches += 1
+        batcher.largest_batch = max(batcher.largest_batch , len(calls))
+        try:
+            values = self.batch_call(calls)
+            if len(values) != len(calls):
+                raise Exception(f"{self.batch_call.__name__} returned {len(values)} results for {len(calls)} calls")
+        except Exception as exc:
+            for result in results:
+                if not result.done():
+                    result.set_exception(exc)
+            return len(calls)
+
+        for result , value in zip(results , values):
+            if not result.done():
+                result.set_result(value)
+        return len(calls)
+
+
+class CallBatcher:
+    """
+    Collects the calls of one batching edge, see :mod:`.callbatch`
+
+    :param max_batch: calls collected before they are dispatched without waiting
+    :param window: asyncio only: seconds calls are collected for, 0 for the current loop iteration
+    """
+
+    def __init__(self , max_batch: Optional[ int ] = None , window: Optional[ float ] = None):
+        self.max_batch = max_batch or DEFAULT_MAX_BATCH
+        self.window = window or 0.0
+        self.calls = 0
+        self.dispatches = 0
+        self.largest_batch = 0
+        self.batches: Dict[ str , CallBatch ] = dict()
+
+    def batch(self , method_name: str , batch_call: Callable) -> CallBatch:
+        batch = self.batches.get(method_name)
+        if batch is None:
+            batch = self.batches[ method_name ] = CallBatch(self , batch_call)
+        return batch
+
+    def flush(self) -> int:
+        """dispatch every collected call now, :return: number of calls dispatched"""
+        return sum(batch.flush() for batch in self.batches.values())
+
+    def stats(self) -> Dict[ str , Any ]:
+        return {"calls": self.calls , "dispatches": self.dispatches ,
+                "mean_batch": self.calls / self.dispatches if self.dispatches else 0.0 ,
+                "largest_batch": self.largest_batch , "pending": sum(len(b) for b in self.batches.values())}
+
+
+class BatchingInterface:
+    """
+    Proxy of a registered interface, calls of the methods with a batch implementation are collected by a
+    :class:`CallBatcher`, see :mod:`.callbatch`. Other attributes are forwarded as is.
+
+    :param target: the interface implementation
+    :param batcher: batcher the calls are collected by
+    """
+
+    def __init__(self , target: Any , batcher: CallBatcher):
+        object.__setattr__(self , "_target" , target)
+        object.__setattr__(self , "_batcher" , batcher)
+        object.__setattr__(self , "_batch_methods" , batch_methods(type(target)))
+
+    def __getattr__(self , item):
+        batch_name = self._batch_methods.get(item)
+        if batch_name is None:
+            return getattr(self._target , item)
+
+        method = self._batcher.batch(item , getattr(self._target , batch_name)).submit
+        object.__setattr__(self , item , method)
+        return method
+
+    def __setattr__(self , key , value):
+        setattr(self._target , key , value)
+
+    def __repr__(self):
+        return f"BatchingInterface({self._target!r})"
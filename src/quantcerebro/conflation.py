@@ -0,0 +1,146 @@
+""" Conflating :class:`.EventDependency` edges: a slow successor only sees the latest update.
+
+A conflating edge keeps at most one pending update per key for its successor. An update arriving while an older one of
+the same key has not been handled yet replaces it, the replaced update is counted as conflated and never delivered.
+Updates are keyed by a field of the edge dataclass (``conflateKey``, e.g. a symbol), or all together when no key is
+given:
+
+    .. code-block:: yaml
+
+        edges:
+            - pred: feed
+              succ: strategy
+              edgeType: event
+              edgeClass: feeds.Quote
+              conflate: true
+              conflateKey: symbol
+
+* sync dispatch: the handler runs inline, so updates can only arrive while it is busy when it emits (directly or down
+  the graph) into its own edge, or when another thread emits. They are parked while the handler is busy and the
+  latest of each key is delivered once it returns, in the order the keys first arrived
+* asyncio dispatch: the successor's inbox holds a single message per pending key, the update it delivers is the latest
+  one received when the consumer task gets to it
+
+Only the single record path is conflated, :class:`.RecordBatch` blocks of the batch companion event are delivered as
+they are. Counters are available per edge with :meth:`Conflator.stats`, and per scenario with
+:meth:`.NodeSet.conflation_stats`.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import threading
+from dataclasses import fields , is_dataclass
+from typing import Any , Callable , Dict , Optional , Tuple , Type
+
+# Local application/library specific imports.
+from .inbox import NodeInbox , BLOCK , DEFERS_CALL
+
+# 3rd-party imports
+...
+
+_MISSING = object()
+
+
+class Conflator:
+    """
+    Coalesces the updates of one conflating edge, registered to the predecessor event in place of the successor handler
+
+    :param handler: successor event handler
+    :param key: field of the edge dataclass updates are keyed by, every update shares one key when not given
+    :param data_class: edge dataclass, checked to have the key field
+    """
+    # updates are parked while the handler is busy
+    __defers_call__ = True
+
+    def __init__(self , handler: Callable , key: Optional[ str ] = None , data_class: Optional[ Type ] = None):
+        if key is not None and data_class is not None and is_dataclass(data_class) and \
+                key not in {f.name for f in fields(data_class)}:
+            raise Exception(f"conflation key '{key}' is not a field of {data_class.__name__}")
+
+        self.handler = handler
+        self.__wrapped__ = handler
+        self.key = key
+        self.received = 0
+        self.delivered = 0
+        self.conflated = 0
+        # key -> latest update not delivered yet, in the order the keys arrived
+        self._pending: Dict[ Any , Tuple ] = dict()
+        # sync dispatch: held while the handler runs
+        self._busy = threading.Lock()
+
+    def key_of(self , args: Tuple) -> Any:
+        return None if self.key is None else getattr(args[ 0 ] , self.key)
+
+    @property
+    def pending(self) -> int:
+        """number of updates waiting to be delivered"""
+        return len(self._pending)
+
+    def stats(self) -> Dict[ str , int ]:
+        return {"received": self.received , "delivered": self.delivered , "conflated": self.conflated ,
+                "pending": self.pending}
+
+    def _park(self , key: Any , args: Tuple) -> bool:
+        """:return: whether an update of this key was already pending"""
+        replaced = key in self._pending
+        if replaced:
+            self.conflated += 1
+        self._pending[ key ] = args
+        return replaced
+
+    def _deliver(self , args: Tuple) -> Any:
+        self.delivered += 1
+        return self.handler(*args)
+
+    # sync dispatch
+    def __call__(self , *args):
+        self.received += 1
+        if not self._busy.acquire(blocking=False):
+            self._park(self.key_of(args) , args)
+            return
+
+        pending = self._pending
+        while True:
+            try:
+                self._deliver(args)
+                while pending:
+                    self._deliver(pending.pop(next(iter(pending))))
+            finally:
+                self._busy.release()
+            # an update parked by another thread between the last check and the release
+            if not pending or not self._busy.acquire(blocking=False):
+                return
+            args = pending.pop(next(iter(pending)))
+
+    # asyncio dispatch
+    def route(self , inbox: NodeInbox , policy: str = BLOCK) -> Callable:
+        """
+        :return: function to register to the predecessor event, it enqueues one inbox message per pending key
+        """
+
+        def deliver_latest(key: Any):
+            args = self._pending.pop(key , _MISSING)
+            if args is not _MISSING:
+                return self._deliver(args)
+
+        # called by the inbox when it drops the message of a key
+        deliver_latest.discard = lambda key: self._pending.pop(key , None)
+
+        def offer(*args):
+            self.received += 1
+            key = self.key_of(args)
+            if self._park(key , args):
+                return
+            # a key whose message the inbox does not take must not stay pending, its later updates would never be
+            # scheduled
+            try:
+                offered = inbox.offer(deliver_latest , (key ,) , policy)
+            except BaseException:
+                self._pending.pop(key , None)
+                raise
+            if not offered:
+                self._pending.pop(key , None)
+
+        offer.__wrapped__ = self.handler
+        setattr(offer , DEFERS_CALL , True)
+        return offer
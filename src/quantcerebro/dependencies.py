@@ -2,9 +2,19 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Type , Any
+from typing import Type , Any , Optional , Callable
 
-import src.quantcerebro.meta as meta
+from . import meta
+from .inbox import NodeInbox , BLOCK
+from .batch import batch_event_name , is_batch_handler , packing_handler , unpacking_handler
+from .conflation import Conflator
+from .caching import InterfaceCache , CachedInterface
+from .callbatch import CallBatcher , BatchingInterface , batch_methods
+
+
+def edge_event_name(pred_node: meta.PredecessorTemplate , event_data_class: Type) -> str:
+    """name of the event an edge registers on its predecessor: "<predecessor class name>.<dataclass name>" """
+    return ".".join([ pred_node.__class__.__name__ , event_data_class.__name__ ])
 
 
 @dataclass
@@ -13,6 +23,19 @@ class EdgeConfig:
     succ: str
     edge_dataclass: str
     edge_type: str
+    backpressure: Optional[ str ] = None  # asyncio dispatch mode only, see :mod:`.inbox`
+    queue_size: Optional[ int ] = None  # asyncio dispatch mode only, see :mod:`.inbox`
+    transport: Optional[ str ] = None  # edges crossing a process boundary only, see :mod:`.transport`
+    ring_size: Optional[ int ] = None  # shm transport only, see :mod:`.transport`
+    overflow: Optional[ str ] = None  # shm transport only, see :mod:`.transport`
+    conflate: Optional[ bool ] = None  # event edges only, see :mod:`.conflation`
+    conflate_key: Optional[ str ] = None  # event edges only, implies conflate, see :mod:`.conflation`
+    cache: Optional[ bool ] = None  # callable edges only, see :mod:`.caching`
+    cache_size: Optional[ int ] = None  # callable edges only, implies cache, see :mod:`.caching`
+    cache_ttl: Optional[ float ] = None  # callable edges only, implies cache, see :mod:`.caching`
+    batch: Optional[ bool ] = None  # callable edges only, see :mod:`.callbatch`
+    batch_size: Optional[ int ] = None  # callable edges only, implies batch, see :mod:`.callbatch`
+    batch_window: Optional[ float ] = None  # callable edges only, implies batch, see :mod:`.callbatch`
 
 
 @dataclass(frozen=True)
@@ -27,40 +50,130 @@ class Dependency:
     def register_dependency(self) -> None:
         raise NotImplementedError
 
+    def unregister_dependency(self) -> None:
+        """undo :meth:`register_dependency`, the predecessor's events are kept"""
+        raise NotImplementedError
+
 
 @dataclass(frozen=True)
 class EventDependency(Dependency):
+    """
+    :param inbox: successor's inbox in asyncio dispatch mode, the handler is then invoked by the inbox consumer task
+    :param backpressure: policy applied when the inbox is full
+    :param conflate: deliver only the latest pending update to the successor, see :mod:`.conflation`
+    :param conflate_key: edge dataclass field updates are conflated by, implies conflate
+    """
     event_data_class: Any
+    inbox: Optional[ NodeInbox ] = None
+    backpressure: Optional[ str ] = None
+    conflate: bool = False
+    conflate_key: Optional[ str ] = None
+
+    @property
+    def conflator(self) -> Optional[ Conflator ]:
+        """conflator of a conflating edge, set at registration"""
+        return self.__dict__.get("_conflator")
 
     def register_dependency(self):
 
         # event_name = self.event_data_class.__name__
-        event_name = ".".join([ self.pred_node.__class__.__name__ , self.event_data_class.__name__ ])
+        event_name = edge_event_name(self.pred_node , self.event_data_class)
 
         if event_name not in self.pred_node.registered_events:
             self.logger.info(f"event<{event_name}> doesn't exist, create event")
             self.pred_node.add_event(self.pred_node.name , event_name)
 
+        # every event has a batch companion, see :mod:`.batch`
+        batch_name = batch_event_name(event_name)
+        if batch_name not in self.pred_node.registered_events:
+            self.pred_node.add_event(self.pred_node.name , batch_name)
+
         # register child handler to parent event
         try:
             succ_handler = self.succ_node.implemented_event_handlers[ event_name ]
-            self.pred_node.register_handler_to_event(self.pred_node.name , event_name , succ_handler)
         except KeyError as exc:
             raise exc
 
+        if is_batch_handler(succ_handler):
+            record_handler = packing_handler(succ_handler , self.event_data_class)
+            block_handler = succ_handler
+        else:
+            record_handler = succ_handler
+            block_handler = unpacking_handler(succ_handler)
+
+        if self.conflate or self.conflate_key:
+            conflator = Conflator(record_handler , self.conflate_key , self.event_data_class)
+            object.__setattr__(self , "_conflator" , conflator)
+            record_handler = conflator if self.inbox is None else conflator.route(self.inbox ,
+                                                                                   self.backpressure or BLOCK)
+        elif self.inbox is not None:
+            record_handler = self.inbox.route(record_handler , self.backpressure or BLOCK)
+        if self.inbox is not None:
+            block_handler = self.inbox.route(block_handler , self.backpressure or BLOCK)
+
+        self.pred_node.register_handler_to_event(self.pred_node.name , event_name , record_handler)
+        self.pred_node.register_handler_to_event(self.pred_node.name , batch_name , block_handler)
+        object.__setattr__(self , "_handlers" , ((event_name , record_handler) , (batch_name , block_handler)))
+
         self.logger.info(f"{self.succ_node.name}'s handler<{event_name}> "
                          f"is registered to {self.pred_node.name}")
 
+    def unregister_dependency(self):
+        for event_name , handler in self.__dict__.get("_handlers" , ()):
+            self.pred_node.unregister_handler_from_event(self.pred_node.name , event_name , handler)
+        object.__setattr__(self , "_handlers" , ())
+
 
 @dataclass(frozen=True)
 class CallableDependency(Dependency):
+    """
+    :param cache: hand the successor a memoizing proxy of the interface, see :mod:`.caching`
+    :param cache_size: number of results the proxy keeps, implies cache
+    :param cache_ttl: seconds a result is valid for, implies cache
+    :param batch: hand the successor a batching proxy of the interface, see :mod:`.callbatch`
+    :param batch_size: calls collected before they are dispatched, implies batch
+    :param batch_window: asyncio only, seconds calls are collected for, implies batch
+    """
     interface_data_class: Type
+    cache: bool = False
+    cache_size: Optional[ int ] = None
+    cache_ttl: Optional[ float ] = None
+    batch: bool = False
+    batch_size: Optional[ int ] = None
+    batch_window: Optional[ float ] = None
+
+    @property
+    def interface_cache(self) -> Optional[ InterfaceCache ]:
+        """cache of a caching edge, set at registration"""
+        return self.__dict__.get("_interface_cache")
+
+    @property
+    def call_batcher(self) -> Optional[ CallBatcher ]:
+        """batcher of a batching edge, set at registration"""
+        return self.__dict__.get("_call_batcher")
 
     def register_dependency(self):
         # interface_name = self.interface_data_class.__name__
         interface_name = ".".join([ self.pred_node.__class__.__name__ , self.interface_data_class.__name__ ])
+        batching = bool(self.batch or self.batch_size or self.batch_window)
+        if batching and (self.cache or self.cache_size or self.cache_ttl):
+            # the cache would keep the pending result of a batched call, not its value
+            raise Exception(f"callable edge {self.pred_node.name} -> {self.succ_node.name} ({interface_name}) cannot "
+                            f"both cache and batch calls")
         try:
             pred_interface = self.pred_node.implemented_interfaces[ interface_name ]
+            if batching:
+                if not batch_methods(type(pred_interface)):
+                    self.logger.warning(f"{interface_name} of {self.pred_node.name} has no batch method, "
+                                        f"calls from {self.succ_node.name} are not batched")
+                batcher = CallBatcher(self.batch_size , self.batch_window)
+                object.__setattr__(self , "_call_batcher" , batcher)
+                pred_interface = BatchingInterface(pred_interface , batcher)
+            if self.cache or self.cache_size or self.cache_ttl:
+                cache = InterfaceCache(self.cache_size , self.cache_ttl)
+                object.__setattr__(self , "_interface_cache" , cache)
+                self.pred_node.interface_caches.setdefault(interface_name , [ ]).append(cache)
+                pred_interface = CachedInterface(pred_interface , cache)
             self.succ_node.register_interface_to_node(self.succ_node.name , interface_name , pred_interface)
         except KeyError as exc:
             raise exc
@@ -68,3 +181,10 @@ class CallableDependency(Dependency):
         self.logger.info(
             f"{self.succ_node}'s implemented_interface<{interface_name}> "
             f"is registered to {self.pred_node.name}")
+
+    def unregister_dependency(self):
+        interface_name = ".".join([ self.pred_node.__class__.__name__ , self.interface_data_class.__name__ ])
+        self.succ_node.registered_interfaces.pop(interface_name , None)
+        caches = self.pred_node.interface_caches.get(interface_name , [ ])
+        if self.interface_cache in caches:
+            caches.remove(self.interface_cache)
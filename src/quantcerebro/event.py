@@ -2,12 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from collections import defaultdict
-from typing import Dict , Callable , Union , Optional
+from typing import Dict , Callable , Union , Optional , List
 
 from eventkit import Event , Op
 
-from .utils import Singleton
-
 # Event and Event Operation wthin Node
 NodeEvent = Event
 NodeEventOp = Op
@@ -22,18 +20,62 @@ class GraphEvent(Event):
         super().__init__(name , _with_error_done_events)
 
 
-class GraphEventEmitter(metaclass=Singleton):
+class GraphEventEmitter:
     """
-    A very basic realisation of NodeJS's event emitter to keep track of GraphEvents
+    A very basic realisation of NodeJS's event emitter to keep track of GraphEvents.
+
+    Every scenario owns one emitter, shared by all of its components (see :meth:`.NodeSet.add_child`), so scenarios
+    built in the same process have isolated event namespaces.
     """
-    events: Dict[ str , Union[ GraphEvent , Op ] ] = defaultdict(GraphEvent)
+
+    def __init__(self):
+        self.events: Dict[ str , Union[ GraphEvent , Op ] ] = defaultdict(GraphEvent)
+        # listeners connected through add_listener, in connection order, see :mod:`.dispatch`
+        self.listeners: Dict[ str , List[ Callable ] ] = defaultdict(list)
+        # called with (name , event) for every event created or set, see :mod:`.recording`
+        self.taps: List[ Callable ] = [ ]
+        # bumped whenever events or listeners change, a compiled dispatch plan is stale once it moved on
+        self.version = 0
+
+    def absorb(self , other: GraphEventEmitter):
+        """take over the events (and their listeners) of another emitter, events already known by name are kept"""
+        if other is self:
+            return
+        for name , event in other.events.items():
+            if name not in self.events:
+                self.events[ name ] = event
+                if name in other.listeners:
+                    self.listeners[ name ] = other.listeners[ name ]
+                self.version += 1
 
     def create_event(self , name: str):
         self.events[ name ] = GraphEvent(name)
+        self.listeners[ name ] = [ ]
+        self.version += 1
+        for tap in self.taps:
+            tap(name , self.events[ name ])
 
     def add_listener(self , name: str , listener: Callable , error_callback: Optional[ Callable ] = None ,
                      done_callback: Optional[ Callable ] = None):
         self.events[ name ].connect(listener , error_callback , done_callback)
+        self.listeners[ name ].append(listener)
+        self.version += 1
+
+    def remove_listener(self , name: str , listener: Callable):
+        self.events[ name ].disconnect(listener)
+        if listener in self.listeners[ name ]:
+            self.listeners[ name ].remove(listener)
+            self.version += 1
+
+    def set_listeners(self , name: str , listeners: List[ Callable ]):
+        """replace the listeners of an event, in order"""
+        event = self.events[ name ]
+        for listener in self.listeners[ name ]:
+            event.disconnect(listener)
+        for listener in listeners:
+            event.connect(listener)
+        self.listeners[ name ] = list(listeners)
+        self.version += 1
 
     def emit(self , name: str , *args):
         self.events[ name ].emit(*args)
@@ -48,6 +90,10 @@ class GraphEventEmitter(metaclass=Singleton):
 
     def set_event(self , name: str , event: Union[ GraphEvent , Op ]):
         self.events[ name ] = event
+        self.listeners[ name ] = [ ]
+        self.version += 1
+        for tap in self.taps:
+            tap(name , event)
 
     def get_event(self , event_name: str) -> GraphEvent:
         return self.events[ event_name ]
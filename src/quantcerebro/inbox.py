@@ -0,0 +1,278 @@
+""" Asyncio dispatch mode for :class:`.EventDependency` edges.
+
+In the default (sync) mode a predecessor's emit calls every successor handler before returning, so one slow handler
+stalls the producer and every other listener of the event. In asyncio mode each successor node owns a bounded
+:class:`NodeInbox` drained by its own consumer task: an emit only enqueues ``(handler, args)`` and returns.
+
+What happens when an inbox is full is decided per edge, by the ``backpressure`` key of the yaml ``edges`` section:
+
+* ``block`` (default): nothing is lost while producers drain. The message is parked in FIFO order behind the inbox,
+  and producers that want to be throttled ``await`` :meth:`AsyncDispatcher.drain`, which returns once no inbox has
+  parked messages (in the spirit of :meth:`asyncio.StreamWriter.drain`). An emit cannot wait, so parking is bounded
+  too: once ``max_parked`` messages are parked (as many as the inbox holds by default) further messages are dropped
+  instead of growing the backlog. The emit cannot raise either, eventkit logs and swallows listener errors, so such
+  an overflow is counted as dropped, logged once, and raised by the next :meth:`AsyncDispatcher.drain`: a producer
+  that drains between emits loses nothing
+* ``drop-oldest``: the oldest queued message is discarded to make room
+* ``drop-newest``: the incoming message is discarded
+
+An inbox therefore holds at most ``maxsize + max_parked`` messages, twice its size by default, each keeping a
+reference to the arguments of its emit. A node has a single inbox for all its incoming edges, see
+:meth:`AsyncDispatcher.inbox`.
+
+Handlers may be plain functions or coroutine functions. Emits must happen on the event loop thread.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections import deque
+from typing import Callable , Deque , Dict , Optional , Tuple , Any , List
+
+# 3rd-party imports
+...
+
+BLOCK = "block"
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+BACKPRESSURE_POLICIES = (BLOCK , DROP_OLDEST , DROP_NEWEST)
+
+DEFAULT_INBOX_SIZE = 1024
+
+# set on the listeners that keep the arguments of a call to invoke the handler after they return: inbox routes and
+# conflators. Records read in place from a shared memory ring are copied for them, see :mod:`.transport`
+DEFERS_CALL = "__defers_call__"
+
+logger = logging.getLogger(__name__)
+
+
+def defers_call(listener: Callable) -> bool:
+    """whether a listener, or a listener it wraps, may keep its arguments after it returns"""
+    while listener is not None:
+        if getattr(listener , DEFERS_CALL , False):
+            return True
+        listener = getattr(listener , "__wrapped__" , None)
+    return False
+
+
+class NodeInbox:
+    """
+    Bounded inbox of a successor node, drained by one consumer task (:meth:`run`)
+
+    :param name: name of the node owning the inbox
+    :param maxsize: number of queued messages before the backpressure policy applies
+    :param max_parked: number of messages the ``block`` policy parks before an emit raises, maxsize when not given
+    """
+
+    def __init__(self , name: str , maxsize: int = DEFAULT_INBOX_SIZE , max_parked: Optional[ int ] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_parked = max_parked
+        self.delivered = 0
+        self.dropped = 0
+        # error of the first block overflow since the last drain, raised by drain()
+        self._overflow: Optional[ Exception ] = None
+        self._items: Deque[ Tuple[ Callable , Tuple ] ] = deque()
+        self._parked: Deque[ Tuple[ Callable , Tuple ] ] = deque()
+        self._busy = False
+        # created by start(), inside the running loop
+        self._wakeup: Optional[ asyncio.Event ] = None
+        self._idle: Optional[ asyncio.Event ] = None
+        self._unparked: Optional[ asyncio.Event ] = None
+
+    @property
+    def depth(self) -> int:
+        """number of messages waiting, including parked ones"""
+        return len(self._items) + len(self._parked)
+
+    def route(self , handler: Callable , policy: str = BLOCK) -> Callable:
+        """
+        wrap a handler so that calling the wrapper enqueues the call into this inbox
+        :param handler: successor event handler
+        :param policy: backpressure policy of the edge
+        :return: function to register to the predecessor event in place of the handler
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"unknown backpressure policy '{policy}', expected one of {BACKPRESSURE_POLICIES}")
+
+        def deliver(*args):
+            self.offer(handler , args , policy)
+
+        deliver.__wrapped__ = handler
+        setattr(deliver , DEFERS_CALL , True)
+        return deliver
+
+    def offer(self , handler: Callable , args: Tuple , policy: str = BLOCK) -> bool:
+        """
+        enqueue a call without waiting
+        :return: False when the message was dropped, including by a ``block`` overflow, see :meth:`drain`
+        """
+        if len(self._items) < self.maxsize and not self._parked:
+            self._items.append((handler , args))
+        elif policy == DROP_NEWEST:
+            self.dropped += 1
+            return False
+        elif policy == DROP_OLDEST:
+            if self._items:
+                self._discard(*self._items.popleft())
+                self.dropped += 1
+            self._items.append((handler , args))
+        else:
+            max_parked = self.maxsize if self.max_parked is None else self.max_parked
+            if len(self._parked) >= max_parked:
+                self.dropped += 1
+                if self._overflow is None:
+                    self._overflow = Exception(f"inbox of node '{self.name}' is full: {len(self._items)} queued and "
+                                               f"{len(self._parked)} parked messages, messages were dropped, await "
+                                               f"the dispatcher's drain() between emits")
+                    logger.warning(str(self._overflow))
+                return False
+            self._parked.append((handler , args))
+            if self._unparked is not None:
+                self._unparked.clear()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._idle.clear()
+        return True
+
+    @staticmethod
+    def _discard(handler: Callable , args: Tuple) -> None:
+        # a dropped conflated message frees its key, see :mod:`.conflation`
+        discard = getattr(handler , "discard" , None)
+        if discard is not None:
+            discard(*args)
+
+    def start(self) -> asyncio.Task:
+        """create the consumer task in the running loop"""
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._unparked = asyncio.Event()
+        if self._items:
+            self._wakeup.set()
+        else:
+            self._idle.set()
+        if not self._parked:
+            self._unparked.set()
+        return asyncio.get_running_loop().create_task(self.run() , name=f"inbox-{self.name}")
+
+    async def run(self) -> None:
+        """consume messages until cancelled"""
+        while True:
+            if not self._items:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            handler , args = self._items.popleft()
+            if self._parked:
+                self._items.append(self._parked.popleft())
+                if not self._parked:
+                    self._unparked.set()
+
+            self._busy = True
+            try:
+                result = handler(*args)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"handler {handler} of node {self.name} failed on {args}")
+            finally:
+                self._busy = False
+            self.delivered += 1
+
+            # let producers and the other consumers run between two messages
+            await asyncio.sleep(0)
+
+    async def drain(self) -> None:
+        """
+        wait until no message is parked behind this inbox, raises when ``block`` messages were dropped since the last
+        drain
+        """
+        self.check_overflow()
+        await self._unparked.wait()
+
+    def check_overflow(self) -> None:
+        """raise, once, the overflow of the ``block`` policy that dropped messages since the last check"""
+        overflow , self._overflow = self._overflow , None
+        if overflow is not None:
+            raise overflow
+
+    async def join(self) -> None:
+        """wait until every queued message is handled"""
+        while self.depth or self._busy:
+            await self._idle.wait()
+
+
+class AsyncDispatcher:
+    """
+    Owns the inboxes and consumer tasks of a scenario built in asyncio dispatch mode, available as
+    ``scenario.dispatcher``. Call :meth:`start` from a coroutine before emitting.
+
+    :param default_maxsize: inbox size when no edge into the node sets ``queueSize``
+    :param max_parked: messages each inbox parks before an emit raises, see :class:`NodeInbox`
+    """
+
+    def __init__(self , default_maxsize: int = DEFAULT_INBOX_SIZE , max_parked: Optional[ int ] = None):
+        self.default_maxsize = default_maxsize
+        self.max_parked = max_parked
+        self.inboxes: Dict[ str , NodeInbox ] = dict()
+        self._tasks: List[ asyncio.Task ] = [ ]
+
+    def inbox(self , node_name: str , maxsize: Optional[ int ] = None) -> NodeInbox:
+        """
+        get the inbox of a node, creating it on first use. A node has a single inbox for all its incoming edges, its
+        size is the largest ``queueSize`` configured on them, and the edges' backpressure policies apply to the
+        messages of every edge once it is full.
+        """
+        inbox = self.inboxes.get(node_name)
+        if inbox is None:
+            inbox = self.inboxes[ node_name ] = NodeInbox(node_name , maxsize or self.default_maxsize ,
+                                                          self.max_parked)
+        elif maxsize is not None and maxsize > inbox.maxsize:
+            inbox.maxsize = maxsize
+        return inbox
+
+    def start(self) -> None:
+        """start one consumer task per inbox in the running loop"""
+        if self._tasks:
+            raise Exception("dispatcher already started")
+        self._tasks = [ inbox.start() for inbox in self.inboxes.values() ]
+
+    async def drain(self) -> None:
+        """
+        wait until no inbox has parked messages, producers await this to honour ``block`` backpressure. Raises when an
+        inbox dropped ``block`` messages since the last drain, see :meth:`check_overflow`
+        """
+        self.check_overflow()
+        for inbox in self.inboxes.values():
+            await inbox.drain()
+
+    def check_overflow(self) -> None:
+        """raise when an inbox dropped ``block`` messages since the last check, without waiting"""
+        for inbox in self.inboxes.values():
+            inbox.check_overflow()
+
+    async def join(self) -> None:
+        """wait until every inbox is empty and idle"""
+        for inbox in self.inboxes.values():
+            await inbox.join()
+
+    async def stop(self) -> None:
+        """cancel the consumer tasks, queued messages are kept"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks , return_exceptions=True)
+        self._tasks = [ ]
+
+    def queue_depths(self) -> Dict[ str , int ]:
+        """node name -> number of waiting messages"""
+        return {name: inbox.depth for name , inbox in self.inboxes.items()}
+
+    def stats(self) -> Dict[ str , Dict[ str , Any ] ]:
+        """node name -> depth, delivered and dropped message counts"""
+        return {name: {"depth": inbox.depth , "delivered": inbox.delivered , "dropped": inbox.dropped}
+                for name , inbox in self.inboxes.items()}
@@ -10,6 +10,7 @@ from importlib import import_module
 from typing import Optional , Dict , Any , Callable , TypeVar
 
 GraphEventEmitter = TypeVar("GraphEventEmitter")
+Profiler = TypeVar("Profiler")
 GraphEvent = TypeVar("GraphEvent")
 NodeSet = TypeVar("NodeSet")
 
@@ -131,6 +132,18 @@ class ScenarioComponent(PredecessorTemplate , SuccessorTemplate):
         """ get a child nodeset by name """
         raise NotImplementedError
 
+    def bind_event_emitter(self , emitter: GraphEventEmitter) -> None:
+        """ share the event emitter of the scenario the component is attached to """
+        raise NotImplementedError
+
+    @property
+    def profiler(self) -> Optional[ Profiler ]:
+        """ profiler of the scenario the component is attached to, set on the root nodeset, see :mod:`.profiling` """
+        component = self
+        while component.parent is not None:
+            component = component.parent
+        return getattr(component , "_profiler" , None)
+
 
 @dataclass
 class Config:
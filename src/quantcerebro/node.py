@@ -4,13 +4,19 @@
 # standard lib imports
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Dict , TypeVar , Optional
+from typing import Dict , TypeVar , Optional , Iterator , List
 
 # Local application/library specific imports.
+from .batch import RecordBatch , batch_event_name
+from .caching import InterfaceCache
 from .event import GraphEventEmitter , GraphEvent
 from .meta import ScenarioComponent , ImplementedInterfaceType , RegisteredInterfaceType , ImplementedHandlerType , \
     Config
+from .profiling import is_profiled
 
 # 3rd-party imports
 ...
@@ -18,8 +24,81 @@ from .meta import ScenarioComponent , ImplementedInterfaceType , RegisteredInter
 ModelType = TypeVar("ModelType")
 NodeSet = TypeVar("NodeSet")
 
+# when set, nodes constructed in the current context defer init_model, see deferred_models
+_defer_model: ContextVar[ bool ] = ContextVar("defer_model" , default=False)
+
+
+@contextmanager
+def deferred_models(enabled: bool = True) -> Iterator[ None ]:
+    """
+    within this context, :class:`Node` construction does not call ``init_model``, the node's model is a
+    :class:`DeferredModel` placeholder instead
+    """
+    token = _defer_model.set(enabled)
+    try:
+        yield
+    finally:
+        _defer_model.reset(token)
+
+
+class DeferredModel:
+    """
+    Placeholder for a model whose construction is deferred. The first attribute access (or call) builds the model
+    through :meth:`Node.materialize_model`, which also replaces the placeholder on the node, and forwards to it.
+    Handlers and interfaces that use ``self.model`` therefore build it on their first invocation.
+
+    Truth value, container protocol (``len``, iteration, indexing, ``in``) and ``isinstance`` checks are forwarded as
+    well, and build the model. A placeholder kept after the model is built keeps forwarding to it. Other special
+    methods (arithmetic, comparison, hashing, context manager) are not, and ``type()`` of the placeholder is
+    :class:`DeferredModel`: read ``node.model`` again, or call :meth:`Node.materialize_model`, to get the model itself.
+    """
+    __slots__ = ("_node" ,)
+
+    def __init__(self , node: Node):
+        object.__setattr__(self , "_node" , node)
+
+    def __getattr__(self , item):
+        return getattr(self._node.materialize_model() , item)
+
+    def __setattr__(self , key , value):
+        setattr(self._node.materialize_model() , key , value)
+
+    def __call__(self , *args , **kwargs):
+        return self._node.materialize_model()(*args , **kwargs)
+
+    # isinstance() checks the type first, so isinstance(placeholder , DeferredModel) does not build the model
+    @property
+    def __class__(self):
+        return type(self._node.materialize_model())
+
+    def __bool__(self):
+        return bool(self._node.materialize_model())
+
+    def __len__(self):
+        return len(self._node.materialize_model())
+
+    def __iter__(self):
+        return iter(self._node.materialize_model())
+
+    def __getitem__(self , key):
+        return self._node.materialize_model()[ key ]
+
+    def __setitem__(self , key , value):
+        self._node.materialize_model()[ key ] = value
+
+    def __contains__(self , item):
+        return item in self._node.materialize_model()
+
+    def __repr__(self):
+        return f"DeferredModel(node={self._node.name})"
+
 
 class Node(ScenarioComponent):
+    # executor kind used for init_model when the scenario is built in parallel: "thread" or "process". A process built
+    # model must be picklable, and is built by a throwaway instance of the node class in the worker.
+    model_executor: str = "thread"
+    # whether clones of the scenario share this node's model while the node config is unchanged, see clone_model
+    share_model: bool = False
 
     def __init__(self , node_config: NodeConfig):
         super(Node , self).__init__()
@@ -28,7 +107,10 @@ class Node(ScenarioComponent):
         self._imp_handler_map = None
         self._emitter = GraphEventEmitter()
         self._reg_interfaces = dict()
-        self.model: ModelType = self.init_model()
+        # caches of the caching edges this node's interfaces are served through, by interface name
+        self._interface_caches: Dict[ str , List[ InterfaceCache ] ] = dict()
+        self._model_lock = threading.Lock()
+        self.model: ModelType = DeferredModel(self) if _defer_model.get() else self.init_model()
 
     @property
     def name(self) -> str:
@@ -62,15 +144,48 @@ class Node(ScenarioComponent):
     def registered_interfaces(self) -> RegisteredInterfaceType:
         return self._reg_interfaces
 
+    @property
+    def interface_caches(self) -> Dict[ str , List[ InterfaceCache ] ]:
+        return self._interface_caches
+
+    @property
+    def model_deferred(self) -> bool:
+        """whether the model is still a :class:`DeferredModel` placeholder"""
+        return isinstance(self.model , DeferredModel)
+
     def init_model(self, *args) -> ModelType:
         raise NotImplementedError
 
+    def materialize_model(self) -> ModelType:
+        """build the model now if its construction was deferred, and return it"""
+        if isinstance(self.model , DeferredModel):
+            with self._model_lock:
+                if isinstance(self.model , DeferredModel):
+                    self.model = self.init_model()
+        return self.model
+
+    def clone_model(self , source: Node) -> ModelType:
+        """
+        model of this node in a clone of the scenario ``source`` belongs to, see :meth:`.NodeSet.clone`. The model of
+        ``source`` is shared when :attr:`share_model` is set and the node config is unchanged, it is built by
+        ``init_model`` otherwise. Override to share the immutable part of the model only, e.g. reference tables loaded
+        by ``source``, and build the part the config overrides change.
+        :param source: the node of the scenario being cloned
+        """
+        if self.share_model and self.node_config == source.node_config:
+            return source.materialize_model()
+        return self.init_model()
+
     def is_nodeset(self) -> bool:
         return False
 
     def get_nodeset(self , name: Optional[ str ] = None) -> NodeSet:
         raise NotImplementedError
 
+    def bind_event_emitter(self , emitter: GraphEventEmitter) -> None:
+        emitter.absorb(self._emitter)
+        self._emitter = emitter
+
     def add_event(self , node_name: str , event_name: str):
         if self.name == node_name:
             self.event_emitter.create_event(event_name)
@@ -86,16 +201,55 @@ class Node(ScenarioComponent):
 
     def register_interface_to_node(self , node_name: str , interface_name: str , interface):
         if self.name == node_name:
+            profiler = self.profiler
+            if profiler is not None:
+                interface = profiler.wrap_interface(interface_name , interface)
             self.registered_interfaces[ interface_name ] = interface
 
+    def invalidate_interface_caches(self , interface_name: Optional[ str ] = None , method: Optional[ str ] = None ,
+                                    *args , **kwargs) -> int:
+        """
+        drop results cached by the caching edges this node's interfaces are served through, see :mod:`.caching`
+        :param interface_name: interface whose caches are invalidated, every interface when not given
+        :param method: with args and kwargs, the results to drop, see :meth:`.InterfaceCache.invalidate`
+        :return: number of entries dropped
+        """
+        caches = self._interface_caches.values() if interface_name is None else \
+            [ self._interface_caches.get(interface_name , [ ]) ]
+        return sum(cache.invalidate(method , *args , **kwargs) for edge_caches in caches for cache in edge_caches)
+
     def register_handler_to_event(self , node_name: str , event_name , handler):
         if self.name == node_name:
+            profiler = self.profiler
+            if profiler is not None:
+                handler = profiler.wrap_handler(event_name , handler)
             self.event_emitter.add_listener(event_name , handler)
 
+    def unregister_handler_from_event(self , node_name: str , event_name: str , handler) -> bool:
+        """
+        remove a handler registered with :meth:`register_handler_to_event`, looking through the profiling wrapper
+        :return: whether the handler was registered
+        """
+        if self.name == node_name:
+            emitter = self.event_emitter
+            for listener in emitter.listeners.get(event_name , [ ]):
+                unwrapped = listener
+                while is_profiled(unwrapped):
+                    unwrapped = unwrapped.__wrapped__
+                if unwrapped == handler:
+                    emitter.remove_listener(event_name , listener)
+                    return True
+        return False
+
     def notify_handlers(self , node_name: str , event_name: str , *msg):
         if self.name == node_name:
             self.event_emitter.get_event(event_name).emit(*msg)
 
+    def notify_handlers_batch(self , node_name: str , event_name: str , batch: RecordBatch):
+        """ for a event of node, notify a block of records to it's registered handlers, see :mod:`.batch` """
+        if self.name == node_name:
+            self.event_emitter.get_event(batch_event_name(event_name)).emit(batch)
+
     def consolidate_implemented_handlers(self):
         """keep implemented handlers into one dictionary"""
         self._imp_handler_map = dict()
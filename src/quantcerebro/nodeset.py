@@ -4,14 +4,19 @@
 # standard lib imports
 from __future__ import annotations
 
-from dataclasses import dataclass , field
+import copy
+from dataclasses import dataclass , field , fields
 from typing import Optional , Dict , Any , List , cast
 
 # Local application/library specific imports.
+from .batch import RecordBatch
+from .dispatch import DispatchPlan , compile_dispatch_plan
 from .node import Node
-from .dependencies import Dependency , EdgeConfig
-from .event import GraphEvent
+from .dependencies import Dependency , EdgeConfig , EventDependency , CallableDependency
+from .event import GraphEvent , GraphEventEmitter
+from .inbox import AsyncDispatcher
 from .meta import ScenarioComponent , Config
+from .profiling import Profiler , ProfiledInterface , is_profiled
 
 # 3rd-party imports
 ...
@@ -24,6 +29,16 @@ class NodeSet(ScenarioComponent):
         self.nodeset_config = nodeset_config
         self.children: List[ ScenarioComponent ] = list()
         self.edges = list()
+        # shared by every descendant, the root's emitter is the event namespace of the whole scenario
+        self._emitter = GraphEventEmitter()
+        # indexes over every descendant, kept up to date by add_child / remove_child
+        self._node_index: Dict[ str , Node ] = dict()
+        self._tag_index: Dict[ str , Node ] = dict()
+        self._nodeset_index: Dict[ str , NodeSet ] = dict()
+        # set by the builder on the root nodeset in asyncio dispatch mode
+        self.dispatcher: Optional[ AsyncDispatcher ] = None
+        # set on the root nodeset by enable_profiling, see :attr:`.ScenarioComponent.profiler`
+        self._profiler: Optional[ Profiler ] = None
 
     @property
     def name(self) -> str:
@@ -38,12 +53,12 @@ class NodeSet(ScenarioComponent):
         return None
 
     @property
-    def event_emitter(self) -> Optional[ Dict[ str , Any ] ]:
-        return None
+    def event_emitter(self) -> GraphEventEmitter:
+        return self._emitter
 
     @property
-    def registered_events(self) -> Optional[ Dict[ str , GraphEvent ] ]:
-        return None
+    def registered_events(self) -> Dict[ str , GraphEvent ]:
+        return self._emitter.events
 
     @property
     def registered_interfaces(self) -> Optional[ Dict[ str , Any ] ]:
@@ -57,19 +72,15 @@ class NodeSet(ScenarioComponent):
     def get_nodeset(self , name: Optional[ str ] = None) -> NodeSet:
         if (name is None) or (name == self.name):
             return self
-        else:
-            stack: List[ ScenarioComponent ] = list()
-            stack.append(self)
-            while stack:
-                current_component = stack.pop()
-                if current_component.is_nodeset():
-                    if current_component.name == name:
-                        return cast(NodeSet , current_component)
-                    for c in cast(NodeSet , current_component).children:
-                        stack.append(c)
-
+        try:
+            return self._nodeset_index[ name ]
+        except KeyError:
             raise KeyError(f"child nodeset: '{name}' not found")
 
+    def is_remote(self) -> bool:
+        """whether the nodeset runs in a worker process, see :mod:`.remote`"""
+        return False
+
     # composite method
     def has_child_nodeset(self) -> bool:
         for c in self.children:
@@ -79,63 +90,256 @@ class NodeSet(ScenarioComponent):
         return False
 
     def get_child_component(self , name: str) -> ScenarioComponent:
-        stack: List[ ScenarioComponent ] = list()
-        stack.append(self)
-        while stack:
-            current_component = stack.pop()
-            if current_component.is_nodeset():
-                if current_component.name == name:
-                    return current_component
-                for c in cast(NodeSet , current_component).children:
-                    stack.append(c)
-            else:
-                if current_component.name == name:
-                    return current_component
+        if name == self.name:
+            return self
+        if name in self._nodeset_index:
+            return self._nodeset_index[ name ]
+        if name in self._node_index:
+            return self._node_index[ name ]
 
         raise KeyError(f"child component: '{name}' not found")
 
     # composite method
     def get_child_node(self , name: str) -> Node:
-        stack: List[ ScenarioComponent ] = list()
-        stack.append(self)
-        while stack:
-            current_component = stack.pop()
-            if current_component.is_nodeset():
-                for c in cast(NodeSet , current_component).children:
-                    stack.append(c)
-            else:
-                if current_component.name == name:
-                    return cast(Node , current_component)
+        try:
+            return self._node_index[ name ]
+        except KeyError:
+            raise KeyError(f"child node: '{name}' not found")
 
-        raise KeyError(f"child node: '{name}' not found")
+    # composite method
+    def get_child_nodes(self) -> List[ Node ]:
+        """every descendant node"""
+        return list(self._node_index.values())
 
     # operational
     def get_child_node_by_tag(self , tag: str) -> Node:
         "get child node by dependency tag"
-        stack: List[ ScenarioComponent ] = list()
-        stack.append(self)
-        while stack:
-            current_component = stack.pop()
-            if current_component.is_nodeset():
-                for c in cast(NodeSet , current_component).children:
-                    stack.append(c)
-            else:
-                node = cast(Node , current_component)
-                if node.dependency_tag == tag:
-                    return node
-
-        raise KeyError(f"child node with tag: '{tag}' not found")
+        try:
+            return self._tag_index[ tag ]
+        except KeyError:
+            raise KeyError(f"child node with tag: '{tag}' not found")
 
     # composite method
     def add_child(self , component: ScenarioComponent):
         """attach child component, and set the component's parent to ``self`` """
         component.parent = self
         self.children.append(component)
+        component.bind_event_emitter(self._emitter)
+
+        # make the component and its subtree visible to self and every ancestor
+        nodeset = self
+        while nodeset is not None:
+            nodeset._index_component(component)
+            nodeset = nodeset.parent
 
     # composite method
     def remove_child(self , component: ScenarioComponent):
         self.children.remove(component)
 
+        nodeset = self
+        while nodeset is not None:
+            nodeset._unindex_component(component)
+            nodeset = nodeset.parent
+
+    def bind_event_emitter(self , emitter: GraphEventEmitter) -> None:
+        emitter.absorb(self._emitter)
+        self._emitter = emitter
+        # descendants share the current emitter already, repoint them without merging again
+        for node in self._node_index.values():
+            node._emitter = emitter
+        for nodeset in self._nodeset_index.values():
+            nodeset._emitter = emitter
+
+    # index maintenance
+    def _index_component(self , component: ScenarioComponent):
+        """add component, and all descendants when component is a nodeset, to the lookup indexes"""
+        if component.is_nodeset():
+            nodeset = cast(NodeSet , component)
+            self._nodeset_index.setdefault(nodeset.name , nodeset)
+            for child_nodeset in nodeset._nodeset_index.values():
+                self._nodeset_index.setdefault(child_nodeset.name , child_nodeset)
+            for node in nodeset._node_index.values():
+                self._index_node(node)
+        else:
+            self._index_node(cast(Node , component))
+
+    def _index_node(self , node: Node):
+        self._node_index.setdefault(node.name , node)
+        self._tag_index.setdefault(node.dependency_tag , node)
+
+    def _unindex_component(self , component: ScenarioComponent):
+        """drop component, and all descendants when component is a nodeset, from the lookup indexes"""
+        if component.is_nodeset():
+            nodeset = cast(NodeSet , component)
+            NodeSet._discard(self._nodeset_index , nodeset.name , nodeset)
+            for child_nodeset in nodeset._nodeset_index.values():
+                NodeSet._discard(self._nodeset_index , child_nodeset.name , child_nodeset)
+            for node in nodeset._node_index.values():
+                self._unindex_node(node)
+        else:
+            self._unindex_node(cast(Node , component))
+
+    def _unindex_node(self , node: Node):
+        NodeSet._discard(self._node_index , node.name , node)
+        NodeSet._discard(self._tag_index , node.dependency_tag , node)
+
+    @staticmethod
+    def _discard(index: Dict[ str , Any ] , key: str , component: ScenarioComponent):
+        """remove key from index only when it still points to component"""
+        if index.get(key) is component:
+            del index[ key ]
+
+    def compile_dispatch_plan(self) -> DispatchPlan:
+        """flatten the event graph of the scenario into direct listener calls, see :mod:`.dispatch`"""
+        return compile_dispatch_plan(self._emitter)
+
+    def enable_profiling(self , profiler: Optional[ Profiler ] = None) -> Profiler:
+        """
+        time every event handler and interface of the scenario, see :mod:`.profiling`. Handlers and interfaces already
+        registered are wrapped now, the ones registered later are wrapped at registration. Wrapped interfaces pass
+        ``isinstance`` checks against their interface class, ``type()`` returns the :class:`.ProfiledInterface` proxy.
+        :param profiler: profiler to record into, a new one by default
+        :return: the scenario's profiler
+        """
+        if self.parent is not None:
+            raise Exception(f"profiling is enabled on the root nodeset, '{self.name}' is a child nodeset")
+        if self._profiler is not None:
+            return self._profiler
+
+        self._profiler = profiler or Profiler()
+        for event_name , listeners in list(self._emitter.listeners.items()):
+            self._emitter.set_listeners(event_name , [ self._profiler.wrap_handler(event_name , l) for l in listeners ])
+        for node in self._node_index.values():
+            interfaces = node.registered_interfaces
+            for interface_name , interface in interfaces.items():
+                interfaces[ interface_name ] = self._profiler.wrap_interface(interface_name , interface)
+        return self._profiler
+
+    def disable_profiling(self) -> Optional[ Profiler ]:
+        """
+        unwrap the handlers and interfaces wrapped by :meth:`enable_profiling`
+        :return: the profiler that was in use, its stats are kept
+        """
+        profiler , self._profiler = self._profiler , None
+        if profiler is None:
+            return None
+
+        for event_name , listeners in list(self._emitter.listeners.items()):
+            self._emitter.set_listeners(event_name , [ l.__wrapped__ if is_profiled(l) else l for l in listeners ])
+        for node in self._node_index.values():
+            interfaces = node.registered_interfaces
+            for interface_name , interface in interfaces.items():
+                if isinstance(interface , ProfiledInterface):
+                    interfaces[ interface_name ] = interface._target
+        return profiler
+
+    def profile_stats(self , by: str = "node") -> Dict[ str , Dict[ str , Any ] ]:
+        """
+        latency stats of the scenario's handlers and interfaces
+        :param by: "node", "nodeset", "event" or "interface", see :meth:`.Profiler.aggregate`
+        :return: key -> call count, total and latency percentiles in nanoseconds, the most time consuming first
+        """
+        profiler = self.profiler
+        if profiler is None:
+            raise Exception(f"profiling is not enabled on scenario '{self.name}'")
+        return profiler.report(by)
+
+    def conflation_stats(self) -> Dict[ str , Dict[ str , int ] ]:
+        """
+        counters of the conflating edges registered in this nodeset and its descendants, see :mod:`.conflation`
+        :return: "<pred>-><succ>" -> received, delivered, conflated and pending update counts
+        """
+        nodesets = [ self ] + list(self._nodeset_index.values())
+        return {f"{edge.pred_node.name}->{edge.succ_node.name}": edge.conflator.stats()
+                for nodeset in nodesets for edge in nodeset.edges
+                if isinstance(edge , EventDependency) and edge.conflator is not None}
+
+    def interface_cache_stats(self) -> Dict[ str , Dict[ str , Any ] ]:
+        """
+        counters of the caching edges registered in this nodeset and its descendants, see :mod:`.caching`
+        :return: "<pred>-><succ>:<interface dataclass>" -> hit, miss, size and eviction counts
+        """
+        nodesets = [ self ] + list(self._nodeset_index.values())
+        return {f"{edge.pred_node.name}->{edge.succ_node.name}:{edge.interface_data_class.__name__}":
+                    edge.interface_cache.stats()
+                for nodeset in nodesets for edge in nodeset.edges
+                if isinstance(edge , CallableDependency) and edge.interface_cache is not None}
+
+    def call_batch_stats(self) -> Dict[ str , Dict[ str , Any ] ]:
+        """
+        counters of the batching edges registered in this nodeset and its descendants, see :mod:`.callbatch`
+        :return: "<pred>-><succ>:<interface dataclass>" -> call, dispatch and batch size counts
+        """
+        nodesets = [ self ] + list(self._nodeset_index.values())
+        return {f"{edge.pred_node.name}->{edge.succ_node.name}:{edge.interface_data_class.__name__}":
+                    edge.call_batcher.stats()
+                for nodeset in nodesets for edge in nodeset.edges
+                if isinstance(edge , CallableDependency) and edge.call_batcher is not None}
+
+    def flush_call_batches(self) -> int:
+        """dispatch the calls collected by the batching edges of this nodeset and its descendants"""
+        nodesets = [ self ] + list(self._nodeset_index.values())
+        return sum(edge.call_batcher.flush() for nodeset in nodesets for edge in nodeset.edges
+                   if isinstance(edge , CallableDependency) and edge.call_batcher is not None)
+
+    def clone(self , overrides: Optional[ Dict[ str , Dict[ str , Any ] ] ] = None) -> NodeSet:
+        """
+        build an independent copy of the scenario, e.g. for parameter sweeps, without parsing yaml again. The config is
+        copied and overridden, every node and dependency is constructed again: the clone has its own events, handler
+        registrations and edge state. Models are not rebuilt when they can be shared, see :meth:`.Node.clone_model`.
+        The dispatch mode and profiling of the scenario are kept.
+        :param overrides: component name -> config field values, e.g. ``{"strategy": {"threshold": 0.5}}``
+        :return: the cloned root nodeset
+        """
+        from .builder import ScenarioBuilder
+
+        if self.parent is not None:
+            raise Exception(f"scenarios are cloned from the root nodeset, '{self.name}' is a child nodeset")
+        nodeset_config = self.nodeset_config.copy_tree()
+        for name , values in (overrides or dict()).items():
+            config = nodeset_config.get_child_component_config(name)
+            names = {f.name for f in fields(config)}
+            for key , value in values.items():
+                if key not in names:
+                    raise Exception(f"'{key}' is not a field of {type(config).__name__} of component '{name}'")
+                setattr(config , key , value)
+
+        # every model is deferred at construction, then built or shared from the node of this scenario
+        builder = ScenarioBuilder(nodeset_config , lazy=True , dispatch="sync" if self.dispatcher is None else "async" ,
+                                  profile=self._profiler is not None)
+        clone = builder.build()
+        for node in clone._node_index.values():
+            source = self._node_index.get(node.name)
+            if node.model_deferred:
+                node.model = node.init_model() if source is None else node.clone_model(source)
+        return clone
+
+    def remote_nodesets(self) -> List[ NodeSet ]:
+        """descendant nodesets running in a worker process"""
+        return [ nodeset for nodeset in self._nodeset_index.values() if nodeset.is_remote() ]
+
+    def pump_remote(self , timeout: float = 0.0) -> int:
+        """
+        emit the events received from the workers of descendant out-of-process nodesets, see :mod:`.remote`
+        :param timeout: seconds to wait for a first event of each worker
+        :return: number of events delivered
+        """
+        return sum(nodeset.pump(timeout) for nodeset in self.remote_nodesets())
+
+    def sync_remote(self , timeout: Optional[ float ] = None) -> None:
+        """wait until every event emitted so far, including the ones relayed from worker to worker, is delivered"""
+        while sum(nodeset.sync(timeout) for nodeset in self.remote_nodesets()):
+            pass
+
+    def stop_remote(self , timeout: Optional[ float ] = 5.0) -> None:
+        """stop the workers of descendant out-of-process nodesets"""
+        for nodeset in self.remote_nodesets():
+            nodeset.stop(timeout)
+
+    def deferred_nodes(self) -> List[ Node ]:
+        """descendant nodes whose model construction is deferred and has not happened yet"""
+        return [ node for node in self._node_index.values() if node.model_deferred ]
+
     # composite method
     def add_edge(self , edge: Dependency):
         self.edges.append(edge)
@@ -160,6 +364,10 @@ class NodeSet(ScenarioComponent):
         node = self.get_child_node(node_name)
         node.notify_handlers(node_name , event_name , *msg)
 
+    def notify_handlers_batch(self , node_name: str , event_name: str , batch: RecordBatch):
+        node = self.get_child_node(node_name)
+        node.notify_handlers_batch(node_name , event_name , batch)
+
     def consolidate_implemented_interfaces(self):
         for c in self.children:
             c.consolidate_implemented_interfaces()
@@ -174,53 +382,82 @@ class NodeSetConfig(Config):
     nodeset_class: str
     components: List[ Config ] = field(default_factory=list)
     edges: List[ EdgeConfig ] = field(default_factory=list)
+    out_of_process: bool = False  # build and run the nodeset in a worker process, see :mod:`.remote`
 
     @classmethod
     def from_dict(cls , input: Dict[ str , str ]):
         scenario_name = input[ "name" ]
         scenario_class = input[ "nodesetClass" ]
         scenario_config_class = input[ "nodesetConfigClass" ]
-        return cls(scenario_name , scenario_config_class , scenario_class)
+        out_of_process = bool(input.get("outOfProcess" , False))
+        return cls(scenario_name , scenario_config_class , scenario_class , out_of_process=out_of_process)
+
+    def __post_init__(self):
+        super(NodeSetConfig , self).__post_init__()
+        # indexes over every descendant config, kept up to date by add_child_config
+        self._component_index: Dict[ str , Config ] = dict()
+        self._nodeset_index: Dict[ str , NodeSetConfig ] = dict()
+        for c in self.components:
+            self._index_config(c)
 
     def add_child_config(self , config: Config):
         config.parent = self
         self.components.append(config)
 
+        nodeset_config = self
+        while nodeset_config is not None:
+            nodeset_config._index_config(config)
+            nodeset_config = nodeset_config.parent
+
     def add_edge_config(self , edge: EdgeConfig):
         self.edges.append(edge)
 
+    def copy_tree(self) -> NodeSetConfig:
+        """
+        copy of the config and its descendants, without parent. Component configs are shallow copies, edge configs
+        are shared
+        """
+        out = copy.copy(self)
+        out.parent = None
+        out.components = [ ]
+        out.edges = list(self.edges)
+        out._component_index , out._nodeset_index = dict() , dict()
+        for config in self.components:
+            if config.is_nodeset_config():
+                out.add_child_config(cast(NodeSetConfig , config).copy_tree())
+            else:
+                child = copy.copy(config)
+                child.parent = None
+                out.add_child_config(child)
+        return out
+
     def is_nodeset_config(self):
         return True
 
     def get_child_component_config(self , name: str) -> Config:
-        stack: List[ Config ] = list()
-        stack.append(self)
-        while stack:
-            current_component = stack.pop()
-            if current_component.is_nodeset_config():
-                if current_component.name == name:
-                    return current_component
-                for c in cast(NodeSetConfig , current_component).components:
-                    stack.append(c)
-            else:
-                if current_component.name == name:
-                    return current_component
-
-        raise KeyError(f"child component: '{name}' not found")
+        if name == self.name:
+            return self
+        try:
+            return self._component_index[ name ]
+        except KeyError:
+            raise KeyError(f"child component: '{name}' not found")
 
     def get_nodeset_config(self , name: str):
 
         if (name is None) or (name == self.name):
             return self
-        else:
-            stack: List[ Config ] = list()
-            stack.append(self)
-            while stack:
-                current_component_config = stack.pop()
-                if current_component_config.is_nodeset_config():
-                    if current_component_config.name == name:
-                        return cast(NodeSet , current_component_config)
-                    for c in cast(NodeSetConfig , current_component_config).components:
-                        stack.append(c)
-
+        try:
+            return self._nodeset_index[ name ]
+        except KeyError:
             raise KeyError(f"child nodeset config: '{name}' not found")
+
+    def _index_config(self , config: Config):
+        """add config, and all descendants when config is a nodeset config, to the lookup indexes"""
+        self._component_index.setdefault(config.name , config)
+        if config.is_nodeset_config():
+            nodeset_config = cast(NodeSetConfig , config)
+            self._nodeset_index.setdefault(nodeset_config.name , nodeset_config)
+            for c in nodeset_config._component_index.values():
+                self._component_index.setdefault(c.name , c)
+            for c in nodeset_config._nodeset_index.values():
+                self._nodeset_index.setdefault(c.name , c)
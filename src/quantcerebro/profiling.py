@@ -0,0 +1,341 @@
+""" Opt-in latency profiling of event handlers and interfaces.
+
+Profiling is enabled on the root nodeset, either at build time (``build_scenario(..., profile=True)``) or later with
+:meth:`.NodeSet.enable_profiling`. While enabled:
+
+* every handler registered through ``register_handler_to_event`` is wrapped in a timing function
+* every interface registered through ``register_interface_to_node`` is replaced by a :class:`ProfiledInterface`
+  proxy, which times the calls to its methods. ``isinstance`` checks against the interface class still hold, but
+  ``type()`` of a registered interface is the proxy's
+
+Disabled, nothing is wrapped and dispatch runs at full speed. Enabled, each timed call costs two clock reads and a
+bucket increment. :meth:`.NodeSet.disable_profiling` unwraps the handlers and interfaces again.
+
+Each call site (a handler of a node on an event, or an interface method) records into its own
+:class:`LatencyHistogram`. Stats are queried from the root nodeset and aggregated by node, by nodeset, by event or
+by interface:
+
+    .. code-block:: python
+
+        scenario = build_scenario("scenario.yml" , profile=True)
+        ...
+        for node_name , stats in scenario.profile_stats("node").items():
+            print(node_name , stats[ "count" ] , stats[ "p99_ns" ])
+
+A handler is attributed to the node it is a method of, found through ``__self__`` and ``__wrapped__`` across the
+inbox and batch adapters. Nodeset stats are inclusive: a node's calls count toward every nodeset above it.
+
+What is timed is the synchronous part of a call. In asyncio dispatch mode handlers are registered behind their inbox,
+so what is timed there is the enqueue. Coroutine handlers are timed until their first suspension.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable , Dict , Any , Optional , Tuple , List , TYPE_CHECKING
+
+# Local application/library specific imports.
+if TYPE_CHECKING:
+    from .meta import ScenarioComponent
+
+# 3rd-party imports
+...
+
+HANDLER = "handler"
+INTERFACE = "interface"
+UNATTRIBUTED = "?"
+
+# 2 ** SUB_BUCKET_BITS linear sub buckets per power of two, i.e. values are kept within ~6%
+SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_BUCKETS = 64 << SUB_BUCKET_BITS
+
+
+def _bucket(value: int) -> int:
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[ int , int ]:
+    """lowest and highest value counted in a bucket"""
+    if index < 2 * _SUB_BUCKETS:
+        return index , index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << SUB_BUCKET_BITS)
+    return mantissa << shift , ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of nanosecond latencies, in the spirit of HdrHistogram: each power of two is split into
+    ``2 ** SUB_BUCKET_BITS`` linear buckets, so recording is one increment and the memory is fixed whatever the range.
+    Only bucket counts are kept, every statistic (total, mean, min, max, percentiles) is exact to the bucket precision.
+    """
+    __slots__ = ("counts" ,)
+
+    def __init__(self):
+        self.counts: List[ int ] = [ 0 ] * _BUCKETS
+
+    def record(self , value: int) -> None:
+        self.counts[ _bucket(max(value , 0)) ] += 1
+
+    def merge(self , other: LatencyHistogram) -> LatencyHistogram:
+        """add the samples of another histogram to this one"""
+        counts = self.counts
+        for index , count in enumerate(other.counts):
+            if count:
+                counts[ index ] += count
+        return self
+
+    def reset(self) -> None:
+        # in place, timing wrappers hold the list
+        self.counts[ : ] = [ 0 ] * _BUCKETS
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def total(self) -> int:
+        """sum of the samples, each counted at its bucket midpoint"""
+        return sum(count * sum(_bucket_bounds(index)) // 2 for index , count in enumerate(self.counts) if count)
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    @property
+    def min(self) -> int:
+        for index , count in enumerate(self.counts):
+            if count:
+                return _bucket_bounds(index)[ 0 ]
+        return 0
+
+    @property
+    def max(self) -> int:
+        for index in reversed(range(_BUCKETS)):
+            if self.counts[ index ]:
+                return _bucket_bounds(index)[ 1 ]
+        return 0
+
+    def percentile(self , q: float) -> int:
+        """
+        highest value equivalent to the q-th percentile sample
+        :param q: percentile, 0 to 100
+        """
+        rank = max(math.ceil(q / 100 * self.count) , 1)
+        seen = 0
+        for index , count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_bounds(index)[ 1 ]
+        return 0
+
+    def summary(self) -> Dict[ str , Any ]:
+        return {"count": self.count , "total_ns": self.total , "mean_ns": self.mean , "min_ns": self.min ,
+                "p50_ns": self.percentile(50) , "p90_ns": self.percentile(90) , "p99_ns": self.percentile(99) ,
+                "p99.9_ns": self.percentile(99.9) , "max_ns": self.max}
+
+
+@dataclass(frozen=True)
+class CallSite:
+    """
+    :param kind: HANDLER or INTERFACE
+    :param node: name of the node whose code runs
+    :param nodesets: names of the nodesets above the node, innermost first
+    :param name: event name for a handler, "<interface name>.<method>" for an interface
+    """
+    kind: str
+    node: str
+    nodesets: Tuple[ str , ... ]
+    name: str
+
+
+def timed(call: Callable , histogram: LatencyHistogram , keywords: bool = True) -> Callable:
+    """
+    wrap a callable so that every call records its duration into histogram
+    :param keywords: whether the wrapper accepts keyword arguments, event handlers are called with positional ones only
+    """
+    # bucketing is inlined, this runs on every profiled call
+    clock = time.perf_counter_ns
+    counts = histogram.counts
+
+    if keywords:
+        def profiled(*args , **kwargs):
+            start = clock()
+            try:
+                return call(*args , **kwargs)
+            finally:
+                elapsed = clock() - start
+                if elapsed < _SUB_BUCKETS:
+                    counts[ elapsed ] += 1
+                else:
+                    shift = elapsed.bit_length() - SUB_BUCKET_BITS - 1
+                    counts[ (shift << SUB_BUCKET_BITS) + (elapsed >> shift) ] += 1
+    else:
+        def profiled(*args):
+            start = clock()
+            try:
+                return call(*args)
+            finally:
+                elapsed = clock() - start
+                if elapsed < _SUB_BUCKETS:
+                    counts[ elapsed ] += 1
+                else:
+                    shift = elapsed.bit_length() - SUB_BUCKET_BITS - 1
+                    counts[ (shift << SUB_BUCKET_BITS) + (elapsed >> shift) ] += 1
+
+    profiled.__wrapped__ = call
+    profiled.__profiled__ = True
+    return profiled
+
+
+def is_profiled(call: Any) -> bool:
+    return getattr(call , "__profiled__" , False)
+
+
+def handler_owner(handler: Callable) -> Optional[ Any ]:
+    """object a handler is a bound method of, looking through wrappers that set ``__wrapped__``"""
+    while handler is not None:
+        owner = getattr(handler , "__self__" , None)
+        if owner is not None:
+            return owner
+        handler = getattr(handler , "__wrapped__" , None)
+    return None
+
+
+class ProfiledInterface:
+    """
+    Proxy of a registered interface, method calls are timed. Attributes that are not callable are forwarded as is.
+    A timed method is stored on the proxy on first access, later calls find it without going through ``__getattr__``.
+    ``__class__`` is forwarded too, so that ``isinstance`` checks against the interface class hold while profiling.
+
+    :param target: the interface implementation
+    :param profiler: profiler the method calls record into
+    :param interface_name: registered interface name, e.g. "A.InterfaceA"
+    :param owner: component implementing the interface, when known
+    """
+
+    def __init__(self , target: Any , profiler: Profiler , interface_name: str , owner: Optional[ Any ]):
+        object.__setattr__(self , "_target" , target)
+        object.__setattr__(self , "_profiler" , profiler)
+        object.__setattr__(self , "_interface_name" , interface_name)
+        object.__setattr__(self , "_owner" , owner)
+
+    def __getattr__(self , item):
+        attribute = getattr(self._target , item)
+        if not callable(attribute):
+            return attribute
+
+        histogram = self._profiler.histogram(INTERFACE , self._owner , f"{self._interface_name}.{item}")
+        method = timed(attribute , histogram)
+        object.__setattr__(self , item , method)
+        return method
+
+    def __setattr__(self , key , value):
+        setattr(self._target , key , value)
+
+    # isinstance() checks the type first, so isinstance(proxy , ProfiledInterface) holds as well
+    @property
+    def __class__(self):
+        return self._target.__class__
+
+    def __repr__(self):
+        return f"ProfiledInterface({self._target!r})"
+
+
+class Profiler:
+    """
+    Latency histograms of a scenario's call sites, owned by the root nodeset (``scenario.profiler``)
+    """
+    AGGREGATIONS = ("node" , "nodeset" , "event" , "interface")
+
+    def __init__(self):
+        self.histograms: Dict[ CallSite , LatencyHistogram ] = dict()
+
+    @staticmethod
+    def call_site(kind: str , owner: Optional[ ScenarioComponent ] , name: str) -> CallSite:
+        if owner is None or not hasattr(owner , "parent"):
+            return CallSite(kind , UNATTRIBUTED , () , name)
+
+        nodesets = [ ]
+        parent = owner.parent
+        while parent is not None:
+            nodesets.append(parent.name)
+            parent = parent.parent
+        return CallSite(kind , owner.name , tuple(nodesets) , name)
+
+    def histogram(self , kind: str , owner: Optional[ ScenarioComponent ] , name: str) -> LatencyHistogram:
+        """histogram of a call site, created on first use"""
+        site = self.call_site(kind , owner , name)
+        histogram = self.histograms.get(site)
+        if histogram is None:
+            histogram = self.histograms[ site ] = LatencyHistogram()
+        return histogram
+
+    def wrap_handler(self , event_name: str , handler: Callable ,
+                     default_owner: Optional[ ScenarioComponent ] = None) -> Callable:
+        """
+        timed version of an event handler
+        :param event_name: event the handler is registered to
+        :param handler: event handler
+        :param default_owner: component the handler is attributed to when it is not a method of a component
+        """
+        if is_profiled(handler):
+            return handler
+        owner = handler_owner(handler)
+        if not hasattr(owner , "parent"):
+            owner = default_owner
+        return timed(handler , self.histogram(HANDLER , owner , event_name) , keywords=False)
+
+    def wrap_interface(self , interface_name: str , interface: Any ,
+                       default_owner: Optional[ ScenarioComponent ] = None) -> ProfiledInterface:
+        """
+        proxy of an interface timing its method calls
+        :param interface_name: registered interface name
+        :param interface: interface implementation
+        :param default_owner: component the calls are attributed to when the implementation is not a component
+        """
+        if isinstance(interface , ProfiledInterface):
+            return interface
+        owner = interface if hasattr(interface , "parent") else default_owner
+        return ProfiledInterface(interface , self , interface_name , owner)
+
+    def aggregate(self , by: str = "node") -> Dict[ str , LatencyHistogram ]:
+        """
+        merge the call site histograms
+        :param by: "node", "nodeset" (inclusive of nested nodesets), "event" (handlers only) or "interface" (interface
+            methods only)
+        """
+        if by not in self.AGGREGATIONS:
+            raise ValueError(f"unknown aggregation '{by}', expected one of {self.AGGREGATIONS}")
+
+        merged: Dict[ str , LatencyHistogram ] = defaultdict(LatencyHistogram)
+        for site , histogram in self.histograms.items():
+            if by == "node":
+                keys = (site.node ,)
+            elif by == "nodeset":
+                keys = site.nodesets
+            elif by == "event":
+                keys = (site.name ,) if site.kind == HANDLER else ()
+            else:
+                keys = (site.name ,) if site.kind == INTERFACE else ()
+            for key in keys:
+                merged[ key ].merge(histogram)
+        return dict(merged)
+
+    def report(self , by: str = "node") -> Dict[ str , Dict[ str , Any ] ]:
+        """aggregated histogram summaries, the most time consuming first"""
+        merged = sorted(self.aggregate(by).items() , key=lambda item: item[ 1 ].total , reverse=True)
+        return {key: histogram.summary() for key , histogram in merged}
+
+    def reset(self) -> None:
+        """zero every histogram, wrapped handlers keep recording into them"""
+        for histogram in self.histograms.values():
+            histogram.reset()
@@ -0,0 +1,229 @@
+""" Incremental rebuild of a running scenario after its configuration changed.
+
+:func:`build_scenario` instantiates every node, with its ``init_model``, and registers every edge. When a single
+``componentConfigs`` entry or ``nodesetPath`` sub-scenario file changes, :func:`rebuild_scenario` diffs the new config
+against the one the scenario runs, and only rebuilds what changed:
+
+    .. code-block:: python
+
+        scenario = build_scenario("scenario.yml")
+        ...  # scenario.yml, or one of its sub-scenario files, is edited
+        diff = rebuild_scenario(scenario , "scenario.yml")
+        print(diff.changed , diff.added , diff.removed)
+
+* a node whose config changed (any attribute, its class or its parent nodeset) is replaced by a new instance, a
+  nodeset whose own config changed is replaced with its whole subtree
+* the edges touching a replaced, added or removed node, and the edges added or removed from the config, are
+  unregistered and registered again. Every other node keeps its model, its registered interfaces and its handlers
+  registrations
+
+The predecessor's events are never recreated: an event recorded by a :class:`.Recorder` stays recorded, and handlers
+wrapped by the profiler are found through their wrapper. Compiled :class:`.DispatchPlan` objects still call the old
+handlers, compile them again. Out-of-process nodesets (:mod:`.remote`) are not rebuilt incrementally: a change inside
+one, or to an edge into one, raises, rebuild the scenario then.
+"""
+# standard lib imports
+from __future__ import annotations
+
+from dataclasses import dataclass , field , astuple
+from typing import Dict , List , Optional , Set , Tuple , Union , cast
+
+# Local application/library specific imports.
+from .builder import ScenarioBuilder , ConfigBuilder
+from .dependencies import Dependency , EdgeConfig , EventDependency , CallableDependency
+from .meta import Config
+from .nodeset import NodeSet , NodeSetConfig
+from .utils import load_class
+
+# 3rd-party imports
+...
+
+
+@dataclass
+class ScenarioDiff:
+    """
+    :param changed: components present in both configs whose config differs
+    :param added: components of the new config only
+    :param removed: components of the old config only
+    :param added_edges: (nodeset name, edge config) registered by the rebuild
+    :param removed_edges: (nodeset name, edge config) unregistered by the rebuild
+    """
+    changed: List[ str ] = field(default_factory=list)
+    added: List[ str ] = field(default_factory=list)
+    removed: List[ str ] = field(default_factory=list)
+    added_edges: List[ Tuple[ str , EdgeConfig ] ] = field(default_factory=list)
+    removed_edges: List[ Tuple[ str , EdgeConfig ] ] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.changed or self.added or self.removed or self.added_edges or self.removed_edges)
+
+
+class _Tree:
+    """flattened scenario config: every component with its parent nodeset, and every edge"""
+
+    def __init__(self , root: NodeSetConfig):
+        self.root = root
+        self.parents: Dict[ str , str ] = dict()
+        self.configs: Dict[ str , Config ] = dict()
+        self.order: List[ str ] = [ ]  # parents before children
+        self.tags: Dict[ str , str ] = dict()  # dependency tag -> node name
+        stack: List[ NodeSetConfig ] = [ root ]
+        while stack:
+            nodeset_config = stack.pop()
+            for config in nodeset_config.components:
+                self.parents[ config.name ] = nodeset_config.name
+                self.configs[ config.name ] = config
+                self.order.append(config.name)
+                if config.is_nodeset_config():
+                    stack.append(cast(NodeSetConfig , config))
+                else:
+                    self.tags[ getattr(config , "dependency_tag" , config.name) ] = config.name
+        self.edges = ScenarioBuilder.collect_edges(root)
+        self.edges.reverse()  # configuration order
+
+    def signature(self , name: str) -> Tuple:
+        config = self.configs[ name ]
+        if config.is_nodeset_config():
+            nodeset_config = cast(NodeSetConfig , config)
+            own = (nodeset_config.name , nodeset_config.config_class , nodeset_config.nodeset_class ,
+                   nodeset_config.out_of_process)
+        else:
+            own = (type(config) ,) + astuple(config)
+        return (self.parents[ name ] ,) + own
+
+    def ancestors(self , name: str) -> List[ str ]:
+        out = [ ]
+        while name in self.parents:
+            name = self.parents[ name ]
+            out.append(name)
+        return out
+
+    def subtree(self , name: str) -> List[ str ]:
+        """the component and its descendants"""
+        return [ n for n in self.order if n == name or name in self.ancestors(n) ]
+
+    def top_most(self , names: Set[ str ]) -> List[ str ]:
+        """names without an ancestor in names, parents first"""
+        return [ n for n in self.order if n in names and not any(a in names for a in self.ancestors(n)) ]
+
+    def remote(self , name: str) -> Optional[ str ]:
+        """the out-of-process nodeset a component belongs to, or is"""
+        for n in [ name ] + self.ancestors(name):
+            config = self.configs.get(n)
+            if config is not None and config.is_nodeset_config() and cast(NodeSetConfig , config).out_of_process:
+                return n
+        return None
+
+    def endpoints(self , edge: EdgeConfig) -> Tuple[ str , str ]:
+        tag = lambda path: path.split(".")[ -1 ]
+        return self.tags.get(tag(edge.pred) , tag(edge.pred)) , self.tags.get(tag(edge.succ) , tag(edge.succ))
+
+
+def edge_key(nodeset_name: str , edge: EdgeConfig) -> Tuple:
+    return (nodeset_name ,) + astuple(edge)
+
+
+def diff_configs(old: NodeSetConfig , new: NodeSetConfig) -> Tuple[ ScenarioDiff , Set[ str ] , Set[ str ] ]:
+    """
+    :return: the diff, the names of the old components to remove and the names of the new components to build, which
+        include the descendants of replaced nodesets
+    """
+    old_tree , new_tree = _Tree(old) , _Tree(new)
+    diff = ScenarioDiff()
+    for name in new_tree.order:
+        if name not in old_tree.configs:
+            diff.added.append(name)
+        elif old_tree.signature(name) != new_tree.signature(name):
+            diff.changed.append(name)
+    diff.removed = [ name for name in old_tree.order if name not in new_tree.configs ]
+
+    stale = set(diff.changed) | set(diff.removed)
+    fresh = set(diff.changed) | set(diff.added)
+    to_remove = {n for top in old_tree.top_most(stale) for n in old_tree.subtree(top)}
+    to_build = {n for top in new_tree.top_most(fresh) for n in new_tree.subtree(top)}
+
+    old_keys = {edge_key(*e) for e in old_tree.edges}
+    new_keys = {edge_key(*e) for e in new_tree.edges}
+    diff.removed_edges = [ e for e in old_tree.edges
+                           if edge_key(*e) not in new_keys or to_remove.intersection(old_tree.endpoints(e[ 1 ])) ]
+    diff.added_edges = [ e for e in new_tree.edges
+                         if edge_key(*e) not in old_keys or to_build.intersection(new_tree.endpoints(e[ 1 ])) ]
+
+    for tree , names , edges in ((old_tree , to_remove , diff.removed_edges) ,
+                                 (new_tree , to_build , diff.added_edges)):
+        for name in names:
+            remote = tree.remote(name)
+            if remote is not None:
+                raise Exception(f"out-of-process nodeset '{remote}' changed, it can not be rebuilt incrementally")
+        for _ , edge in edges:
+            pred , succ = tree.endpoints(edge)
+            if tree.remote(succ) is not None:
+                raise Exception(f"edge {edge.pred} -> {edge.succ} into an out-of-process nodeset changed, it can not "
+                                f"be rebuilt incrementally")
+    return diff , to_remove , to_build
+
+
+def find_dependency(scenario: NodeSet , nodeset_name: str , edge: EdgeConfig) -> Optional[ Dependency ]:
+    """the dependency registered for an edge config"""
+    pred_tag , succ_tag = edge.pred.split(".")[ -1 ] , edge.succ.split(".")[ -1 ]
+    edge_dataclass = load_class(edge.edge_dataclass)
+    for dependency in scenario.get_nodeset(nodeset_name).edges:
+        if dependency.pred_node.dependency_tag != pred_tag or dependency.succ_node.dependency_tag != succ_tag:
+            continue
+        if isinstance(dependency , EventDependency) and dependency.event_data_class is edge_dataclass:
+            return dependency
+        if isinstance(dependency , CallableDependency) and dependency.interface_data_class is edge_dataclass:
+            return dependency
+    return None
+
+
+def rebuild_scenario(scenario: NodeSet , config: Union[ str , NodeSetConfig ] , lazy: bool = False) -> ScenarioDiff:
+    """
+    bring a built scenario up to date with a new config, rebuilding only the components that changed and the edges
+    touching them, see :mod:`.rebuild`
+    :param scenario: root nodeset, as returned by :func:`.build_scenario`
+    :param config: scenario yaml file, or the new composite config
+    :param lazy: defer the model construction of the rebuilt nodes to their first use
+    :return: what was rebuilt
+    """
+    new_config = ConfigBuilder(config).build() if isinstance(config , str) else config
+    old_config = scenario.nodeset_config
+    if new_config.name != old_config.name:
+        raise Exception(f"scenario '{scenario.name}' can not be rebuilt into '{new_config.name}'")
+    diff , to_remove , to_build = diff_configs(old_config , new_config)
+
+    # unregister, then detach, the stale part of the scenario
+    for nodeset_name , edge in diff.removed_edges:
+        dependency = find_dependency(scenario , nodeset_name , edge)
+        if dependency is not None:
+            dependency.unregister_dependency()
+            scenario.get_nodeset(nodeset_name).edges.remove(dependency)
+    old_tree = _Tree(old_config)
+    for name in old_tree.top_most(to_remove):
+        component = scenario.get_child_component(name)
+        component.parent.remove_child(component)
+
+    # surviving components point to the new config
+    scenario.nodeset_config = new_config
+    new_tree = _Tree(new_config)
+    for name in new_tree.order:
+        # the components of out-of-process nodesets keep the config their worker was started with
+        if name in to_build or new_tree.remote(name) is not None:
+            continue
+        component = scenario.get_child_component(name)
+        if component.is_nodeset():
+            component.nodeset_config = new_tree.configs[ name ]
+        else:
+            component.node_config = new_tree.configs[ name ]
+
+    builder = ScenarioBuilder(new_config , lazy=lazy , scenario=scenario)
+    roots = [ (new_tree.parents[ name ] , new_tree.configs[ name ]) for name in new_tree.top_most(to_build) ]
+    if roots:
+        builder.build_components(roots)
+    for nodeset_name , edge in diff.added_edges:
+        builder.build_edge(nodeset_name , edge)
+    # events of out-of-process predecessors exported for the new edges
+    for remote in scenario.remote_nodesets():
+        remote.wire()
+    return diff
@@ -0,0 +1,367 @@
+""" Event recording and replay.
+
+A :class:`Recorder` taps a scenario's :class:`.GraphEventEmitter` and appends every emitted event to a binary log: its
+timestamp, name, nesting depth and payload. :func:`replay` memory-maps a log and re-injects its events into a freshly
+built scenario, as fast as possible or at a scaled wall-clock rate:
+
+    .. code-block:: python
+
+        scenario = build_scenario("scenario.yml")
+        with Recorder("session.qclog" , scenario.event_emitter):
+            run_session(scenario)
+
+        backtest = build_scenario("scenario.yml")
+        replay("session.qclog" , backtest)              # as fast as possible
+        replay("session.qclog" , backtest , speed=10)   # ten times the recorded rate
+
+The depth of an event is the number of recorded emits it is nested in: 0 for an event emitted from outside any
+handler (a feed, a timer), 1 for an event a handler emits in reaction to it, and so on. Replay re-injects depth 0
+events only by default, the scenario derives the others again, as it did when it was recorded. Pass ``depth=None`` to
+re-inject every recorded event, e.g. into a scenario holding only the consumers.
+
+Depth is only meaningful for synchronous dispatch in one thread: it counts the recorded emits on the call stack. In
+asyncio dispatch mode a handler runs from its node's inbox after the emit returned, and the events a worker process
+emits are emitted by :meth:`.NodeSet.pump_remote`, so the events these emit are recorded at depth 0 and replaying depth
+0 events would inject them on top of the ones the scenario derives again. Record such scenarios with ``events`` set to
+the source events, or replay them with ``depth=None`` into a scenario holding only the consumers.
+
+Payloads made of one dataclass with a fixed layout (see :mod:`.transport`) are stored as raw struct bytes, and read
+back without unpickling: their array fields are read-only views of the mapped log. Other payloads are pickled.
+
+Log format, little-endian: an 8 bytes file header, then entries made of a kind (uint8), a body length (uint32) and the
+body. Event names and payload types are defined once, by a name or type entry, and referred to by id afterwards.
+Entries of unknown kinds are skipped, so the format can grow.
+
+The recorder wraps the ``emit`` method of each recorded :class:`.GraphEvent`, nothing changes for events that are not
+recorded, and stopping the recorder restores them. Events delivered through a compiled :class:`.DispatchPlan` do not
+go through ``emit`` and are not recorded. An event whose payload cannot be encoded is emitted all the same: it is left
+out of the log, counted in :attr:`Recorder.failed` and logged once per event name.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any , Callable , Dict , Iterable , Iterator , List , Optional , Set , Tuple , Union
+
+# Local application/library specific imports.
+from .event import GraphEvent , GraphEventEmitter
+from .meta import ScenarioComponent
+from .transport import SlotLayout , is_fixed_layout
+from .utils import load_class
+
+# 3rd-party imports
+...
+
+MAGIC = b"QCEVLOG"
+LOG_FORMAT_VERSION = 1
+FILE_HEADER = MAGIC + bytes([ LOG_FORMAT_VERSION ])
+
+# entry kinds
+NAME = 1
+TYPE = 2
+EVENT = 3
+
+# payload encodings
+PICKLED = 0  # the args tuple, pickled
+LAYOUT = 1  # one fixed layout dataclass, see :class:`.SlotLayout`
+
+_ENTRY = struct.Struct("<BI")  # kind , body length
+_ID = struct.Struct("<I")
+_TYPE = struct.Struct("<IB")  # type id , encoding
+_EVENT = struct.Struct("<qIIH")  # timestamp ns , name id , type id , depth
+
+_PICKLED_TYPE_ID = 0
+
+# (timestamp , name id , depth , args) -> event entry
+Encoder = Callable[ [ int , int , int , Tuple ] , bytes ]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LogEntry:
+    """
+    :param timestamp: nanoseconds since the epoch, when the event was emitted
+    :param name: event name
+    :param depth: number of recorded emits the event was emitted from
+    :param args: emitted arguments
+    """
+    timestamp: int
+    name: str
+    depth: int
+    args: Tuple
+
+
+def class_path(klazz: type) -> str:
+    return f"{klazz.__module__}.{klazz.__qualname__}"
+
+
+class Recorder:
+    """
+    Appends the events emitted on an emitter to a binary log, see :mod:`.recording`
+
+    :param path: log file, overwritten
+    :param emitter: emitter to tap, usually ``scenario.event_emitter``
+    :param events: names of the events to record, every event (including the ones created while recording) when not
+        given
+    :param clock: timestamp source, nanoseconds
+    :param buffer_size: bytes buffered before the log is written to disk
+    """
+
+    def __init__(self , path: str , emitter: GraphEventEmitter , events: Optional[ Iterable[ str ] ] = None ,
+                 clock: Callable[ [ ] , int ] = time.time_ns , buffer_size: int = 1 << 20):
+        self.path = path
+        self.emitter = emitter
+        self.events: Optional[ Set[ str ] ] = set(events) if events is not None else None
+        self.clock = clock
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.failed = 0
+        self.depth = 0
+        self._file = None
+        self._names: Dict[ str , int ] = dict()
+        self._encoders: Dict[ type , Encoder ] = dict()
+        self._tapped: List[ GraphEvent ] = [ ]
+        self._failed_names: Set[ str ] = set()
+
+    def __enter__(self) -> Recorder:
+        self.start()
+        return self
+
+    def __exit__(self , *exc_info):
+        self.stop()
+
+    @property
+    def recording(self) -> bool:
+        return self._file is not None
+
+    def start(self) -> None:
+        if self.recording:
+            raise Exception(f"recorder of '{self.path}' already started")
+        self._file = open(self.path , "wb" , buffering=self.buffer_size)
+        self._file.write(FILE_HEADER)
+        for name , event in list(self.emitter.events.items()):
+            self.tap(name , event)
+        self.emitter.taps.append(self.tap)
+
+    def stop(self) -> None:
+        """restore the tapped events, and close the log"""
+        if not self.recording:
+            return
+        self.emitter.taps.remove(self.tap)
+        for event in self._tapped:
+            event.__dict__.pop("emit" , None)
+        self._tapped = [ ]
+        self._file.close()
+        self._file = None
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def tap(self , name: str , event: Any) -> None:
+        """record the emits of an event, called for the events created while recording as well"""
+        if self.events is not None and name not in self.events:
+            return
+        if not isinstance(event , GraphEvent) or "emit" in event.__dict__:
+            return
+
+        emit = event.emit
+        name_id = self._name_id(name)
+        encoders , clock , write = self._encoders , self.clock , self._file.write
+
+        def recorded_emit(*args):
+            klazz = type(args[ 0 ]) if len(args) == 1 else tuple
+            try:
+                encode = encoders.get(klazz) or self._encoder(klazz)
+                write(encode(clock() , name_id , self.depth , args))
+                self.count += 1
+            except Exception:
+                # the log misses the event, the scenario does not
+                if name not in self._failed_names:
+                    self._failed_names.add(name)
+                    logger.exception(f"event '{name}' cannot be recorded to '{self.path}', it is emitted unrecorded")
+                self.failed += 1
+            self.depth += 1
+            try:
+                return emit(*args)
+            finally:
+                self.depth -= 1
+
+        event.emit = recorded_emit
+        self._tapped.append(event)
+
+    def record(self , name: str , args: Tuple) -> None:
+        """append an event to the log, as if it had been emitted"""
+        klazz = type(args[ 0 ]) if len(args) == 1 else tuple
+        encode = self._encoders.get(klazz) or self._encoder(klazz)
+        self._file.write(encode(self.clock() , self._name_id(name) , self.depth , args))
+        self.count += 1
+
+    def _name_id(self , name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[ name ] = len(self._names)
+            body = name.encode()
+            self._file.write(_ENTRY.pack(NAME , _ID.size + len(body)) + _ID.pack(name_id) + body)
+        return name_id
+
+    def _encoder(self , klazz: type) -> Encoder:
+        """encoder of the event entries of a payload type, its type entry is written the first time"""
+        if klazz is tuple or not is_fixed_layout(klazz):
+            encoder = _pickled_encoder
+        else:
+            type_id = len(self._encoders) + 1
+            body = class_path(klazz).encode()
+            self._file.write(_ENTRY.pack(TYPE , _TYPE.size + len(body)) + _TYPE.pack(type_id , LAYOUT) + body)
+            encoder = _layout_encoder(type_id , SlotLayout(klazz))
+        self._encoders[ klazz ] = encoder
+        return encoder
+
+
+def _pickled_encoder(timestamp: int , name_id: int , depth: int , args: Tuple) -> bytes:
+    payload = pickle.dumps(args , pickle.HIGHEST_PROTOCOL)
+    return (_ENTRY.pack(EVENT , _EVENT.size + len(payload)) +
+            _EVENT.pack(timestamp , name_id , _PICKLED_TYPE_ID , depth) + payload)
+
+
+def _layout_encoder(type_id: int , layout: SlotLayout) -> Encoder:
+    values = layout.scalar_values
+    if not layout.has_arrays:
+        # the whole entry in a single pack
+        entry = struct.Struct(_ENTRY.format + _EVENT.format[ 1: ] + layout.format)
+        length = entry.size - _ENTRY.size
+
+        def encode(timestamp: int , name_id: int , depth: int , args: Tuple) -> bytes:
+            return entry.pack(EVENT , length , timestamp , name_id , type_id , depth , *values(args[ 0 ]))
+
+        return encode
+
+    header = struct.Struct(_ENTRY.format + _EVENT.format[ 1: ])
+    offset = header.size
+
+    def encode(timestamp: int , name_id: int , depth: int , args: Tuple) -> bytes:
+        buffer = bytearray(offset + layout.size)
+        header.pack_into(buffer , 0 , EVENT , len(buffer) - _ENTRY.size , timestamp , name_id , type_id , depth)
+        layout.write(buffer , offset , args[ 0 ])
+        return buffer
+
+    return encode
+
+
+class EventLog:
+    """
+    Memory-mapped recorded log, read sequentially with :meth:`entries`
+
+    :param path: log file written by a :class:`Recorder`
+    """
+
+    def __init__(self , path: str):
+        self.path = path
+        with open(path , "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(FILE_HEADER) or f.read(len(MAGIC)) != MAGIC:
+                raise Exception(f"'{path}' is not an event log")
+            self._mmap = mmap.mmap(f.fileno() , 0 , access=mmap.ACCESS_READ)
+        version = self._mmap[ len(MAGIC) ]
+        if version != LOG_FORMAT_VERSION:
+            raise Exception(f"event log '{path}' has format version {version}, expected {LOG_FORMAT_VERSION}")
+        self._view = memoryview(self._mmap)
+
+    def __enter__(self) -> EventLog:
+        return self
+
+    def __exit__(self , *exc_info):
+        self.close()
+
+    def entries(self , depth: Optional[ int ] = None , events: Optional[ Iterable[ str ] ] = None) -> Iterator[
+        LogEntry ]:
+        """
+        recorded events in order
+        :param depth: only the events of this depth, every depth when not given
+        :param events: only the events of these names, every event when not given
+        """
+        view = self._view
+        wanted = set(events) if events is not None else None
+        names: Dict[ int , str ] = dict()
+        layouts: Dict[ int , SlotLayout ] = dict()
+        entry_size , event_size = _ENTRY.size , _EVENT.size
+        offset , end = len(FILE_HEADER) , len(view)
+        while offset + entry_size <= end:
+            kind , length = _ENTRY.unpack_from(view , offset)
+            offset += entry_size
+            if offset + length > end:
+                logger.warning(f"event log '{self.path}' ends with a truncated entry")
+                return
+
+            if kind == EVENT:
+                timestamp , name_id , type_id , event_depth = _EVENT.unpack_from(view , offset)
+                name = names[ name_id ]
+                if (depth is None or event_depth == depth) and (wanted is None or name in wanted):
+                    start = offset + event_size
+                    if type_id == _PICKLED_TYPE_ID:
+                        args = pickle.loads(view[ start:offset + length ])
+                    else:
+                        args = (layouts[ type_id ].read(view , start) ,)
+                    yield LogEntry(timestamp , name , event_depth , args)
+            elif kind == NAME:
+                names[ _ID.unpack_from(view , offset)[ 0 ] ] = bytes(view[ offset + _ID.size:offset + length ]).decode()
+            elif kind == TYPE:
+                type_id , encoding = _TYPE.unpack_from(view , offset)
+                path = bytes(view[ offset + _TYPE.size:offset + length ]).decode()
+                if encoding != LAYOUT:
+                    raise Exception(f"event log '{self.path}': unknown payload encoding {encoding} of {path}")
+                layouts[ type_id ] = SlotLayout(load_class(path))
+            offset += length
+
+    def close(self) -> None:
+        """unmap the log, array views still referenced keep it mapped until they are released"""
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            logger.debug(f"event log '{self.path}' is still referenced, it is unmapped with the last view")
+
+
+def replay(log: Union[ str , EventLog ] , scenario: ScenarioComponent , speed: Optional[ float ] = None ,
+           depth: Optional[ int ] = 0 , events: Optional[ Iterable[ str ] ] = None) -> int:
+    """
+    emit the events of a recorded log on a scenario, in order
+    :param log: log file, or an opened :class:`EventLog`
+    :param scenario: scenario (or any of its components) to emit on
+    :param speed: None to replay as fast as possible, else the wall-clock rate relative to the recording: 1 replays
+        in real time, 10 ten times faster
+    :param depth: depth of the events to replay, 0 (the events emitted from outside any handler) by default, None
+        for every event
+    :param events: names of the events to replay, every event when not given
+    :return: number of events replayed
+    """
+    event_log = EventLog(log) if isinstance(log , str) else log
+    emit = scenario.event_emitter.emit
+    replayed = 0
+    try:
+        if not speed:
+            for entry in event_log.entries(depth , events):
+                emit(entry.name , *entry.args)
+                replayed += 1
+            return replayed
+
+        clock = time.perf_counter_ns
+        start = first = None
+        for entry in event_log.entries(depth , events):
+            if start is None:
+                start , first = clock() , entry.timestamp
+            delay = (entry.timestamp - first) / speed - (clock() - start)
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            emit(entry.name , *entry.args)
+            replayed += 1
+        return replayed
+    finally:
+        if event_log is not log:
+            event_log.close()
@@ -0,0 +1,594 @@
+""" Out-of-process sub-scenarios.
+
+A nodeset component marked ``outOfProcess: true`` in the ``components`` section is built in a worker process:
+
+    .. code-block:: yaml
+
+        components:
+            - name: VenueOne
+              nodesetClass: quantcerebro.nodeset.NodeSet
+              outOfProcess: true
+
+In the parent, the nodeset is a :class:`RemoteNodeSet` holding a :class:`RemoteNode` stub per remote node. Stubs keep
+the name, dependency tag and class name of the node they stand for, so the ``edges`` section is written as usual and
+event names stay "<predecessor class name>.<dataclass name>".
+
+Edges are wired by where their endpoints live:
+
+* both endpoints in the same worker: the edge is built in the worker, nothing crosses the boundary
+* remote predecessor: the worker forwards the event (and its batch companion) to the parent, where it is emitted on the
+  predecessor's stub, so local successors, inboxes and profiling work as for a local predecessor
+* remote successor: the parent forwards the event to the worker, where it is emitted on a stub of the predecessor
+* one worker to another: both of the above, relayed by the parent
+
+Only event dependencies may cross a process boundary, a callable dependency that does raises.
+
+Messages travel over a :func:`multiprocessing.Pipe`, written by one writer thread on each side: a message is pickled
+by the thread that sends it and queued, so threads may emit concurrently and no process blocks on a full pipe. An
+edge configured with ``transport: shm`` crosses through a shared memory ring instead, see :mod:`.transport`: the pipe
+then only carries a wake up message when the ring goes from empty to not empty.
+
+The parent delivers incoming events on its own thread when it pumps: call :meth:`.NodeSet.pump_remote` from the main
+loop, or :meth:`RemoteNodeSet.attach` the scenario to an asyncio loop. :meth:`.NodeSet.sync_remote` waits until every
+event emitted so far has crossed and been delivered, and :meth:`.NodeSet.stop_remote` stops the workers.
+
+Workers dispatch synchronously. A nodeset marked ``outOfProcess`` inside an out-of-process subtree runs in the same
+worker.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import asyncio
+import copy
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.reduction import ForkingPickler
+from typing import Any , Callable , Dict , List , Optional , Set , Tuple , Type
+
+# Local application/library specific imports.
+from .batch import batch_event_name
+from .dependencies import EdgeConfig , EventDependency , edge_event_name
+from .event import GraphEventEmitter
+from .inbox import defers_call
+from .meta import Config
+from .node import Node , NodeConfig
+from .nodeset import NodeSet , NodeSetConfig
+from .transport import PIPE , SHM , TRANSPORTS , SPILL , DEFAULT_RING_SIZE , BLOCK , RingBuffer , is_fixed_layout
+from .utils import load_class
+
+# 3rd-party imports
+...
+
+logger = logging.getLogger(__name__)
+
+# message kinds, parent -> worker
+WIRE = "wire"
+EMIT = "emit"
+CALL = "call"
+GET = "get"
+SYNC = "sync"
+STOP = "stop"
+# message kinds, worker -> parent
+EVENT = "event"
+REPLY = "reply"
+# message kind, both ways: records are waiting in the ring of a channel
+RING = "ring"
+
+_READY = 0  # request id of the build reply
+RING_POLL_INTERVAL = 0.01  # seconds between checks of the worker's inbound rings when no message arrives
+
+_remote_classes: Dict[ str , Type[ RemoteNode ] ] = dict()
+
+
+class RemoteNode(Node):
+    """
+    Stand-in for a node living in another process. Its class name is the class name of the node it stands for, see
+    :func:`remote_node_class`.
+    """
+
+    def __init__(self , node_config: NodeConfig , remote: Optional[ RemoteNodeSet ] = None):
+        super(RemoteNode , self).__init__(node_config)
+        self.remote = remote
+
+    def init_model(self , *args) -> None:
+        return None
+
+
+def remote_node_class(class_name: str) -> Type[ RemoteNode ]:
+    """:class:`RemoteNode` subclass named class_name, created once per name"""
+    klazz = _remote_classes.get(class_name)
+    if klazz is None:
+        klazz = _remote_classes[ class_name ] = type(class_name , (RemoteNode ,) , {"__module__": __name__})
+    return klazz
+
+
+def edge_ring(edge: EdgeConfig , edge_dataclass: Type) -> Optional[ RingBuffer ]:
+    """shared memory ring of an edge crossing a process boundary, None for the pipe transport"""
+    transport = edge.transport or PIPE
+    if transport not in TRANSPORTS:
+        raise ValueError(f"unknown transport '{transport}' on edge {edge.pred} -> {edge.succ}, expected one of "
+                         f"{TRANSPORTS}")
+    if transport == PIPE:
+        return None
+    if not is_fixed_layout(edge_dataclass):
+        raise Exception(f"{SHM} transport on edge {edge.pred} -> {edge.succ}: {edge_dataclass.__name__} does not have "
+                        f"a fixed layout")
+    return RingBuffer(edge_dataclass , edge.ring_size or DEFAULT_RING_SIZE , edge.overflow or BLOCK)
+
+
+def drain_ring(ring: RingBuffer , emitter: GraphEventEmitter , channel: str) -> int:
+    """
+    emit the records waiting in a ring. Records are read in place, unless a listener of the channel keeps them past
+    its return (asyncio inbox, conflation): they are copied out of their slot then, see :mod:`.transport`
+    """
+    copy_records = any(defers_call(listener) for listener in emitter.listeners.get(channel , ()))
+    return ring.drain(partial(emitter.emit , channel) , copy=copy_records)
+
+
+def forwarder(channel: str , send: Callable[ [ Tuple ] , Any ] , kind: str ,
+              ring: Optional[ RingBuffer ] = None) -> Callable:
+    """
+    event handler sending the events of a channel to the other process
+    :param send: sends a message to the other process
+    :param kind: kind of the messages carrying events over the pipe
+    :param ring: ring of the channel, records that fit go through it
+    """
+    if ring is None:
+        def forward(*args):
+            send((kind , channel , args))
+
+        return forward
+
+    def forward_through_ring(*args):
+        if len(args) == 1 and ring.fits(args[ 0 ]):
+            if ring.put(args[ 0 ]):
+                # the consumer may have caught up and be waiting for a message
+                if len(ring) <= 1:
+                    send((RING , channel))
+                return
+            if ring.overflow != SPILL:
+                return
+        send((kind , channel , args))
+
+    return forward_through_ring
+
+
+def detached_tree(nodeset_config: NodeSetConfig) -> NodeSetConfig:
+    """
+    deep copy of a nodeset config subtree without its parent, nested nodesets are marked in process (they run in the
+    worker of the subtree)
+    """
+    out = copy.deepcopy(nodeset_config , {id(nodeset_config.parent): None})
+    stack: List[ Config ] = [ out ]
+    while stack:
+        config = stack.pop()
+        if isinstance(config , NodeSetConfig):
+            config.out_of_process = False
+            stack.extend(config.components)
+    return out
+
+
+class RemoteNodeSet(NodeSet):
+    """
+    Parent side of an out-of-process nodeset: mirrors the subtree with stubs and talks to the worker process.
+
+    :param nodeset_config: config of the subtree
+    :param start_method: multiprocessing start method, the platform default when not given
+    """
+
+    def __init__(self , nodeset_config: NodeSetConfig , start_method: Optional[ str ] = None):
+        super(RemoteNodeSet , self).__init__(nodeset_config)
+        self.start_method = start_method
+        self.process: Optional[ multiprocessing.Process ] = None
+        self._conn = None
+        self._reader: Optional[ threading.Thread ] = None
+        # every message to the worker goes through the writer thread, in order, pickled by the sending thread
+        self._outbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[ threading.Thread ] = None
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._replies: Dict[ int , Tuple[ bool , Any ] ] = dict()
+        self._replied = threading.Condition()
+        self._request_ids = itertools.count(_READY + 1)
+        self._closed = False
+        self._loop: Optional[ asyncio.AbstractEventLoop ] = None
+        self._pump_scheduled = False
+
+        # wiring collected by build_edges, sent to the worker by wire()
+        self._internal_edges: List[ Tuple[ str , EdgeConfig ] ] = [ ]
+        self._exports: List[ Tuple[ str , str , Optional[ RingBuffer ] ] ] = [ ]
+        self._imports: List[ Tuple[ str , str , str , EdgeConfig ] ] = [ ]
+        self._import_rings: Dict[ str , RingBuffer ] = dict()
+        self._exported: Set[ str ] = set()
+        self._forwarded: Set[ str ] = set()
+        # shared memory rings, created (and unlinked) by the parent: every ring, and the ones the parent consumes
+        self.rings: Dict[ str , RingBuffer ] = dict()
+        self._inbound_rings: Dict[ str , RingBuffer ] = dict()
+
+        self._add_stubs(self , nodeset_config)
+
+    def _add_stubs(self , nodeset: NodeSet , nodeset_config: NodeSetConfig):
+        for config in nodeset_config.components:
+            if isinstance(config , NodeSetConfig):
+                child = NodeSet(config)
+                nodeset.add_child(child)
+                self._add_stubs(child , config)
+            else:
+                node_config = config
+                class_name = node_config.node_class.rsplit("." , 1)[ -1 ]
+                nodeset.add_child(remote_node_class(class_name)(node_config , self))
+
+    def is_remote(self) -> bool:
+        return True
+
+    def component_names(self) -> List[ str ]:
+        """names of this nodeset and of every nodeset and node stub below it"""
+        return [ self.name ] + list(self._nodeset_index) + list(self._node_index)
+
+    # worker life cycle
+    def start(self , lazy: bool = False , parallel: bool = False) -> None:
+        """start the worker process, which builds the components of the subtree, see :meth:`wait_ready`"""
+        if self.process is not None:
+            raise Exception(f"worker of nodeset '{self.name}' already started")
+        context = multiprocessing.get_context(self.start_method)
+        if os.name == "posix":
+            # the worker shares the parent's tracker of shared memory blocks instead of starting its own, which would
+            # unlink the rings when the worker exits
+            resource_tracker.ensure_running()
+        self._conn , child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main , name=f"quantcerebro-{self.name}" , daemon=True ,
+                                       args=(child_conn , detached_tree(self.nodeset_config) , lazy , parallel))
+        self.process.start()
+        child_conn.close()
+        self._reader = threading.Thread(target=self._read , name=f"quantcerebro-{self.name}-reader" , daemon=True)
+        self._reader.start()
+        self._writer = threading.Thread(target=self._write , name=f"quantcerebro-{self.name}-writer" , daemon=True)
+        self._writer.start()
+
+    def wait_ready(self , timeout: Optional[ float ] = None) -> None:
+        """wait until the worker has built the components of the subtree"""
+        self._wait(_READY , timeout)
+
+    def wire(self , timeout: Optional[ float ] = None) -> None:
+        """send the wiring collected by :meth:`add_internal_edge`, :meth:`export_event` and :meth:`import_event`"""
+        self._request((WIRE , self._internal_edges , self._exports , self._imports , self._import_rings) , timeout)
+        self._internal_edges , self._exports , self._imports , self._import_rings = [ ] , [ ] , [ ] , dict()
+
+    def stop(self , timeout: Optional[ float ] = 5.0) -> None:
+        """stop the worker, events not pumped yet are dropped"""
+        if self.process is None:
+            return
+        if not self._closed:
+            self._send((STOP ,))
+        self._outbox.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        # a writer blocked on a full pipe fails once the pipe is closed
+        self._conn.close()
+        if self._writer is not None:
+            self._writer.join()
+        self._closed = True
+        self.process = None
+        for ring in self.rings.values():
+            ring.unlink()
+
+    # wiring, called by the builder
+    def add_internal_edge(self , nodeset_name: str , edge: EdgeConfig) -> None:
+        """an edge between two nodes of the subtree, built in the worker"""
+        self._internal_edges.append((nodeset_name , edge))
+
+    def export_event(self , pred_name: str , name: str , edge: EdgeConfig , edge_dataclass: Type) -> None:
+        """
+        have the worker forward an event of one of its nodes (and the batch companion) to the parent, the transport of
+        the first edge exporting the event applies
+        """
+        if name not in self._exported:
+            self._exported.add(name)
+            ring = edge_ring(edge , edge_dataclass)
+            if ring is not None:
+                self.rings[ name ] = self._inbound_rings[ name ] = ring
+            self._exports.append((pred_name , name , ring))
+
+    def import_event(self , pred_node: Node , name: str , succ_name: str , edge: EdgeConfig ,
+                     edge_dataclass: Type) -> None:
+        """forward an event of a parent side predecessor (a local node or a stub) to a successor of the subtree"""
+        if name not in self._forwarded:
+            self._forwarded.add(name)
+            ring = edge_ring(edge , edge_dataclass)
+            if ring is not None:
+                self.rings[ name ] = self._import_rings[ name ] = ring
+            for channel in (name , batch_event_name(name)):
+                if channel not in pred_node.registered_events:
+                    pred_node.add_event(pred_node.name , channel)
+                pred_node.register_handler_to_event(pred_node.name , channel ,
+                                                    forwarder(channel , self._send , EMIT ,
+                                                              ring if channel == name else None))
+        self._imports.append((pred_node.__class__.__name__ , pred_node.name , succ_name , edge))
+
+    # delivery
+    def pump(self , timeout: float = 0.0) -> int:
+        """
+        emit the events received from the worker, on the calling thread
+        :param timeout: seconds to wait for a first event
+        :return: number of events delivered
+        """
+        delivered = 0
+        emitter = self.event_emitter
+        try:
+            message = self._events.get(timeout=timeout) if timeout else self._events.get_nowait()
+            while True:
+                if message[ 0 ] == EVENT:
+                    _ , channel , args = message
+                    emitter.emit(channel , *args)
+                    delivered += 1
+                message = self._events.get_nowait()
+        except queue.Empty:
+            pass
+
+        for channel , ring in self._inbound_rings.items():
+            delivered += drain_ring(ring , emitter , channel)
+        return delivered
+
+    def transport_stats(self) -> Dict[ str , Dict[ str , int ] ]:
+        """counters of the shared memory rings, by channel, see :meth:`.RingBuffer.stats`"""
+        return {channel: ring.stats() for channel , ring in self.rings.items()}
+
+    def sync(self , timeout: Optional[ float ] = None) -> int:
+        """
+        wait until the worker has handled every message sent so far, then deliver what it emitted meanwhile
+        :return: number of events delivered
+        """
+        self._request((SYNC ,) , timeout)
+        return self.pump()
+
+    def attach(self , loop: Optional[ asyncio.AbstractEventLoop ] = None) -> None:
+        """deliver received events from an asyncio loop (the running one by default) instead of :meth:`pump` calls"""
+        self._loop = loop or asyncio.get_running_loop()
+        if not self._events.empty():
+            self._schedule_pump()
+
+    def _schedule_pump(self):
+        if not self._pump_scheduled:
+            self._pump_scheduled = True
+            self._loop.call_soon_threadsafe(self._scheduled_pump)
+
+    def _scheduled_pump(self):
+        self._pump_scheduled = False
+        self.pump()
+
+    # queries
+    def call(self , node_name: str , method: str , *args , timeout: Optional[ float ] = None , **kwargs) -> Any:
+        """
+        call a method of a remote node and return its result, which must be picklable
+        :param method: method name, dotted names are resolved from the node, e.g. "model.return_attr"
+        """
+        return self._request((CALL , node_name , method , args , kwargs) , timeout)
+
+    def get(self , node_name: str , attribute: str , timeout: Optional[ float ] = None) -> Any:
+        """value of an attribute of a remote node, dotted names are resolved from the node, e.g. "model.attr" """
+        return self._request((GET , node_name , attribute) , timeout)
+
+    # plumbing
+    def _send(self , message: Tuple) -> None:
+        """
+        queue a message for the writer thread. It is pickled now, on the calling thread: changes made to its payload
+        after the call are not sent, and emitting threads never write to the pipe concurrently or block on it
+        """
+        self._outbox.put(ForkingPickler.dumps(message))
+
+    def _write(self):
+        while True:
+            payload = self._outbox.get()
+            if payload is None:
+                break
+            try:
+                self._conn.send_bytes(payload)
+            except OSError:
+                break
+
+    def _read(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError , OSError):
+                break
+            if message[ 0 ] in (EVENT , RING):
+                self._events.put(message)
+                if self._loop is not None:
+                    self._schedule_pump()
+            else:
+                _ , request_id , ok , value = message
+                with self._replied:
+                    self._replies[ request_id ] = (ok , value)
+                    self._replied.notify_all()
+
+        with self._replied:
+            self._closed = True
+            self._replied.notify_all()
+
+    def _request(self , message: Tuple , timeout: Optional[ float ]) -> Any:
+        request_id = next(self._request_ids)
+        self._send((message[ 0 ] , request_id) + message[ 1: ])
+        return self._wait(request_id , timeout)
+
+    def _wait(self , request_id: int , timeout: Optional[ float ]) -> Any:
+        with self._replied:
+            if not self._replied.wait_for(lambda: request_id in self._replies or self._closed , timeout):
+                raise TimeoutError(f"worker of nodeset '{self.name}' did not reply within {timeout}s")
+            if request_id not in self._replies:
+                raise Exception(f"worker of nodeset '{self.name}' exited")
+            ok , value = self._replies.pop(request_id)
+        if not ok:
+            raise Exception(f"worker of nodeset '{self.name}' failed:\n{value}")
+        return value
+
+
+def wire_remote_edge(nodeset_name: str , edge: EdgeConfig , pred_node: Node , succ_node: Node ,
+                     edge_dataclass: Type) -> bool:
+    """
+    wire the part of an edge that involves a worker
+    :return: True when the edge is fully handled, False when the parent still has to register the dependency of its
+        local successor
+    """
+    pred_remote = pred_node.remote if isinstance(pred_node , RemoteNode) else None
+    succ_remote = succ_node.remote if isinstance(succ_node , RemoteNode) else None
+    if pred_remote is None and succ_remote is None:
+        return False
+
+    if pred_remote is not None and pred_remote is succ_remote:
+        pred_remote.add_internal_edge(nodeset_name , edge)
+        return True
+
+    if edge.edge_type.lower() != "event":
+        raise Exception(f"{edge.edge_type} dependency {edge.pred} -> {edge.succ} crosses a process boundary, "
+                        f"only event dependencies can")
+
+    name = edge_event_name(pred_node , edge_dataclass)
+    if pred_remote is not None:
+        pred_remote.export_event(pred_node.name , name , edge , edge_dataclass)
+    if succ_remote is not None:
+        succ_remote.import_event(pred_node , name , succ_node.name , edge , edge_dataclass)
+        return True
+    return False
+
+
+class Worker:
+    """
+    Worker process side of an out-of-process nodeset
+
+    :param conn: worker end of the pipe
+    :param builder: builder of the subtree, components built
+    """
+
+    def __init__(self , conn , builder):
+        self.conn = conn
+        self.builder = builder
+        self.scenario: NodeSet = builder.scenario
+        self.stubs: Dict[ str , RemoteNode ] = dict()
+        self.rings: Dict[ str , RingBuffer ] = dict()  # inbound, by channel
+        self._outbound_rings: List[ RingBuffer ] = [ ]
+        # every message to the parent goes through the writer thread, in order
+        self.outbox: queue.SimpleQueue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self._write , name="quantcerebro-writer" , daemon=True)
+
+    def _write(self):
+        while True:
+            message = self.outbox.get()
+            if message is None:
+                break
+            try:
+                self.conn.send(message)
+            except OSError:
+                break
+
+    def reply(self , request_id: int , ok: bool , value: Any = None):
+        self.outbox.put((REPLY , request_id , ok , value))
+
+    def serve(self):
+        self.writer.start()
+        self.reply(_READY , True)
+        emitter = self.scenario.event_emitter
+        while True:
+            try:
+                # wake up messages may be missed, inbound rings are also checked periodically
+                if self.rings and not self.conn.poll(RING_POLL_INTERVAL):
+                    self.drain_rings()
+                    continue
+                message = self.conn.recv()
+            except (EOFError , OSError):
+                break
+
+            kind = message[ 0 ]
+            if kind == EMIT:
+                emitter.emit(message[ 1 ] , *message[ 2 ])
+                continue
+            if kind == RING:
+                self.drain_rings()
+                continue
+            if kind == STOP:
+                break
+
+            # a request sees every event sent before it
+            self.drain_rings()
+            request_id = message[ 1 ]
+            try:
+                if kind == WIRE:
+                    value = self.wire(*message[ 2: ])
+                elif kind == CALL:
+                    _ , _ , node_name , method , args , kwargs = message
+                    value = self.resolve(node_name , method)(*args , **kwargs)
+                elif kind == GET:
+                    value = self.resolve(message[ 2 ] , message[ 3 ])
+                else:
+                    value = None
+                self.reply(request_id , True , value)
+            except Exception:
+                self.reply(request_id , False , traceback.format_exc())
+
+        self.outbox.put(None)
+        self.writer.join()
+        for ring in list(self.rings.values()) + self._outbound_rings:
+            ring.close()
+
+    def drain_rings(self) -> int:
+        emitter = self.scenario.event_emitter
+        return sum(drain_ring(ring , emitter , channel) for channel , ring in self.rings.items())
+
+    def resolve(self , node_name: str , path: str) -> Any:
+        out = self.scenario.get_child_node(node_name)
+        for attribute in path.split("."):
+            out = getattr(out , attribute)
+        return out
+
+    def wire(self , internal_edges: List[ Tuple[ str , EdgeConfig ] ] ,
+             exports: List[ Tuple[ str , str , Optional[ RingBuffer ] ] ] ,
+             imports: List[ Tuple[ str , str , str , EdgeConfig ] ] , rings: Dict[ str , RingBuffer ]):
+        self.builder.build_edges(internal_edges)
+        self.rings.update(rings)
+
+        for pred_name , name , ring in exports:
+            if ring is not None:
+                self._outbound_rings.append(ring)
+            node = self.scenario.get_child_node(pred_name)
+            for channel in (name , batch_event_name(name)):
+                if channel not in node.registered_events:
+                    node.add_event(node.name , channel)
+                node.register_handler_to_event(node.name , channel ,
+                                               forwarder(channel , self.outbox.put , EVENT ,
+                                                         ring if channel == name else None))
+
+        for class_name , pred_name , succ_name , edge in imports:
+            stub = self.stubs.get(class_name)
+            if stub is None:
+                stub = self.stubs[ class_name ] = remote_node_class(class_name)(
+                    NodeConfig(pred_name , "" , "" , pred_name))
+                self.scenario.add_child(stub)
+                stub.consolidate_implemented_handlers()
+                stub.consolidate_implemented_interfaces()
+            succ_node = self.scenario.get_child_node(succ_name)
+            self.builder.add_edge(EventDependency(stub , succ_node , load_class(edge.edge_dataclass) ,
+                                                  conflate=bool(edge.conflate) , conflate_key=edge.conflate_key))
+
+
+def worker_main(conn , nodeset_config: NodeSetConfig , lazy: bool , parallel: bool):
+    """entry point of the worker process: build the subtree, then serve the parent"""
+    from .builder import ScenarioBuilder
+
+    try:
+        builder = ScenarioBuilder(nodeset_config , lazy=lazy , parallel=parallel)
+        builder.build_components()
+    except Exception:
+        conn.send((REPLY , _READY , False , traceback.format_exc()))
+        conn.close()
+        return
+
+    Worker(conn , builder).serve()
+    conn.close()
@@ -0,0 +1,139 @@
+""" Precompiled scenario snapshot.
+
+A snapshot is the output of :class:`.ConfigBuilder` (the composite :class:`.NodeSetConfig`), together with the flattened
+edge list :meth:`.ScenarioBuilder.build_edges` registers, stored as a pickle on disk. Loading a snapshot skips yaml
+parsing and the ``nodesetPath`` merge.
+
+The snapshot records the modification time and size of every file it was compiled from: the root yaml file, every
+``nodesetPath`` sub-scenario, and the module of every referenced class path (config, node, nodeset and edge classes).
+:func:`load_snapshot` returns ``None`` as soon as any of them changed, so a stale snapshot is never used.
+
+.. note::
+
+    only the modules named by class paths are tracked, a change in a module they import themselves is not detected.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+from dataclasses import dataclass , field
+from importlib import import_module
+from typing import List , Tuple , Dict , Optional , Iterable , cast
+
+# Local application/library specific imports.
+from .dependencies import EdgeConfig
+from .meta import Config
+from .nodeset import NodeSetConfig
+
+# 3rd-party imports
+...
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScenarioSnapshot:
+    """
+    :param source: resolved path of the root yaml file
+    :param nodeset_config: composite scenario config
+    :param edges: (nodeset name, edge config) pairs in registration order
+    :param class_paths: every class path referenced by the config
+    :param files: file path -> (st_mtime_ns, st_size) of every yaml source and class module
+    """
+    source: str
+    nodeset_config: NodeSetConfig
+    edges: List[ Tuple[ str , EdgeConfig ] ]
+    class_paths: List[ str ] = field(default_factory=list)
+    files: Dict[ str , Tuple[ int , int ] ] = field(default_factory=dict)
+
+    def is_fresh(self) -> bool:
+        """whether every file the snapshot was compiled from is unchanged on disk"""
+        return file_signatures(self.files) == self.files
+
+
+def collect_class_paths(nodeset_config: NodeSetConfig) -> List[ str ]:
+    """every config, node, nodeset and edge dataclass path referenced in a composite config"""
+    paths: Dict[ str , None ] = dict()
+    stack: List[ Config ] = [ nodeset_config ]
+    while stack:
+        config = stack.pop()
+        paths[ config.config_class ] = None
+        if config.is_nodeset_config():
+            config = cast(NodeSetConfig , config)
+            paths[ config.nodeset_class ] = None
+            for e in config.edges:
+                paths[ e.edge_dataclass ] = None
+            stack.extend(config.components)
+        else:
+            paths[ getattr(config , "node_class") ] = None
+
+    return [ p for p in paths if p ]
+
+
+def module_files(class_paths: Iterable[ str ]) -> List[ str ]:
+    """source files of the modules that define the class paths"""
+    files: Dict[ str , None ] = dict()
+    for path in class_paths:
+        module = import_module(path.rsplit("." , 1)[ 0 ])
+        module_file = getattr(module , "__file__" , None)
+        if module_file:
+            files[ os.path.realpath(module_file) ] = None
+
+    return list(files)
+
+
+def file_signatures(files: Iterable[ str ]) -> Dict[ str , Tuple[ int , int ] ]:
+    """(st_mtime_ns, st_size) of each file, files that no longer exist are left out"""
+    out = dict()
+    for f in files:
+        try:
+            stat = os.stat(f)
+        except OSError:
+            continue
+        out[ f ] = (stat.st_mtime_ns , stat.st_size)
+
+    return out
+
+
+def save_snapshot(snapshot: ScenarioSnapshot , path: str) -> None:
+    """
+    write snapshot to ``path``. The freshness header and the payload are pickled separately, so a stale snapshot can
+    be rejected without unpickling (and importing) the config classes it refers to.
+    """
+    header = (SNAPSHOT_FORMAT_VERSION , snapshot.source , snapshot.files)
+    payload = pickle.dumps(snapshot , protocol=pickle.HIGHEST_PROTOCOL)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path , "wb") as stream:
+        pickle.dump(header , stream , protocol=pickle.HIGHEST_PROTOCOL)
+        stream.write(payload)
+    os.replace(tmp_path , path)
+
+
+def load_snapshot(path: str , source: Optional[ str ] = None) -> Optional[ ScenarioSnapshot ]:
+    """
+    read a snapshot written by :func:`save_snapshot`
+    :param path: snapshot file path
+    :param source: when given, the snapshot is only accepted if it was compiled from this yaml file
+    :return: the snapshot, or None when it is missing, unreadable or stale
+    """
+    try:
+        with open(path , "rb") as stream:
+            version , snapshot_source , files = pickle.load(stream)
+            if version != SNAPSHOT_FORMAT_VERSION:
+                return None
+            if source is not None and os.path.realpath(source) != snapshot_source:
+                return None
+            if file_signatures(files) != files:
+                logger.info(f"snapshot {path} is stale")
+                return None
+            return cast(ScenarioSnapshot , pickle.load(stream))
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning(f"snapshot {path} can not be read: {exc}")
+        return None
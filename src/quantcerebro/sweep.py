@@ -0,0 +1,225 @@
+""" Parameter sweeps over a scenario.
+
+A sweep runs one scenario yaml file many times, each variant with some ``componentConfigs`` attributes overridden.
+Overrides are keyed ``"<component name>.<config field>"``, :func:`grid` expands axes of values into every combination:
+
+    .. code-block:: python
+
+        def backtest(scenario: NodeSet) -> Dict[ str , float ]:
+            scenario.get_child_node("feed").replay()
+            return {"pnl": scenario.get_child_node("strategy").model.pnl}
+
+        runner = SweepRunner("scenario.yml" , backtest , workers=8)
+        results = runner.run(grid({"strategy.threshold": [ 0.1 , 0.2 , 0.5 ] , "strategy.window": [ 20 , 50 ]}))
+        print(results.table())
+
+Variants run in a process pool. Each worker builds the base scenario once, with :func:`.build_scenario`, and builds
+every variant it runs as a :meth:`.NodeSet.clone` of it: yaml is parsed and node modules are imported once per worker,
+and models declared shareable are built once per worker as well, see :meth:`.Node.clone_model`.
+
+The run function receives the variant's scenario, and must be picklable (a module level function). Its return value is
+stored in the variant's row, a dict is merged into the row. Each row also holds the variant's overrides, the time spent
+building (``build_ms``) and running (``run_ms``) it, the worker's process id, and ``error`` when building or running
+failed: a failing variant does not stop the sweep.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass , field
+from typing import Any , Callable , Dict , Iterable , List , Optional , Sequence , Tuple
+
+# Local application/library specific imports.
+from .builder import build_scenario
+from .nodeset import NodeSet
+
+# 3rd-party imports
+...
+
+RunFunction = Callable[ [ NodeSet ] , Any ]
+
+
+def grid(axes: Dict[ str , Sequence[ Any ] ]) -> List[ Dict[ str , Any ] ]:
+    """
+    every combination of the axes values, the last axis varies fastest
+    :param axes: "<component name>.<config field>" -> values
+    :return: one override dict per variant
+    """
+    names = list(axes)
+    return [ dict(zip(names , values)) for values in itertools.product(*(axes[ name ] for name in names)) ]
+
+
+def nest_overrides(variant: Dict[ str , Any ]) -> Dict[ str , Dict[ str , Any ] ]:
+    """"<component name>.<config field>" -> value overrides, as :meth:`.NodeSet.clone` takes them"""
+    out: Dict[ str , Dict[ str , Any ] ] = dict()
+    for key , value in variant.items():
+        component , sep , config_field = key.rpartition(".")
+        if not sep:
+            raise Exception(f"override '{key}' is not of the form <component name>.<config field>")
+        out.setdefault(component , dict())[ config_field ] = value
+    return out
+
+
+@dataclass
+class SweepResult:
+    """
+    :param rows: one row per variant, in the order variants were given
+    :param startup_ms: time each worker that ran a variant took to build the base scenario, by process id
+    :param wall_ms: time the whole sweep took
+    """
+    rows: List[ Dict[ str , Any ] ] = field(default_factory=list)
+    startup_ms: Dict[ int , float ] = field(default_factory=dict)
+    wall_ms: float = 0.0
+
+    @property
+    def columns(self) -> List[ str ]:
+        """every row key, in first seen order"""
+        return list(dict.fromkeys(key for row in self.rows for key in row))
+
+    @property
+    def failed(self) -> List[ Dict[ str , Any ] ]:
+        return [ row for row in self.rows if row.get("error") is not None ]
+
+    def column(self , name: str) -> List[ Any ]:
+        return [ row.get(name) for row in self.rows ]
+
+    def table(self , columns: Optional[ List[ str ] ] = None) -> str:
+        """rows as fixed width text, one line per variant"""
+        columns = columns or self.columns
+        cells = [ [ _format(row.get(c)) for c in columns ] for row in self.rows ]
+        widths = [ max([ len(c) ] + [ len(line[ i ]) for line in cells ]) for i , c in enumerate(columns) ]
+        lines = [ "  ".join(c.rjust(w) for c , w in zip(columns , widths)) ]
+        lines.extend("  ".join(v.rjust(w) for v , w in zip(line , widths)) for line in cells)
+        return "\n".join(lines)
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value , float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+class SweepWorker:
+    """
+    Builds the base scenario once, then builds and runs variants as clones of it
+
+    :param file_path: base scenario yaml file
+    :param run: function run on each variant's scenario
+    :param snapshot_path: optional precompiled snapshot of the base scenario, see :func:`.compile_scenario`
+    :param dispatch: "sync" or "async" event delivery
+    """
+
+    def __init__(self , file_path: str , run: RunFunction , snapshot_path: Optional[ str ] = None ,
+                 dispatch: str = "sync"):
+        self.run = run
+        self.error: Optional[ str ] = None
+        self.scenario: Optional[ NodeSet ] = None
+        start = time.perf_counter()
+        try:
+            self.scenario = build_scenario(file_path , snapshot_path=snapshot_path , dispatch=dispatch)
+        except Exception as exc:
+            # reported by every variant, a failing pool initializer would break the pool instead
+            self.error = f"base scenario: {type(exc).__name__}: {exc}"
+        self.startup_ms = (time.perf_counter() - start) * 1e3
+
+    def run_variant(self , index: int , variant: Dict[ str , Any ]) -> Dict[ str , Any ]:
+        row: Dict[ str , Any ] = {"variant": index}
+        row.update(variant)
+        row.update(build_ms=None , run_ms=None , worker=os.getpid() , error=self.error)
+        if self.scenario is None:
+            return row
+
+        clock = time.perf_counter
+        scenario = None
+        try:
+            start = clock()
+            scenario = self.scenario.clone(nest_overrides(variant))
+            row[ "build_ms" ] = (clock() - start) * 1e3
+            start = clock()
+            result = self.run(scenario)
+            row[ "run_ms" ] = (clock() - start) * 1e3
+        except Exception as exc:
+            row[ "error" ] = f"{type(exc).__name__}: {exc}"
+            return row
+        finally:
+            if scenario is not None:
+                scenario.stop_remote()
+
+        if isinstance(result , dict):
+            row.update(result)
+        else:
+            row[ "result" ] = result
+        return row
+
+
+# the worker of the current pool process, set by the pool initializer
+_worker: Optional[ SweepWorker ] = None
+
+
+def _init_worker(*args) -> None:
+    global _worker
+    _worker = SweepWorker(*args)
+
+
+def _run_variant(index: int , variant: Dict[ str , Any ]) -> Tuple[ Dict[ str , Any ] , float ]:
+    return _worker.run_variant(index , variant) , _worker.startup_ms
+
+
+class SweepRunner:
+    """
+    Runs the variants of a scenario in a process pool, see :mod:`.sweep`
+
+    :param file_path: base scenario yaml file
+    :param run: module level function run on each variant's scenario, returns the variant's result
+    :param workers: pool size, the cpu count when not given, 0 runs every variant in this process
+    :param snapshot_path: optional precompiled snapshot of the base scenario, see :func:`.compile_scenario`
+    :param dispatch: "sync" or "async" event delivery
+    :param start_method: multiprocessing start method, the platform default when not given
+    """
+
+    def __init__(self , file_path: str , run: RunFunction , workers: Optional[ int ] = None ,
+                 snapshot_path: Optional[ str ] = None , dispatch: str = "sync" ,
+                 start_method: Optional[ str ] = None):
+        self.file_path = file_path
+        self.run_function = run
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.snapshot_path = snapshot_path
+        self.dispatch = dispatch
+        self.start_method = start_method
+
+    def run(self , variants: Iterable[ Dict[ str , Any ] ]) -> SweepResult:
+        """
+        build and run every variant
+        :param variants: "<component name>.<config field>" -> value overrides, one dict per variant, see :func:`grid`
+        :return: one row per variant, in order
+        """
+        variants = list(variants)
+        for variant in variants:
+            nest_overrides(variant)  # fail early on a malformed key
+        args = (self.file_path , self.run_function , self.snapshot_path , self.dispatch)
+        result = SweepResult()
+        start = time.perf_counter()
+
+        if self.workers == 0:
+            worker = SweepWorker(*args)
+            result.startup_ms[ os.getpid() ] = worker.startup_ms
+            result.rows = [ worker.run_variant(i , v) for i , v in enumerate(variants) ]
+        elif variants:
+            workers = min(self.workers , len(variants))
+            context = multiprocessing.get_context(self.start_method)
+            with ProcessPoolExecutor(workers , mp_context=context , initializer=_init_worker ,
+                                     initargs=args) as executor:
+                futures = [ executor.submit(_run_variant , i , v) for i , v in enumerate(variants) ]
+                for future in futures:
+                    row , startup_ms = future.result()
+                    result.rows.append(row)
+                    result.startup_ms[ row[ "worker" ] ] = startup_ms
+
+        result.wall_ms = (time.perf_counter() - start) * 1e3
+        return result
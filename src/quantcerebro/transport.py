@@ -0,0 +1,320 @@
+""" Shared memory transport for :class:`.EventDependency` edges crossing a process boundary.
+
+By default events crossing into or out of an out-of-process nodeset (:mod:`.remote`) are pickled over the worker's
+pipe. An edge whose dataclass has a fixed layout can travel through a :class:`RingBuffer` instead: a single producer,
+single consumer ring of fixed size slots in a :class:`multiprocessing.shared_memory.SharedMemory` block. Records are
+written into a slot once, and read in place by the consumer: array fields are delivered as numpy views of the slot,
+without a copy.
+
+A dataclass has a fixed layout when every field is an ``int``, a ``float``, a ``bool`` or an array declared with
+:func:`array_field`:
+
+    .. code-block:: python
+
+        @dataclass
+        class BookSnapshot:
+            seq: int
+            mid: float
+            bids: numpy.ndarray = array_field((10 , 2))
+            asks: numpy.ndarray = array_field((10 , 2))
+
+The transport is chosen per edge in the yaml ``edges`` section:
+
+    .. code-block:: yaml
+
+        edges:
+            - pred: VenueOne.book
+              succ: strategy
+              edgeType: event
+              edgeClass: venues.BookSnapshot
+              transport: shm
+              ringSize: 4096
+              overflow: block
+
+``overflow`` decides what happens when the ring is full:
+
+* ``block`` (default): the producer waits for a free slot, up to ``block_timeout`` seconds, then drops the record.
+  The timeout keeps two processes producing into each other's full rings from waiting forever
+* ``drop-newest``: the record is dropped
+* ``spill``: the record is pickled over the pipe instead, nothing is lost but the edge loses its ordering
+
+Records that do not match the layout (another type, several arguments) and batch companion events always travel over
+the pipe. Dropped and spilled records are counted in the shared header, see :meth:`RingBuffer.stats`.
+
+Array views handed to a handler are only valid until the handler returns, the slot is then reused: copy what has to be
+kept. Successors that receive the record later, through an asyncio inbox (:mod:`.inbox`) or a conflating edge
+(:mod:`.conflation`), are handed copies of the array fields instead of views. numpy is only needed for array fields.
+"""
+# standard lib imports
+from __future__ import annotations
+
+import logging
+import struct
+import time
+from dataclasses import field , fields , is_dataclass
+from operator import attrgetter
+from multiprocessing import shared_memory
+from typing import Any , Callable , Dict , List , Optional , Tuple , Type
+
+# 3rd-party imports
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PIPE = "pipe"
+SHM = "shm"
+TRANSPORTS = (PIPE , SHM)
+
+BLOCK = "block"
+DROP_NEWEST = "drop-newest"
+SPILL = "spill"
+OVERFLOW_POLICIES = (BLOCK , DROP_NEWEST , SPILL)
+
+DEFAULT_RING_SIZE = 1024
+DEFAULT_BLOCK_TIMEOUT = 1.0
+
+# dataclass field metadata keys of array fields
+ARRAY_SHAPE = "quantcerebro.shape"
+ARRAY_DTYPE = "quantcerebro.dtype"
+
+_SCALAR_FORMATS = {"int": "q" , "float": "d" , "bool": "?"}
+
+# header, one 8 bytes counter per entry. The consumer's read counter sits on its own cache line
+_WRITE , _DROPPED , _SPILLED , _SLOTS , _SLOT_SIZE = 0 , 1 , 2 , 3 , 4
+_READ = 8
+HEADER_SIZE = 128
+
+logger = logging.getLogger(__name__)
+
+
+def array_field(shape: Tuple[ int , ... ] , dtype: str = "float64" , **kwargs) -> Any:
+    """
+    dataclass field holding a numpy array of a fixed shape and dtype, part of a fixed layout
+    :param kwargs: passed on to :func:`dataclasses.field`
+    """
+    metadata = dict(kwargs.pop("metadata" , None) or { })
+    metadata[ ARRAY_SHAPE ] = tuple(shape)
+    metadata[ ARRAY_DTYPE ] = dtype
+    return field(metadata=metadata , **kwargs)
+
+
+def _scalar_format(annotation: Any) -> Optional[ str ]:
+    name = annotation if isinstance(annotation , str) else getattr(annotation , "__name__" , None)
+    return _SCALAR_FORMATS.get(name)
+
+
+def is_fixed_layout(data_class: Type) -> bool:
+    """whether records of a dataclass can travel through a :class:`RingBuffer`"""
+    if not is_dataclass(data_class):
+        return False
+    return all(ARRAY_SHAPE in f.metadata or _scalar_format(f.type) is not None for f in fields(data_class))
+
+
+class SlotLayout:
+    """
+    Fixed size binary layout of a dataclass: the scalar fields packed with :mod:`struct`, then each array field,
+    8 bytes aligned. Every value is stored little-endian.
+
+    :param data_class: dataclass with a fixed layout, see :func:`is_fixed_layout`
+    """
+
+    def __init__(self , data_class: Type):
+        if not is_fixed_layout(data_class):
+            raise TypeError(f"{data_class} is not a dataclass of int, float, bool and array_field fields")
+
+        self.data_class = data_class
+        self.field_count = len(fields(data_class))
+        self._scalar_names: List[ str ] = [ ]
+        self._scalar_positions: List[ int ] = [ ]
+        formats: List[ str ] = [ ]
+        arrays = [ ]
+        for position , f in enumerate(fields(data_class)):
+            if ARRAY_SHAPE in f.metadata:
+                arrays.append((position , f.name , f.metadata[ ARRAY_SHAPE ] , f.metadata[ ARRAY_DTYPE ]))
+            else:
+                self._scalar_names.append(f.name)
+                self._scalar_positions.append(position)
+                formats.append(_scalar_format(f.type))
+
+        # struct format of the scalar fields, without byte order
+        self.format = "".join(formats)
+        self._struct = struct.Struct("<" + self.format)
+        if len(self._scalar_names) == 1:
+            name = self._scalar_names[ 0 ]
+            self.scalar_values: Callable[ [ Any ] , Tuple ] = lambda record: (getattr(record , name) ,)
+        elif self._scalar_names:
+            self.scalar_values = attrgetter(*self._scalar_names)
+        else:
+            self.scalar_values = lambda record: ()
+        size = self._struct.size
+        # (position , name , offset , shape , dtype) of each array field
+        self._arrays: List[ Tuple[ int , str , int , Tuple[ int , ... ] , Any ] ] = [ ]
+        if arrays and numpy is None:
+            raise ImportError(f"numpy is required for the array fields of {data_class.__name__}")
+        for position , name , shape , dtype in arrays:
+            dtype = numpy.dtype(dtype).newbyteorder("<")
+            size = (size + 7) & ~7
+            self._arrays.append((position , name , size , shape , dtype))
+            size += int(numpy.prod(shape , dtype=numpy.int64)) * dtype.itemsize
+        self.size = max((size + 7) & ~7 , 8)
+
+    @property
+    def has_arrays(self) -> bool:
+        return bool(self._arrays)
+
+    def write(self , buffer: memoryview , offset: int , record: Any) -> None:
+        self._struct.pack_into(buffer , offset , *self.scalar_values(record))
+        for _ , name , array_offset , shape , dtype in self._arrays:
+            numpy.ndarray(shape , dtype , buffer=buffer , offset=offset + array_offset)[ ... ] = getattr(record , name)
+
+    def read(self , buffer: memoryview , offset: int , copy: bool = False) -> Any:
+        """record stored at offset, its array fields are views of the buffer, or copies when copy is set"""
+        scalars = self._struct.unpack_from(buffer , offset)
+        if not self._arrays:
+            return self.data_class(*scalars)
+
+        args: List[ Any ] = [ None ] * self.field_count
+        for position , value in zip(self._scalar_positions , scalars):
+            args[ position ] = value
+        for position , _ , array_offset , shape , dtype in self._arrays:
+            view = numpy.ndarray(shape , dtype , buffer=buffer , offset=offset + array_offset)
+            args[ position ] = view.copy() if copy else view
+        return self.data_class(*args)
+
+
+class RingBuffer:
+    """
+    Single producer, single consumer ring of :class:`SlotLayout` slots in shared memory.
+
+    The process creating the ring owns the shared memory block and unlinks it (:meth:`unlink`). A ring pickles as a
+    reference to the block, unpickled in another process it attaches to the same block.
+
+    :param data_class: dataclass with a fixed layout
+    :param slots: number of slots
+    :param overflow: what :meth:`put` does when the ring is full, see :mod:`.transport`
+    :param block_timeout: seconds a blocked :meth:`put` waits for a free slot before dropping the record
+    :param name: name of the shared memory block to attach to, a block is created when not given
+    """
+
+    def __init__(self , data_class: Type , slots: int = DEFAULT_RING_SIZE , overflow: str = BLOCK ,
+                 block_timeout: float = DEFAULT_BLOCK_TIMEOUT , name: Optional[ str ] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        if slots < 1:
+            raise ValueError(f"a ring needs at least one slot, got {slots}")
+
+        self.layout = SlotLayout(data_class)
+        self.slots = slots
+        self.slot_size = self.layout.size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.owner = name is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True , size=HEADER_SIZE + slots * self.slot_size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._buffer = self._shm.buf
+        self._header = self._buffer[ :HEADER_SIZE ].cast("Q")
+        if self.owner:
+            self._header[ _SLOTS ] = slots
+            self._header[ _SLOT_SIZE ] = self.slot_size
+        elif (self._header[ _SLOTS ] , self._header[ _SLOT_SIZE ]) != (slots , self.slot_size):
+            raise ValueError(f"ring '{name}' does not have the layout of {data_class.__name__}")
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __reduce__(self):
+        return RingBuffer , (self.layout.data_class , self.slots , self.overflow , self.block_timeout , self.name)
+
+    def __len__(self) -> int:
+        """number of records written and not consumed yet"""
+        return self._header[ _WRITE ] - self._header[ _READ ]
+
+    def fits(self , record: Any) -> bool:
+        return type(record) is self.layout.data_class
+
+    # producer
+    def put(self , record: Any) -> bool:
+        """
+        write a record into the next slot, applying the overflow policy when the ring is full
+        :return: whether the record was written, when it was not the caller spills it under the spill policy
+        """
+        header = self._header
+        write = header[ _WRITE ]
+        if write - header[ _READ ] >= self.slots and not self._wait_for_slot(write):
+            header[ _SPILLED if self.overflow == SPILL else _DROPPED ] += 1
+            return False
+
+        self.layout.write(self._buffer , HEADER_SIZE + (write % self.slots) * self.slot_size , record)
+        # publish the slot once it is written
+        header[ _WRITE ] = write + 1
+        return True
+
+    def _wait_for_slot(self , write: int) -> bool:
+        if self.overflow != BLOCK:
+            return False
+        header = self._header
+        deadline = time.monotonic() + self.block_timeout
+        pause = 1e-6
+        while write - header[ _READ ] >= self.slots:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(pause)
+            pause = min(pause * 2 , 1e-3)
+        return True
+
+    # consumer
+    def drain(self , callback: Callable[ [ Any ] , Any ] , limit: Optional[ int ] = None , copy: bool = False) -> int:
+        """
+        pass the written records to callback, in order. A slot is reused once callback returns
+        :param limit: most records to consume, all the available ones when not given
+        :param copy: hand callback records whose array fields are copied out of the slot, for callbacks that keep
+            the record after they return
+        :return: number of records consumed
+        """
+        header = self._header
+        layout , buffer , slots , slot_size = self.layout , self._buffer , self.slots , self.slot_size
+        read = header[ _READ ]
+        consumed = 0
+        while limit is None or consumed < limit:
+            write = header[ _WRITE ]
+            if read == write:
+                break
+            if limit is not None:
+                write = min(write , read + limit - consumed)
+            while read < write:
+                record = layout.read(buffer , HEADER_SIZE + (read % slots) * slot_size , copy)
+                try:
+                    callback(record)
+                finally:
+                    read += 1
+                    header[ _READ ] = read
+                    consumed += 1
+        return consumed
+
+    def stats(self) -> Dict[ str , int ]:
+        header = self._header
+        return {"written": header[ _WRITE ] , "consumed": header[ _READ ] , "pending": len(self) ,
+                "dropped": header[ _DROPPED ] , "spilled": header[ _SPILLED ] , "slots": self.slots ,
+                "slot_size": self.slot_size}
+
+    def close(self) -> None:
+        """detach from the shared memory block, array views still referenced by handlers keep it mapped"""
+        if self._header is None:
+            return
+        self._header.release()
+        self._header = None
+        try:
+            self._shm.close()
+        except BufferError:
+            logger.warning(f"ring '{self.name}' is still referenced, its memory is released with the last view")
+
+    def unlink(self) -> None:
+        """close, and release the shared memory block when this process owns it"""
+        self.close()
+        if self.owner:
+            self.owner = False
+            self._shm.unlink()
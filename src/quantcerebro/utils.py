@@ -1,7 +1,18 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
 from importlib import import_module
-from typing import Dict , Any
+from typing import Dict , Any , Optional , Tuple , List
 
-from yaml import safe_load
+from yaml import load
+
+# prefer the libyaml backed loader, it parses an order of magnitude faster than the pure python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 
 class Singleton(type):
@@ -26,26 +37,147 @@ def load_yaml(file: str) -> Dict[ str , Any ]:
     """
     try:
         with open(file , "r") as stream:
-            out = safe_load(stream)
+            out = load(stream , Loader=SafeLoader)
     except FileNotFoundError as exc:
         raise exc
 
     return out
 
 
+class YamlCache:
+    """
+    Bounded LRU cache of parsed yaml files. An entry is keyed by the resolved file path and is only reused while the
+    file's modification time and size are unchanged. Every lookup returns a private copy of the parsed document, so
+    callers are free to mutate the result.
+
+    :param maxsize: maximum number of parsed files kept in the cache
+    """
+
+    def __init__(self , maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[ str , Tuple[ Tuple[ int , int ] , Any ] ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self , file: str) -> Dict[ str , Any ]:
+        """
+        read yaml file into dictionary, parsing it only when it is not cached or it changed on disk
+        :param file: "yaml/file/path"
+        :return: dictionary of file
+        """
+        path = os.path.realpath(file)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns , stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[ 0 ] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return copy_tree(entry[ 1 ])
+
+        out = load_yaml(path)
+        with self._lock:
+            self.misses += 1
+            self._entries[ path ] = (signature , out)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return copy_tree(out)
+
+    def invalidate(self , file: Optional[ str ] = None) -> None:
+        """
+        drop a cached file, or every cached file when ``file`` is None
+        :param file: "yaml/file/path"
+        """
+        with self._lock:
+            if file is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.realpath(file) , None)
+
+
+yaml_cache = YamlCache()
+
+
+def load_yaml_cached(file: str) -> Dict[ str , Any ]:
+    """
+    read yaml file into dictionary through the process wide :class:`YamlCache`
+    :param file: "yaml/file/path"
+    :return: a private copy of the dictionary of file
+    """
+    return yaml_cache.load(file)
+
+
+def copy_tree(obj: Any) -> Any:
+    """
+    copy a parsed yaml document. Containers are rebuilt, immutable scalars are shared, which is considerably cheaper
+    than :func:`copy.deepcopy` on the plain dict/list trees yaml produces
+    """
+    if isinstance(obj , dict):
+        return {k: copy_tree(v) for k , v in obj.items()}
+    if isinstance(obj , list):
+        return [ copy_tree(v) for v in obj ]
+    if obj is None or isinstance(obj , (str , int , float , bool)):
+        return obj
+    return copy.deepcopy(obj)
+
+
+# process wide cache of resolved class paths, and the time each module took to import on first resolution
+_class_cache: Dict[ str , Any ] = dict()
+_import_times: Dict[ str , float ] = dict()
+
+
 def load_class(path: str):
     """
-    load class object from class path
+    load class object from class path. Resolved paths are cached for the lifetime of the process, and the time
+    spent importing each module the first time it is resolved is recorded, see :func:`import_time_report`
     :param path: "path.to.the.class"
     :return: class object
     """
+    try:
+        return _class_cache[ path ]
+    except KeyError:
+        pass
+
     try:
         components = path.split('.')
-        mod = import_module(".".join(components[ :-1 ]))
+        mod = _import_module_timed(".".join(components[ :-1 ]))
         mod = getattr(mod , components[ -1 ])
     except AttributeError as exc:
         raise exc
     except ModuleNotFoundError as exc2:
         raise exc2
 
+    _class_cache[ path ] = mod
     return mod
+
+
+def _import_module_timed(module_path: str):
+    if module_path in _import_times:
+        return import_module(module_path)
+
+    start = time.perf_counter()
+    mod = import_module(module_path)
+    _import_times[ module_path ] = time.perf_counter() - start
+    return mod
+
+
+def import_time_report() -> List[ Tuple[ str , float ] ]:
+    """
+    time spent importing each module resolved through :func:`load_class`, slowest first. Modules that were already
+    imported when first resolved report (close to) zero.
+    :return: list of (module path, seconds)
+    """
+    return sorted(_import_times.items() , key=lambda item: item[ 1 ] , reverse=True)
+
+
+def clear_class_cache() -> None:
+    """forget resolved class paths and recorded import times"""
+    _class_cache.clear()
+    _import_times.clear()
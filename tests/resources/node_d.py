@@ -6,6 +6,7 @@ from typing import Dict , Any , cast
 
 from resources.node_b import BEvent
 from src.quantcerebro import Node , NodeConfig
+from src.quantcerebro.batch import RecordBatch , batch_handler
 
 
 class DModel:
@@ -46,3 +47,49 @@ class D(Node):
     def consolidate_implemented_handlers(self):
         super().consolidate_implemented_handlers()
         self.implemented_event_handlers["B.BEvent"] = self.handler
+
+
+class BatchD(D):
+
+    def __init__(self, node_config: DConfig):
+        super().__init__(node_config)
+        self.batches = []
+
+    @batch_handler
+    def batch_handler(self, batch: RecordBatch):
+        self.batches.append(batch)
+
+    def consolidate_implemented_handlers(self):
+        super().consolidate_implemented_handlers()
+        self.implemented_event_handlers["B.BEvent"] = self.batch_handler
+
+
+class SharedD(D):
+    share_model = True
+
+
+class TableModel:
+    def __init__(self, table: Dict[str, float], attr: str):
+        self.table = table
+        self.attr = attr
+
+
+class TableD(D):
+    """loads a reference table once, clones share it and only take their own attr"""
+    table_loads = 0
+
+    def init_model(self) -> TableModel:
+        TableD.table_loads += 1
+        return TableModel({"ES": 50.0, "NQ": 20.0}, self.node_config.attr)
+
+    def clone_model(self, source: TableD) -> TableModel:
+        return TableModel(source.model.table, self.node_config.attr)
+
+
+def emit_b_event(scenario) -> Dict[str, Any]:
+    """sweep run function: emits a BEvent from B, and reads what D received"""
+    if scenario.get_child_node("D").model.attr == "fail":
+        raise ValueError("failing variant")
+    scenario.notify_handlers("B", "B.BEvent", BEvent(scenario.get_child_node("B").model.attr))
+    d = scenario.get_child_node("D")
+    return {"received": d.event_value.msg, "d_attr": d.model.attr}
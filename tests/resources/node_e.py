@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict , cast
+
+from src.quantcerebro import Node , NodeConfig
+
+
+class Interrupted(BaseException):
+    """not an Exception, as KeyboardInterrupt"""
+
+
+class EModel:
+    def __init__(self , attr: str):
+        if attr.startswith("fail"):
+            raise ValueError(attr)
+        if attr == "interrupt":
+            raise Interrupted(attr)
+        self.attr = attr
+        self.pid = os.getpid()
+
+
+@dataclass
+class EConfig(NodeConfig):
+    attr: str
+
+    @classmethod
+    def from_dict(cls , config_dict: Dict) -> EConfig:
+        name = config_dict[ "name" ]
+        config_class = config_dict[ "configClass" ]
+        node_class = config_dict[ "nodeClass" ]
+        dependency_tag = name
+        attr = config_dict[ "attr" ]
+        return cls(name , config_class , node_class , dependency_tag , attr)
+
+
+class E(Node):
+    def __init__(self , node_config: EConfig):
+        super().__init__(node_config)
+        self.node_config = cast(EConfig , node_config)
+        self.model = cast(EModel , self.model)
+
+    def init_model(self) -> EModel:
+        return EModel(self.node_config.attr)
+
+
+class EProcess(E):
+    model_executor = "process"
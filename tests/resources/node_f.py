@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy
+
+from src.quantcerebro import Node
+from src.quantcerebro.transport import array_field
+
+
+@dataclass
+class FTick:
+    seq: int
+    price: float
+    levels: numpy.ndarray = array_field((4 ,))
+
+
+class FModel:
+    def __init__(self):
+        self.received = [ ]
+
+
+class F(Node):
+    """keeps what it receives, array fields are copied out of the transport's buffer"""
+
+    def init_model(self) -> FModel:
+        return FModel()
+
+    def handler(self , tick: FTick):
+        self.model.received.append((tick.seq , tick.price , tick.levels.tolist()))
+
+    def consolidate_implemented_handlers(self):
+        super().consolidate_implemented_handlers()
+        self.implemented_event_handlers[ "A.FTick" ] = self.handler
+        self.implemented_event_handlers[ "B.FTick" ] = self.handler
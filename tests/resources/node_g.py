@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from abc import abstractmethod , ABC
+from typing import List , Tuple
+
+from src.quantcerebro import Node
+from src.quantcerebro.callbatch import batch_method
+
+
+class Pricing(ABC):
+    @abstractmethod
+    def price(self , instrument: str) -> float:
+        raise NotImplementedError
+
+
+class GModel:
+    def __init__(self):
+        self.calls: List[ int ] = [ ]  # size of each call into the model
+
+    def price(self , instruments: List[ str ]) -> List[ float ]:
+        self.calls.append(len(instruments))
+        return [ float(len(instrument)) for instrument in instruments ]
+
+
+class G(Node , Pricing):
+    """prices instruments one by one, or many at once through its batch method"""
+
+    def init_model(self) -> GModel:
+        return GModel()
+
+    def price(self , instrument: str) -> float:
+        return self.model.price([ instrument ])[ 0 ]
+
+    @batch_method("price")
+    def price_many(self , calls: List[ Tuple[ str ] ]) -> List[ float ]:
+        return self.model.price([ instrument for instrument , in calls ])
+
+    def consolidate_implemented_interfaces(self):
+        super().consolidate_implemented_interfaces()
+        self.implemented_interfaces[ "G.Pricing" ] = self
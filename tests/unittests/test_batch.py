@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+import pytest
+
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.batch import RecordBatch , batch_handler , is_batch_handler
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.utils import load_class
+
+# the edge dataclass as the builder resolves it
+BEvent = load_class("tests.resources.node_b.BEvent")
+
+
+@dataclass
+class Tick:
+    symbol: str
+    price: float
+
+
+class TestRecordBatch:
+
+    def test_columns(self):
+        batch = RecordBatch(Tick , {"symbol": [ "a" , "b" ] , "price": [ 1.0 , 2.0 ]})
+        assert len(batch) == 2
+        assert list(batch.records()) == [ Tick("a" , 1.0) , Tick("b" , 2.0) ]
+
+    def test_structured_array(self):
+        np = pytest.importorskip("numpy")
+        array = np.array([ ("a" , 1.0) , ("b" , 2.0) ] , dtype=[ ("symbol" , "U4") , ("price" , "f8") ])
+        batch = RecordBatch(Tick , array)
+        assert len(batch) == 2
+        assert batch.column("price").base is array , "columns should be views on the array"
+        records = list(batch.records())
+        assert records == [ Tick("a" , 1.0) , Tick("b" , 2.0) ]
+        assert type(records[ 0 ].price) is float
+
+    def test_from_records(self):
+        batch = RecordBatch.from_records(Tick , [ Tick("a" , 1.0) ])
+        assert batch.columns == {"symbol": [ "a" ] , "price": [ 1.0 ]}
+
+    def test_invalid(self):
+        with pytest.raises(KeyError):
+            RecordBatch(Tick , {"symbol": [ "a" ]})
+        with pytest.raises(ValueError):
+            RecordBatch(Tick , {"symbol": [ "a" ] , "price": [ ]})
+        with pytest.raises(TypeError):
+            RecordBatch(dict , {})
+
+    def test_batch_handler(self):
+        @batch_handler
+        def handler(batch):
+            ...
+
+        assert is_batch_handler(handler)
+        assert not is_batch_handler(print)
+
+
+class TestBatchEmission:
+
+    @staticmethod
+    def build(succ_class):
+        nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                       "src.quantcerebro.nodeset.NodeSet")
+        nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                "b" , ""))
+        nodeset_config.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" ,
+                                                f"tests.resources.node_d.{succ_class}" , "d" , ""))
+        nodeset_config.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+        return ScenarioBuilder(nodeset_config).build()
+
+    def test_unpacked_for_record_handler(self):
+        scenario = self.build("D")
+        d = scenario.get_child_node("d")
+        scenario.notify_handlers_batch("b" , "B.BEvent" , RecordBatch(BEvent , {"msg": [ "m1" , "m2" ]}))
+        assert d.event_value == BEvent("m2")
+
+    def test_batch_handler_receives_blocks(self):
+        scenario = self.build("BatchD")
+        d = scenario.get_child_node("d")
+        batch = RecordBatch(BEvent , {"msg": [ "m1" , "m2" ]})
+        scenario.notify_handlers_batch("b" , "B.BEvent" , batch)
+        assert d.batches == [ batch ]
+
+        scenario.notify_handlers("b" , "B.BEvent" , BEvent("m3"))
+        assert len(d.batches) == 2
+        assert list(d.batches[ 1 ].records()) == [ BEvent("m3") ]
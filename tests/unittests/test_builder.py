@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import cast
 
 import pytest
@@ -5,11 +7,45 @@ import pytest
 from resources.node_a import AConfig
 from resources.node_b import BConfig , B
 from resources.node_d import DConfig
+from resources.node_e import EConfig
 from src.quantcerebro import NodeSetConfig , load_class , NodeConfig
 from src.quantcerebro.builder import ScenarioBuilder , ConfigBuilder
 from src.quantcerebro.dependencies import EdgeConfig
 
 
+SUB_SCENARIO_YAML = """
+name: sub_scenario
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: {a}
+    nodeClass: tests.resources.node_a.A
+edges: []
+componentConfigs:
+  - name: {a}
+    configClass: tests.resources.node_a.AConfig
+    attr: attrA
+"""
+
+ROOT_SCENARIO_YAML = """
+name: root
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: SetOne
+    nodesetClass: tests.resources.nodeset_ab.SetOne
+  - name: D
+    nodeClass: tests.resources.node_d.D
+edges: []
+componentConfigs:
+  - name: D
+    configClass: tests.resources.node_d.DConfig
+    attr: attrD
+  - name: SetOne
+    nodesetPath: {path}
+"""
+
+
 class TestConfigBuilder:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -20,6 +56,29 @@ class TestConfigBuilder:
         cb.build()
         print(cb.scenario_config)
 
+    def test_sub_scenario_overrides(self , tmp_path):
+        sub_path = tmp_path / "sub.yml"
+        sub_path.write_text(SUB_SCENARIO_YAML.format(a="A"))
+        root_path = tmp_path / "root.yml"
+        root_path.write_text(ROOT_SCENARIO_YAML.format(path=sub_path))
+
+        scenario_config = ConfigBuilder(str(root_path)).build()
+
+        sub_config = scenario_config.get_nodeset_config("SetOne")
+        assert sub_config.nodeset_class == "tests.resources.nodeset_ab.SetOne"
+        assert [ c.name for c in sub_config.components ] == [ "A" ]
+        assert scenario_config.get_child_component_config("A").parent is sub_config
+        assert scenario_config.get_child_component_config("D").attr == "attrD"
+
+    def test_duplicate_name(self , tmp_path):
+        sub_path = tmp_path / "sub.yml"
+        sub_path.write_text(SUB_SCENARIO_YAML.format(a="D"))
+        root_path = tmp_path / "root.yml"
+        root_path.write_text(ROOT_SCENARIO_YAML.format(path=sub_path))
+
+        with pytest.raises(Exception , match="name 'D' is already used in"):
+            ConfigBuilder(str(root_path)).build()
+
 
 class TestScenarioBuilder:
 
@@ -103,6 +162,30 @@ class TestScenarioBuilder:
 
         # print(cast(B, scenario.get_child_node("b")).registered_interfaces["A.InterfaceA"].interface_method() )
 
+    def test_scenarios_isolated(self):
+        scenario1 = ScenarioBuilder(self.nodeset_config).build()
+        scenario2 = ScenarioBuilder(self.nodeset_config).build()
+        assert scenario1.event_emitter is not scenario2.event_emitter
+        assert scenario1.get_child_node("b").event_emitter is scenario1.event_emitter
+
+        scenario1.notify_handlers("b" , "B.BEvent" , "scenario1")
+        assert scenario1.get_child_node("d").event_value == "scenario1"
+        assert scenario2.get_child_node("d").event_value is None
+
+    def test_build_edges_consolidates_once(self , mocker):
+        builder = ScenarioBuilder(self.nodeset_config)
+        spy_interfaces = mocker.spy(builder.scenario , "consolidate_implemented_interfaces")
+        spy_handlers = mocker.spy(builder.scenario , "consolidate_implemented_handlers")
+
+        scenario = builder.build()
+
+        assert spy_interfaces.call_count == 1
+        assert spy_handlers.call_count == 1
+        assert len(scenario.edges) == 1
+        assert len(scenario.get_nodeset("child_nodeset").edges) == 1
+        assert scenario.get_child_node("b").registered_interfaces[ "A.InterfaceA" ].interface_method() == \
+               "interface_return_value"
+
 
 
 
@@ -174,3 +257,80 @@ class TestScenarioBuilder:
 #
 # class TestEdgeSection:
 #     ...
+
+
+class TestLazyScenarioBuilder:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                            "src.quantcerebro.nodeset.NodeSet")
+        self.nodeset_config.add_child_config(AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" ,
+                                                     "a" , "attrA"))
+        self.nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                     "b" , "attrB"))
+        self.nodeset_config.add_edge_config(EdgeConfig("a" , "b" , "tests.resources.node_a.InterfaceA" , "callable"))
+
+    def test_build_lazy(self , mocker):
+        init_model = mocker.spy(load_class("tests.resources.node_a.A") , "init_model")
+        builder = ScenarioBuilder(self.nodeset_config , lazy=True)
+        scenario = builder.build()
+
+        assert init_model.call_count == 0
+        report = builder.deferred_report()
+        assert (report[ "deferred" ] , report[ "materialized" ]) == (2 , 0)
+        assert sorted(report[ "pending" ]) == [ "a" , "b" ]
+        # wiring happens at build time
+        assert scenario.get_child_node("b").registered_interfaces[ "A.InterfaceA" ] is scenario.get_child_node("a")
+
+        assert scenario.get_child_node("a").model.return_attr() == "attrA"
+        assert init_model.call_count == 1
+        assert not scenario.get_child_node("a").model_deferred
+        assert builder.deferred_report() == {"deferred": 2 , "materialized": 1 , "pending": [ "b" ]}
+
+    def test_build_eager(self):
+        builder = ScenarioBuilder(self.nodeset_config)
+        scenario = builder.build()
+        assert scenario.deferred_nodes() == [ ]
+        assert builder.deferred_report()[ "deferred" ] == 0
+
+
+class TestParallelScenarioBuilder:
+
+    @staticmethod
+    def nodeset_config(*nodes):
+        nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                       "src.quantcerebro.nodeset.NodeSet")
+        for name , node_class , attr in nodes:
+            nodeset_config.add_child_config(EConfig(name , "tests.resources.node_e.EConfig" ,
+                                                    f"tests.resources.node_e.{node_class}" , name , attr))
+        return nodeset_config
+
+    def test_build_parallel(self):
+        nodeset_config = self.nodeset_config(("e1" , "E" , "attr1") , ("e2" , "EProcess" , "attr2") ,
+                                             ("e3" , "E" , "attr3"))
+        scenario = ScenarioBuilder(nodeset_config , parallel=True , max_workers=2).build()
+
+        assert scenario.deferred_nodes() == [ ]
+        assert [ scenario.get_child_node(n).model.attr for n in [ "e1" , "e2" , "e3" ] ] == [ "attr1" , "attr2" , "attr3" ]
+        assert scenario.get_child_node("e1").model.pid == os.getpid()
+        assert scenario.get_child_node("e2").model.pid != os.getpid() , "process model should be built in a worker"
+
+    def test_build_parallel_errors(self):
+        nodeset_config = self.nodeset_config(("e1" , "E" , "fail1") , ("e2" , "E" , "attr2") , ("e3" , "E" , "fail3"))
+        builder = ScenarioBuilder(nodeset_config , parallel=True)
+        with pytest.raises(Exception , match="model construction failed for node\\(s\\): e3, e1") as exc_info:
+            builder.build()
+        # registration order is last config first, see build_components
+        assert str(exc_info.value.__cause__) == "fail3"
+
+    def test_build_parallel_interrupted(self , mocker):
+        # as the builder loads it
+        Interrupted = load_class("tests.resources.node_e.Interrupted")
+        shutdown = mocker.spy(ThreadPoolExecutor , "shutdown")
+        nodeset_config = self.nodeset_config(("e1" , "E" , "attr1") , ("e2" , "E" , "interrupt"))
+        builder = ScenarioBuilder(nodeset_config , parallel=True)
+        with pytest.raises(Interrupted):
+            builder.build()
+        assert shutdown.call_count == 1 , "the pool created by the builder should be shut down"
+        assert builder.thread_executor is None
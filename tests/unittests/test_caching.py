@@ -0,0 +1,123 @@
+import pytest
+
+from resources.node_a import AConfig
+from resources.node_b import BConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.caching import InterfaceCache , CachedInterface
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.nodeset import NodeSetConfig
+
+
+class Specs:
+    def __init__(self):
+        self.calls = 0
+        self.venue = "CME"
+
+    def spec(self , symbol , multiplier=1):
+        self.calls += 1
+        if symbol is None:
+            raise KeyError(symbol)
+        return f"{symbol}x{multiplier}"
+
+
+class TestInterfaceCache:
+
+    def test_hits_and_lru(self):
+        target = Specs()
+        cache = InterfaceCache(maxsize=2)
+        specs = CachedInterface(target , cache)
+        assert specs.spec("ES") == specs.spec("ES") == "ESx1"
+        assert specs.spec("ES" , multiplier=2) == "ESx2"
+        assert target.calls == 2
+        # ES is the least recently used entry
+        specs.spec("NQ")
+        specs.spec("ES")
+        assert target.calls == 4
+        assert specs.venue == "CME"
+        stats = cache.stats()
+        assert (stats[ "hits" ] , stats[ "misses" ] , stats[ "size" ] , stats[ "evictions" ]) == (1 , 4 , 2 , 2)
+
+    def test_normalized_and_typed_keys(self):
+        target = Specs()
+        cache = InterfaceCache()
+        specs = CachedInterface(target , cache)
+        assert specs.spec("ES") == specs.spec("ES" , 1) == specs.spec(symbol="ES" , multiplier=1) == "ESx1"
+        assert target.calls == 1
+        specs.spec("ES" , 1.0)
+        specs.spec("ES" , True)
+        assert target.calls == 3 , "arguments of other types are cached apart"
+        assert cache.invalidate("spec" , symbol="ES") == 1
+        assert cache.invalidate("spec" , "ES" , True) == 1
+        with pytest.raises(TypeError):
+            specs.spec("ES" , venue="CME")
+
+    def test_ttl(self):
+        now = [ 0.0 ]
+        target = Specs()
+        cache = InterfaceCache(ttl=1.0 , clock=lambda: now[ 0 ])
+        specs = CachedInterface(target , cache)
+        specs.spec("ES")
+        now[ 0 ] = 0.5
+        specs.spec("ES")
+        now[ 0 ] = 1.0
+        specs.spec("ES")
+        assert target.calls == 2
+        assert cache.expirations == 1
+
+    def test_invalidate(self):
+        cache = InterfaceCache()
+        specs = CachedInterface(Specs() , cache)
+        for symbol in ("ES" , "NQ" , "CL"):
+            specs.spec(symbol)
+        assert cache.invalidate("spec" , "ES") == 1
+        assert cache.invalidate("spec" , "ES") == 0
+        assert cache.invalidate("spec") == 2
+        specs.spec("ES")
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+
+    def test_uncacheable_and_errors(self):
+        target = Specs()
+        cache = InterfaceCache()
+        specs = CachedInterface(target , cache)
+        specs.spec([ "ES" ])
+        specs.spec([ "ES" ])
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                specs.spec(None)
+        assert target.calls == 4
+        assert cache.uncacheable == 2
+        assert len(cache) == 0
+
+
+class TestCachingEdge:
+
+    def build(self , **edge_options):
+        nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                       "src.quantcerebro.nodeset.NodeSet")
+        nodeset_config.add_child_config(AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" ,
+                                                "a" , ""))
+        nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                "b" , ""))
+        nodeset_config.add_edge_config(EdgeConfig("a" , "b" , "tests.resources.node_a.InterfaceA" , "callable" ,
+                                                  **edge_options))
+        return ScenarioBuilder(nodeset_config).build()
+
+    def test_not_cached_by_default(self):
+        scenario = self.build()
+        a = scenario.get_child_node("a")
+        assert scenario.get_child_node("b").registered_interfaces[ "A.InterfaceA" ] is a
+        assert scenario.interface_cache_stats() == {}
+
+    def test_cached_edge(self):
+        scenario = self.build(cache_size=16)
+        a = scenario.get_child_node("a")
+        interface = scenario.get_child_node("b").registered_interfaces[ "A.InterfaceA" ]
+        assert isinstance(interface , CachedInterface)
+        assert interface.interface_method() == interface.interface_method() == "interface_return_value"
+
+        stats = scenario.interface_cache_stats()[ "a->b:InterfaceA" ]
+        assert (stats[ "hits" ] , stats[ "misses" ]) == (1 , 1)
+        # invalidation triggered by the predecessor
+        assert a.invalidate_interface_caches("A.InterfaceA") == 1
+        assert a.invalidate_interface_caches() == 0
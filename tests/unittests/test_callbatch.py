@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from resources.node_b import BConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.callbatch import CallBatcher , BatchingInterface , PendingResult , batch_methods
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.node import NodeConfig
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.utils import load_class
+
+G = load_class("tests.resources.node_g.G")
+
+
+def pricer() -> G:
+    g = G(NodeConfig("g" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_g.G" , "g"))
+    g.consolidate_implemented_interfaces()
+    return g
+
+
+class TestBatchingInterface:
+
+    def test_batch_methods(self):
+        assert batch_methods(G) == {"price": "price_many"}
+
+    def test_collect_then_read(self):
+        g = pricer()
+        batcher = CallBatcher()
+        proxy = BatchingInterface(g , batcher)
+        pending = [ proxy.price(instrument) for instrument in ("ES" , "NQH5" , "CL") ]
+        assert all(isinstance(p , PendingResult) and not p.done() for p in pending)
+        assert g.model.calls == [ ]
+
+        assert [ p.result() for p in pending ] == [ 2.0 , 4.0 , 2.0 ]
+        assert g.model.calls == [ 3 ]
+        assert proxy.name == "g"
+        assert batcher.stats() == {"calls": 3 , "dispatches": 1 , "mean_batch": 3.0 , "largest_batch": 3 ,
+                                   "pending": 0}
+
+    def test_max_batch(self):
+        g = pricer()
+        proxy = BatchingInterface(g , CallBatcher(max_batch=2))
+        pending = [ proxy.price("ES") for _ in range(5) ]
+        assert g.model.calls == [ 2 , 2 ]
+        pending[ -1 ].result()
+        assert g.model.calls == [ 2 , 2 , 1 ]
+
+    def test_failing_batch(self):
+        g = pricer()
+        proxy = BatchingInterface(g , CallBatcher())
+        pending = [ proxy.price("ES") , proxy.price(None) ]
+        for p in pending:
+            with pytest.raises(TypeError):
+                p.result()
+
+    def test_asyncio_window(self):
+        g = pricer()
+        proxy = BatchingInterface(g , CallBatcher())
+
+        async def run():
+            pending = [ proxy.price(instrument) for instrument in ("ES" , "NQH5") ]
+            assert all(isinstance(p , PendingResult) for p in pending)
+            return await asyncio.gather(*pending)
+
+        assert asyncio.run(run()) == [ 2.0 , 4.0 ]
+        assert g.model.calls == [ 2 ]
+
+    def test_await_result_collected_outside_loop(self):
+        g = pricer()
+        proxy = BatchingInterface(g , CallBatcher())
+        pending = [ proxy.price("ES") , proxy.price("NQH5") ]
+        failing = BatchingInterface(g , CallBatcher()).price(None)
+
+        async def run():
+            assert await pending[ 1 ] == 4.0
+            with pytest.raises(TypeError):
+                await failing
+
+        asyncio.run(run())
+        assert g.model.calls == [ 2 , 1 ]
+        assert pending[ 0 ].done() and pending[ 0 ].result() == 2.0
+
+    def test_result_inside_loop(self):
+        g = pricer()
+        proxy = BatchingInterface(g , CallBatcher())
+
+        async def run():
+            pending = [ proxy.price(instrument) for instrument in ("ES" , "NQH5") ]
+            return [ p.result() for p in pending ]
+
+        assert asyncio.run(run()) == [ 2.0 , 4.0 ]
+        assert g.model.calls == [ 2 ]
+
+
+def test_batching_edge():
+    nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                   "src.quantcerebro.nodeset.NodeSet")
+    nodeset_config.add_child_config(NodeConfig("g" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_g.G" ,
+                                               "g"))
+    nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                            "b" , ""))
+    nodeset_config.add_edge_config(EdgeConfig("g" , "b" , "tests.resources.node_g.Pricing" , "callable" ,
+                                              batch_size=64))
+    scenario = ScenarioBuilder(nodeset_config).build()
+
+    pricing = scenario.get_child_node("b").registered_interfaces[ "G.Pricing" ]
+    pending = [ pricing.price("ES") for _ in range(100) ]
+    assert scenario.flush_call_batches() == 36
+    assert sum(p.result() for p in pending) == 200.0
+    assert scenario.get_child_node("g").model.calls == [ 64 , 36 ]
+    assert scenario.call_batch_stats()[ "g->b:Pricing" ][ "dispatches" ] == 2
+
+
+def test_batching_edge_cannot_cache():
+    nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                   "src.quantcerebro.nodeset.NodeSet")
+    nodeset_config.add_child_config(NodeConfig("g" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_g.G" ,
+                                               "g"))
+    nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                            "b" , ""))
+    nodeset_config.add_edge_config(EdgeConfig("g" , "b" , "tests.resources.node_g.Pricing" , "callable" ,
+                                              cache=True , batch=True))
+    with pytest.raises(Exception , match="cannot both cache and batch"):
+        ScenarioBuilder(nodeset_config).build()
@@ -0,0 +1,131 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.conflation import Conflator
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.inbox import NodeInbox , BLOCK , DROP_OLDEST
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.utils import load_class
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+
+
+@dataclass
+class Quote:
+    symbol: str
+    price: float
+
+
+class TestConflator:
+
+    def test_updates_while_busy(self):
+        received = [ ]
+
+        def handler(quote):
+            received.append(quote)
+            if len(received) == 1:
+                # emitted while the handler is busy
+                for update in (Quote("AAPL" , 1.0) , Quote("MSFT" , 1.0) , Quote("AAPL" , 2.0)):
+                    conflator(update)
+                assert received == [ Quote("AAPL" , 0.0) ] , "updates should wait for the handler to return"
+
+        conflator = Conflator(handler , "symbol" , Quote)
+        conflator(Quote("AAPL" , 0.0))
+        assert received == [ Quote("AAPL" , 0.0) , Quote("AAPL" , 2.0) , Quote("MSFT" , 1.0) ]
+        assert conflator.stats() == {"received": 4 , "delivered": 3 , "conflated": 1 , "pending": 0}
+
+    def test_unknown_key(self):
+        with pytest.raises(Exception , match="not a field"):
+            Conflator(print , "venue" , Quote)
+
+    def test_dropped_message_frees_key(self):
+        received = [ ]
+        conflator = Conflator(received.append , "symbol")
+        inbox = NodeInbox("node" , maxsize=1)
+        route = conflator.route(inbox , DROP_OLDEST)
+        route(Quote("AAPL" , 1.0))
+        # drops the message of AAPL
+        route(Quote("MSFT" , 1.0))
+        route(Quote("AAPL" , 2.0))
+        assert conflator.pending == 1
+
+        async def run():
+            task = inbox.start()
+            await inbox.join()
+            task.cancel()
+
+        asyncio.run(run())
+        assert received == [ Quote("AAPL" , 2.0) ]
+
+    def test_full_block_inbox_frees_key(self , monkeypatch):
+        received = [ ]
+        conflator = Conflator(received.append , "symbol")
+        inbox = NodeInbox("node" , maxsize=1)
+        route = conflator.route(inbox , BLOCK)
+        for symbol in ("AAPL" , "MSFT" , "IBM" , "IBM"):
+            route(Quote(symbol , 1.0))
+        # AAPL queued, MSFT parked, IBM dropped twice by the full inbox
+        assert (conflator.pending , conflator.conflated , inbox.dropped) == (2 , 0 , 2)
+
+        def failing_offer(*args):
+            raise RuntimeError("inbox failed")
+
+        monkeypatch.setattr(inbox , "offer" , failing_offer)
+        with pytest.raises(RuntimeError):
+            route(Quote("GOOG" , 1.0))
+        assert conflator.pending == 2
+        monkeypatch.undo()
+
+        async def run():
+            task = inbox.start()
+            await inbox.join()
+            route(Quote("IBM" , 2.0))
+            await inbox.join()
+            task.cancel()
+
+        asyncio.run(run())
+        assert received == [ Quote("AAPL" , 1.0) , Quote("MSFT" , 1.0) , Quote("IBM" , 2.0) ]
+
+
+class TestConflatingEdge:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                            "src.quantcerebro.nodeset.NodeSet")
+        self.nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                     "b" , ""))
+        self.nodeset_config.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" , "tests.resources.node_d.D" ,
+                                                     "d" , ""))
+        self.nodeset_config.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event" ,
+                                                       conflate=True))
+
+    def test_sync(self):
+        scenario = ScenarioBuilder(self.nodeset_config).build()
+        for i in range(3):
+            scenario.notify_handlers("b" , "B.BEvent" , BEvent(str(i)))
+        assert scenario.get_child_node("d").event_value == BEvent("2")
+        # nothing arrives while the handler is busy in sync mode
+        assert scenario.conflation_stats() == {"b->d": {"received": 3 , "delivered": 3 , "conflated": 0 , "pending": 0}}
+
+    def test_async(self):
+        scenario = ScenarioBuilder(self.nodeset_config , dispatch="async").build()
+
+        async def run():
+            scenario.dispatcher.start()
+            for i in range(3):
+                scenario.notify_handlers("b" , "B.BEvent" , BEvent(str(i)))
+            await scenario.dispatcher.join()
+            scenario.notify_handlers("b" , "B.BEvent" , BEvent("3"))
+            await scenario.dispatcher.join()
+            await scenario.dispatcher.stop()
+
+        asyncio.run(run())
+        assert scenario.get_child_node("d").event_value == BEvent("3")
+        assert scenario.dispatcher.stats()[ "d" ][ "delivered" ] == 2
+        assert scenario.conflation_stats() == {"b->d": {"received": 4 , "delivered": 2 , "conflated": 2 , "pending": 0}}
@@ -0,0 +1,78 @@
+import pytest
+
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.dispatch import compile_dispatch_plan
+from src.quantcerebro.event import GraphEventEmitter
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.utils import load_class
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+
+
+def test_producer_calls_listeners():
+    e = GraphEventEmitter()
+    e.create_event("a")
+    e.create_event("b")
+    calls = [ ]
+    e.add_listener("a" , lambda x: calls.append(("first" , x)))
+    e.add_listener("a" , lambda x: calls.append(("second" , x)))
+    e.add_listener("a" , lambda x: calls.append(("third" , x)))
+
+    plan = compile_dispatch_plan(e)
+    plan.producer("a")("msg")
+    plan.producer("b")("msg")
+    assert calls == [ ("first" , "msg") , ("second" , "msg") , ("third" , "msg") ]
+
+    with pytest.raises(KeyError):
+        plan.producer("c")
+
+
+def test_plan_compiled_after_rewiring():
+    e = GraphEventEmitter()
+    e.create_event("a")
+    calls = [ ]
+    first = lambda x: calls.append(1)
+    second = lambda x: calls.append(2)
+    e.add_listener("a" , first)
+    e.add_listener("a" , second)
+    e.remove_listener("a" , first)
+
+    compile_dispatch_plan(e).emit("a" , "msg")
+    assert calls == [ 2 ]
+
+
+def test_stale_plan():
+    e = GraphEventEmitter()
+    e.create_event("a")
+    calls = [ ]
+    first = lambda x: calls.append(1)
+    e.add_listener("a" , first)
+    plan = compile_dispatch_plan(e)
+    assert not plan.stale
+
+    e.add_listener("a" , lambda x: calls.append(2))
+    assert plan.stale
+    plan.emit("a" , "msg")
+    assert calls == [ 1 ] , "a stale plan does not follow rewiring"
+
+    plan = compile_dispatch_plan(e)
+    e.remove_listener("a" , lambda x: None)
+    assert not plan.stale , "removing a listener that is not connected changes nothing"
+    e.remove_listener("a" , first)
+    assert plan.stale
+
+
+def test_scenario_plan():
+    nodeset_config = NodeSetConfig("root" , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet")
+    nodeset_config.add_child_config(BConfig("b" , "resources.node_b.BConfig" , "resources.node_b.B" , "b" , "b"))
+    nodeset_config.add_child_config(DConfig("d" , "resources.node_d.DConfig" , "resources.node_d.D" , "d" , "d"))
+    nodeset_config.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+    scenario = ScenarioBuilder(nodeset_config).build()
+
+    plan = scenario.compile_dispatch_plan()
+    assert "B.BEvent" in plan.event_names()
+    plan.producer("B.BEvent")(BEvent("msg"))
+    assert scenario.get_child_node("d").event_value == BEvent("msg")
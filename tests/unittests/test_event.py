@@ -41,3 +41,23 @@ def test_set_source():
     e.events["a"].emit("msg")
 
     assert e.events["a"].value() == "msg"
+
+
+def test_emitters_isolated():
+    e1 = GraphEventEmitter()
+    e2 = GraphEventEmitter()
+    e1.create_event("a")
+    assert "a" not in e2.events
+
+
+def test_absorb():
+    e1 = GraphEventEmitter()
+    e2 = GraphEventEmitter()
+    e1.create_event("a")
+    e2.create_event("a")
+    e2.create_event("b")
+    a = e1.events["a"]
+
+    e1.absorb(e2)
+    assert e1.events["a"] is a
+    assert e1.events["b"] is e2.events["b"]
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.inbox import NodeInbox , AsyncDispatcher , BLOCK , DROP_OLDEST , DROP_NEWEST
+from src.quantcerebro.nodeset import NodeSetConfig
+
+
+class TestNodeInbox:
+
+    @staticmethod
+    def fill(policy):
+        received = [ ]
+        inbox = NodeInbox("node" , maxsize=2)
+        handler = inbox.route(received.append , policy)
+        for i in range(4):
+            handler(i)
+        return inbox , received
+
+    @staticmethod
+    def consume(inbox):
+        async def run():
+            task = inbox.start()
+            await inbox.join()
+            task.cancel()
+
+        asyncio.run(run())
+
+    def test_drop_newest(self):
+        inbox , received = self.fill(DROP_NEWEST)
+        assert (inbox.depth , inbox.dropped) == (2 , 2)
+        self.consume(inbox)
+        assert received == [ 0 , 1 ]
+
+    def test_drop_oldest(self):
+        inbox , received = self.fill(DROP_OLDEST)
+        assert (inbox.depth , inbox.dropped) == (2 , 2)
+        self.consume(inbox)
+        assert received == [ 2 , 3 ]
+
+    def test_block(self):
+        inbox , received = self.fill(BLOCK)
+        assert (inbox.depth , inbox.dropped) == (4 , 0) , "blocked messages are parked, not dropped"
+        self.consume(inbox)
+        assert received == [ 0 , 1 , 2 , 3 ]
+        assert inbox.delivered == 4
+
+    def test_block_limit(self):
+        inbox , received = self.fill(BLOCK)
+        assert inbox.route(received.append , BLOCK)(4) is None
+        assert (inbox.depth , inbox.dropped) == (4 , 1) , "beyond max_parked, messages are dropped"
+        with pytest.raises(Exception , match="inbox of node 'node' is full"):
+            inbox.check_overflow()
+        inbox.check_overflow()  # raised once
+
+        inbox = NodeInbox("node" , maxsize=2 , max_parked=0)
+        assert [ inbox.offer(received.append , (i ,)) for i in range(3) ] == [ True , True , False ]
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            NodeInbox("node").route(print , "drop-all")
+
+    def test_coroutine_handler_and_errors(self):
+        received = [ ]
+
+        async def handler(x):
+            await asyncio.sleep(0)
+            if x == 1:
+                raise ValueError(x)
+            received.append(x)
+
+        inbox = NodeInbox("node")
+        route = inbox.route(handler)
+        for i in range(3):
+            route(i)
+        self.consume(inbox)
+        assert received == [ 0 , 2 ] , "a failing handler should not stop the consumer"
+
+
+class TestAsyncDispatch:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.nodeset_config = NodeSetConfig("base_node" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                            "src.quantcerebro.nodeset.NodeSet")
+        self.nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                     "b" , ""))
+        self.nodeset_config.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" , "tests.resources.node_d.D" ,
+                                                     "d" , ""))
+
+    def build(self , **edge_options):
+        self.nodeset_config.edges.clear()
+        self.nodeset_config.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event" ,
+                                                       **edge_options))
+        return ScenarioBuilder(self.nodeset_config , dispatch="async").build()
+
+    def test_emit_does_not_call_handler(self):
+        scenario = self.build()
+        assert isinstance(scenario.dispatcher , AsyncDispatcher)
+
+        async def run():
+            scenario.dispatcher.start()
+            scenario.notify_handlers("b" , "B.BEvent" , "msg")
+            assert scenario.get_child_node("d").event_value is None , "delivery should be asynchronous"
+            assert scenario.dispatcher.queue_depths() == {"d": 1}
+            await scenario.dispatcher.join()
+            await scenario.dispatcher.stop()
+
+        asyncio.run(run())
+        assert scenario.get_child_node("d").event_value == "msg"
+
+    def test_block_overflow_through_notify_handlers(self):
+        scenario = self.build(backpressure="block" , queue_size=2)
+        depths = [ ]
+
+        async def run():
+            scenario.dispatcher.start()
+            for i in range(10):
+                scenario.notify_handlers("b" , "B.BEvent" , i)
+                depths.append(scenario.dispatcher.queue_depths()[ "d" ])
+            with pytest.raises(Exception , match="inbox of node 'd' is full"):
+                await scenario.dispatcher.drain()
+            await scenario.dispatcher.join()
+            await scenario.dispatcher.stop()
+
+            # a producer draining between emits loses nothing
+            scenario.dispatcher.start()
+            for i in range(10):
+                scenario.notify_handlers("b" , "B.BEvent" , i)
+                await scenario.dispatcher.drain()
+            await scenario.dispatcher.join()
+            await scenario.dispatcher.stop()
+
+        asyncio.run(run())
+        assert depths[ -1 ] == 4
+        assert scenario.dispatcher.stats() == {"d": {"depth": 0 , "delivered": 14 , "dropped": 6}}
+        assert scenario.get_child_node("d").event_value == 9
+
+    def test_edge_backpressure(self):
+        scenario = self.build(backpressure="drop-newest" , queue_size=1)
+
+        async def run():
+            scenario.dispatcher.start()
+            for i in range(3):
+                scenario.notify_handlers("b" , "B.BEvent" , i)
+            await scenario.dispatcher.drain()
+            await scenario.dispatcher.join()
+            await scenario.dispatcher.stop()
+
+        asyncio.run(run())
+        assert scenario.get_child_node("d").event_value == 0
+        assert scenario.dispatcher.stats() == {"d": {"depth": 0 , "delivered": 1 , "dropped": 2}}
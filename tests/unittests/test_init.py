@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import src.quantcerebro as quantcerebro
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) , "src")
+
+
+def loaded_modules(statement: str):
+    """modules loaded by statement in a fresh interpreter, with the package importable as quantcerebro"""
+    probe = (f"import json , sys\nsys.path.insert(0 , {SRC!r})\nbefore = set(sys.modules)\n{statement}\n"
+             f"print(json.dumps(sorted(set(sys.modules) - before)))")
+    output = subprocess.run([ sys.executable , "-c" , probe ] , capture_output=True , text=True , check=True ,
+                            cwd=os.path.dirname(SRC)).stdout
+    return json.loads(output)
+
+
+def test_package_import_is_lazy():
+    modules = loaded_modules("import quantcerebro")
+    assert "quantcerebro" in modules
+    assert not [ m for m in modules if m.startswith("quantcerebro.") or m in ("yaml" , "eventkit" , "asyncio") ]
+
+
+def test_modules_load_once():
+    modules = loaded_modules("from quantcerebro import *\n"
+                             "load_class('quantcerebro.nodeset.NodeSet')")
+    assert "quantcerebro.builder" in modules and "quantcerebro.sweep" in modules
+    assert not [ m for m in modules if m.startswith("src.") ] , "modules loaded a second time under src.quantcerebro"
+
+
+def test_public_names():
+    for name in quantcerebro.__all__:
+        assert getattr(quantcerebro , name) is not None
+    assert quantcerebro.Node is quantcerebro.node.Node
+    assert "build_scenario" in dir(quantcerebro)
+    with pytest.raises(AttributeError , match="has no attribute 'Missing'"):
+        quantcerebro.Missing
@@ -7,7 +7,7 @@ from typing import Dict , Any
 
 
 from src.quantcerebro.event import GraphEventEmitter
-from src.quantcerebro.node import Node, NodeConfig
+from src.quantcerebro.node import Node, NodeConfig, DeferredModel, deferred_models
 
 
 class TestNode:
@@ -27,10 +27,11 @@ class TestNode:
         assert self.node.implemented_interfaces is None
 
     def test_event_emitter(self):
-        assert self.node.event_emitter == GraphEventEmitter()
+        assert isinstance(self.node.event_emitter, GraphEventEmitter)
+        assert self.node.event_emitter is not Node(NodeConfig("b","","","")).event_emitter
 
     def test_registered_events(self):
-        assert self.node.registered_events == GraphEventEmitter().events
+        assert self.node.registered_events is self.node.event_emitter.events
 
     def test_registered_interfaces(self):
         assert self.node.registered_interfaces == dict()
@@ -70,6 +71,50 @@ class TestNode:
         ...
 
 
+class TestDeferredModel:
+
+    class Model:
+        def __init__(self):
+            self.value = 1
+
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker: MockFixture):
+        self.init_model = mocker.patch("src.quantcerebro.node.Node.init_model", side_effect=lambda: self.Model())
+        with deferred_models():
+            self.node = Node(NodeConfig("a", "", "", ""))
+
+    def test_deferred(self):
+        assert isinstance(self.node.model, DeferredModel)
+        assert self.node.model_deferred
+        assert self.init_model.call_count == 0
+        assert Node(NodeConfig("b", "", "", "")).model_deferred is False, "deferral only applies within the context"
+
+    def test_first_access_builds_model(self):
+        model = self.node.model
+        assert model.value == 1
+        assert isinstance(self.node.model, self.Model)
+        model.value = 2
+        assert self.node.model.value == 2
+        assert self.init_model.call_count == 1
+
+    def test_materialize_model(self):
+        assert isinstance(self.node.materialize_model(), self.Model)
+        assert self.node.materialize_model() is self.node.model
+        assert self.init_model.call_count == 1
+
+    def test_forwarded_special_methods(self):
+        self.init_model.side_effect = lambda: {"a": 1}
+        deferred = self.node.model
+        assert isinstance(deferred, dict)
+        assert self.init_model.call_count == 1
+        assert bool(deferred) and len(deferred) == 1 and "a" in deferred
+        assert deferred["a"] == 1 and list(deferred) == ["a"]
+        deferred["b"] = 2
+        assert self.node.model == {"a": 1, "b": 2}
+        assert type(deferred) is DeferredModel, "type() is not forwarded"
+        assert self.init_model.call_count == 1
+
+
 class TestNodeConfig:
     ...
 
@@ -1,8 +1,15 @@
 from typing import Any, Dict
 
 import pytest
+from pytest_mock import MockFixture
 
-from src.quantcerebro.nodeset import NodeSetConfig
+from resources.node_a import AConfig
+from resources.node_b import BConfig , BEvent
+from resources.node_d import DConfig , TableD
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.node import Node , NodeConfig
+from src.quantcerebro.nodeset import NodeSet , NodeSetConfig
 from src.quantcerebro.utils import load_yaml
 
 
@@ -14,4 +21,154 @@ class TestNodeSetConfig:
         ...
 
     def test_from_file(self):
-        ...
\ No newline at end of file
+        ...
+
+    def test_get_nodeset_config(self):
+        root = NodeSetConfig("root" , "" , "")
+        child = NodeSetConfig("child" , "" , "")
+        root.add_child_config(child)
+        grandchild = NodeSetConfig("grandchild" , "" , "")
+        child.add_child_config(grandchild)
+        node_config = NodeConfig("a" , "" , "" , "a")
+        grandchild.add_child_config(node_config)
+
+        assert root.get_nodeset_config(None) is root
+        assert root.get_nodeset_config("grandchild") is grandchild
+        assert root.get_child_component_config("a") is node_config
+        assert child.get_child_component_config("grandchild") is grandchild
+        with pytest.raises(KeyError):
+            grandchild.get_nodeset_config("child")
+
+class TestNodeSet:
+
+    @pytest.fixture(autouse=True)
+    def setup(self , mocker: MockFixture):
+        mocker.patch("src.quantcerebro.node.Node.init_model" , return_value=None)
+        self.root = NodeSet(NodeSetConfig("root" , "" , ""))
+        self.child = NodeSet(NodeSetConfig("child" , "" , ""))
+        self.grandchild = NodeSet(NodeSetConfig("grandchild" , "" , ""))
+        self.a = Node(NodeConfig("a" , "" , "" , "tag_a"))
+        self.b = Node(NodeConfig("b" , "" , "" , "tag_b"))
+        self.c = Node(NodeConfig("c" , "" , "" , "tag_c"))
+
+        self.root.add_child(self.a)
+        self.root.add_child(self.child)
+        # components added to a descendant after it is attached must be visible from the root
+        self.child.add_child(self.b)
+        self.child.add_child(self.grandchild)
+        self.grandchild.add_child(self.c)
+
+    def test_get_child_node(self):
+        assert self.root.get_child_node("a") is self.a
+        assert self.root.get_child_node("c") is self.c
+        assert self.child.get_child_node("c") is self.c
+        with pytest.raises(KeyError):
+            self.child.get_child_node("a")
+
+    def test_get_child_nodes(self):
+        assert set(self.root.get_child_nodes()) == {self.a , self.b , self.c}
+        assert self.grandchild.get_child_nodes() == [ self.c ]
+
+    def test_get_child_node_by_tag(self):
+        assert self.root.get_child_node_by_tag("tag_b") is self.b
+        assert self.grandchild.get_child_node_by_tag("tag_c") is self.c
+        with pytest.raises(KeyError):
+            self.root.get_child_node_by_tag("b")
+
+    def test_get_nodeset(self):
+        assert self.root.get_nodeset() is self.root
+        assert self.root.get_nodeset("root") is self.root
+        assert self.root.get_nodeset("grandchild") is self.grandchild
+        with pytest.raises(KeyError):
+            self.grandchild.get_nodeset("child")
+
+    def test_get_child_component(self):
+        assert self.root.get_child_component("root") is self.root
+        assert self.root.get_child_component("child") is self.child
+        assert self.root.get_child_component("c") is self.c
+
+    def test_add_nodeset_with_children(self):
+        other = NodeSet(NodeSetConfig("other" , "" , ""))
+        d = Node(NodeConfig("d" , "" , "" , "tag_d"))
+        other.add_child(d)
+        self.grandchild.add_child(other)
+        assert self.root.get_nodeset("other") is other
+        assert self.root.get_child_node("d") is d
+        assert d.parent is other
+
+    def test_shared_event_emitter(self):
+        for component in [ self.child , self.grandchild , self.a , self.c ]:
+            assert component.event_emitter is self.root.event_emitter
+
+        other = NodeSet(NodeSetConfig("other" , "" , ""))
+        d = Node(NodeConfig("d" , "" , "" , "tag_d"))
+        d.add_event("d" , "eventd")
+        other.add_child(d)
+        self.child.add_child(other)
+        assert d.event_emitter is self.root.event_emitter
+        assert "eventd" in self.root.registered_events , "events created before attaching should be kept"
+
+    def test_remove_child(self):
+        self.root.remove_child(self.child)
+        for name in [ "b" , "c" ]:
+            with pytest.raises(KeyError):
+                self.root.get_child_node(name)
+        with pytest.raises(KeyError):
+            self.root.get_nodeset("grandchild")
+        assert self.child.get_child_node("c") is self.c
+
+        self.grandchild.remove_child(self.c)
+        with pytest.raises(KeyError):
+            self.child.get_child_node_by_tag("tag_c")
+
+
+class TestClone:
+
+    def build(self , d_class: str , profile: bool = False):
+        nodeset_config = NodeSetConfig("root" , "src.quantcerebro.nodeset.NodeSetConfig" ,
+                                       "src.quantcerebro.nodeset.NodeSet")
+        nodeset_config.add_child_config(AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" ,
+                                                "a" , "attrA"))
+        nodeset_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" ,
+                                                "b" , "attrB"))
+        nodeset_config.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" , d_class , "d" , "attrD"))
+        nodeset_config.add_edge_config(EdgeConfig("a" , "b" , "tests.resources.node_a.InterfaceA" , "callable"))
+        nodeset_config.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+        return ScenarioBuilder(nodeset_config , profile=profile).build()
+
+    def test_independent_wiring(self):
+        scenario = self.build("tests.resources.node_d.D" , profile=True)
+        clone = scenario.clone({"d": {"attr": "attrD2"}})
+        assert clone.nodeset_config is not scenario.nodeset_config
+        assert scenario.get_child_node("d").node_config.attr == "attrD"
+        assert clone.get_child_node("d").model.attr == "attrD2"
+        # models are rebuilt by default
+        assert clone.get_child_node("b").model is not scenario.get_child_node("b").model
+        assert clone.get_child_node("b").registered_interfaces[ "A.InterfaceA" ]._target is clone.get_child_node("a")
+        assert clone.profiler is not None and clone.profiler is not scenario.profiler
+
+        clone.notify_handlers("b" , "B.BEvent" , BEvent("msg"))
+        assert clone.get_child_node("d").event_value == BEvent("msg")
+        assert scenario.get_child_node("d").event_value is None
+
+    def test_shared_models(self):
+        scenario = self.build("tests.resources.node_d.SharedD")
+        d = scenario.get_child_node("d")
+        assert scenario.clone().get_child_node("d").model is d.model
+        assert scenario.clone({"d": {"attr": "attrD2"}}).get_child_node("d").model is not d.model
+
+    def test_clone_model_override(self):
+        scenario = self.build("tests.resources.node_d.TableD")
+        loads = TableD.table_loads
+        clones = [ scenario.clone({"d": {"attr": attr}}) for attr in ("x" , "y") ]
+        assert TableD.table_loads == loads
+        for clone , attr in zip(clones , ("x" , "y")):
+            model = clone.get_child_node("d").model
+            assert model.attr == attr and model.table is scenario.get_child_node("d").model.table
+
+    def test_bad_override(self):
+        scenario = self.build("tests.resources.node_d.D")
+        with pytest.raises(Exception , match="'attrX' is not a field of DConfig"):
+            scenario.clone({"d": {"attrX": 1}})
+        with pytest.raises(KeyError):
+            scenario.clone({"e": {"attr": 1}})
@@ -0,0 +1,124 @@
+import pytest
+
+from resources.node_a import AConfig
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.profiling import LatencyHistogram , ProfiledInterface , is_profiled , timed
+from src.quantcerebro.utils import load_class
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+InterfaceA = load_class("tests.resources.node_a.InterfaceA")
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1 , 10_001):
+            histogram.record(value)
+
+        assert histogram.count == 10_000
+        assert histogram.min == 1
+        # within the bucket precision of ~6%
+        assert histogram.max == pytest.approx(10_000 , rel=0.07)
+        assert histogram.mean == pytest.approx(5000.5 , rel=0.07)
+        assert histogram.percentile(50) == pytest.approx(5000 , rel=0.07)
+        assert histogram.percentile(99) == pytest.approx(9900 , rel=0.07)
+        assert histogram.percentile(100) == histogram.max
+
+    def test_merge(self):
+        first , second = LatencyHistogram() , LatencyHistogram()
+        first.record(10)
+        second.record(1_000_000)
+        first.merge(second)
+        assert first.count == 2
+        assert first.min == 10
+        assert first.max == pytest.approx(1_000_000 , rel=0.07)
+        assert first.percentile(50) == 10
+
+    def test_timed(self):
+        histogram = LatencyHistogram()
+        profiled = timed(lambda x , y=0: x + y , histogram)
+        assert profiled(1 , y=2) == 3
+        assert histogram.count == 1
+        assert profiled.__wrapped__(1) == 1
+
+
+def scenario_config() -> NodeSetConfig:
+    nodeset_config = NodeSetConfig("root" , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet")
+    child_config = NodeSetConfig("child" , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet")
+    child_config.add_child_config(AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" , "a" , ""))
+    child_config.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" , "b" , ""))
+    child_config.add_edge_config(EdgeConfig("a" , "b" , "tests.resources.node_a.InterfaceA" , "callable"))
+    nodeset_config.add_child_config(child_config)
+    nodeset_config.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" , "tests.resources.node_d.D" , "d" , ""))
+    nodeset_config.add_edge_config(EdgeConfig("child.b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+    return nodeset_config
+
+
+def exercise(scenario):
+    for _ in range(3):
+        scenario.notify_handlers("b" , "B.BEvent" , BEvent("msg"))
+    b = scenario.get_child_node("b")
+    assert b.registered_interfaces[ "A.InterfaceA" ].interface_method() == "interface_return_value"
+
+
+class TestProfiling:
+
+    def test_disabled(self):
+        scenario = ScenarioBuilder(scenario_config()).build()
+        d = scenario.get_child_node("d")
+        assert scenario.profiler is None
+        assert scenario.event_emitter.listeners[ "B.BEvent" ] == [ d.handler ]
+        with pytest.raises(Exception , match="profiling is not enabled"):
+            scenario.profile_stats()
+
+    def test_profile_at_build(self):
+        scenario = ScenarioBuilder(scenario_config() , profile=True).build()
+        exercise(scenario)
+
+        assert scenario.get_child_node("d").event_value == BEvent("msg")
+        interface = scenario.get_child_node("b").registered_interfaces[ "A.InterfaceA" ]
+        assert isinstance(interface , ProfiledInterface)
+        assert isinstance(interface , InterfaceA) , "isinstance checks against the interface class hold"
+
+        by_node = scenario.profile_stats("node")
+        assert by_node[ "d" ][ "count" ] == 3
+        assert by_node[ "a" ][ "count" ] == 1
+
+        assert scenario.profile_stats("event")[ "B.BEvent" ][ "count" ] == 3
+        assert scenario.profile_stats("interface")[ "A.InterfaceA.interface_method" ][ "count" ] == 1
+
+        # nodeset stats include nested nodesets
+        by_nodeset = scenario.profile_stats("nodeset")
+        assert by_nodeset[ "child" ][ "count" ] == 1
+        assert by_nodeset[ "root" ][ "count" ] == 4
+
+        with pytest.raises(ValueError):
+            scenario.profile_stats("edge")
+
+    def test_enable_and_disable_after_build(self):
+        scenario = ScenarioBuilder(scenario_config()).build()
+        b = scenario.get_child_node("b")
+        d = scenario.get_child_node("d")
+        interface = b.registered_interfaces[ "A.InterfaceA" ]
+
+        profiler = scenario.enable_profiling()
+        assert scenario.get_nodeset("child").profiler is profiler
+        assert all(is_profiled(l) for l in scenario.event_emitter.listeners[ "B.BEvent" ])
+        exercise(scenario)
+        assert scenario.profile_stats("node")[ "d" ][ "count" ] == 3
+
+        assert scenario.disable_profiling() is profiler
+        assert scenario.event_emitter.listeners[ "B.BEvent" ] == [ d.handler ]
+        assert b.registered_interfaces[ "A.InterfaceA" ] is interface
+        exercise(scenario)
+        assert profiler.report("node")[ "d" ][ "count" ] == 3
+
+    def test_enable_on_child(self):
+        scenario = ScenarioBuilder(scenario_config()).build()
+        with pytest.raises(Exception , match="root nodeset"):
+            scenario.get_nodeset("child").enable_profiling()
@@ -0,0 +1,160 @@
+import pytest
+
+from src.quantcerebro.builder import build_scenario , ConfigBuilder
+from src.quantcerebro.rebuild import rebuild_scenario , diff_configs
+from src.quantcerebro.recording import Recorder , EventLog
+from src.quantcerebro.utils import load_class
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+
+SUB_SCENARIO_YAML = """
+name: SetOne
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: A
+    nodeClass: tests.resources.node_a.A
+  - name: B
+    nodeClass: tests.resources.node_b.B
+edges:
+  - pred: A
+    succ: B
+    edgeType: callable
+    edgeClass: tests.resources.node_a.InterfaceA
+componentConfigs:
+  - name: A
+    configClass: tests.resources.node_a.AConfig
+    attr: {a_attr}
+  - name: B
+    configClass: tests.resources.node_b.BConfig
+    attr: attrB
+"""
+
+ROOT_SCENARIO_YAML = """
+name: root
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: SetOne
+    nodesetClass: src.quantcerebro.nodeset.NodeSet
+  - name: D
+    nodeClass: tests.resources.node_d.D
+{extra_components}
+edges:
+  - pred: SetOne.B
+    succ: D
+    edgeType: event
+    edgeClass: tests.resources.node_b.BEvent
+{extra_edges}
+componentConfigs:
+  - name: SetOne
+    nodesetPath: {sub_path}
+  - name: D
+    configClass: tests.resources.node_d.DConfig
+    attr: {d_attr}
+{extra_configs}
+"""
+
+E_COMPONENT = """
+  - name: E
+    nodeClass: tests.resources.node_d.D
+"""
+E_EDGE = """
+  - pred: SetOne.B
+    succ: E
+    edgeType: event
+    edgeClass: tests.resources.node_b.BEvent
+"""
+E_CONFIG = """
+  - name: E
+    configClass: tests.resources.node_d.DConfig
+    attr: attrE
+"""
+
+
+class TestRebuild:
+
+    @pytest.fixture(autouse=True)
+    def setup(self , tmp_path):
+        self.sub_path = tmp_path / "sub.yml"
+        self.root_path = tmp_path / "root.yml"
+        self.write(a_attr="attrA" , d_attr="attrD")
+
+    def write(self , a_attr: str , d_attr: str , with_e: bool = False):
+        self.sub_path.write_text(SUB_SCENARIO_YAML.format(a_attr=a_attr))
+        self.root_path.write_text(ROOT_SCENARIO_YAML.format(
+            sub_path=self.sub_path , d_attr=d_attr , extra_components=E_COMPONENT if with_e else "" ,
+            extra_edges=E_EDGE if with_e else "" , extra_configs=E_CONFIG if with_e else ""))
+
+    def test_unchanged(self):
+        scenario = build_scenario(str(self.root_path))
+        assert rebuild_scenario(scenario , str(self.root_path)).empty
+
+    def test_changed_successor(self):
+        scenario = build_scenario(str(self.root_path) , profile=True)
+        a , b , old_d = (scenario.get_child_node(name) for name in ("A" , "B" , "D"))
+        a_model = a.model
+
+        self.write(a_attr="attrA" , d_attr="attrD2")
+        diff = rebuild_scenario(scenario , str(self.root_path))
+        assert (diff.changed , diff.added , diff.removed) == ([ "D" ] , [ ] , [ ])
+        assert [ e.succ for _ , e in diff.removed_edges ] == [ e.succ for _ , e in diff.added_edges ] == [ "D" ]
+
+        d = scenario.get_child_node("D")
+        assert d is not old_d and d.model.attr == "attrD2"
+        # survivors keep their instance, model and registrations
+        assert scenario.get_child_node("A") is a and a.model is a_model
+        assert b.registered_interfaces[ "A.InterfaceA" ] is not None
+        assert len(scenario.event_emitter.listeners[ "B.BEvent" ]) == 1 , "the profiled handler should be replaced"
+
+        scenario.notify_handlers("B" , "B.BEvent" , BEvent("msg"))
+        assert d.event_value == BEvent("msg")
+        assert old_d.event_value is None
+
+    def test_changed_predecessor_in_sub_scenario(self):
+        scenario = build_scenario(str(self.root_path))
+        b , d = scenario.get_child_node("B") , scenario.get_child_node("D")
+
+        self.write(a_attr="attrA2" , d_attr="attrD")
+        diff = rebuild_scenario(scenario , str(self.root_path))
+        assert diff.changed == [ "A" ]
+        a = scenario.get_child_node("A")
+        assert a.model.attr == "attrA2"
+        assert a.parent is scenario.get_nodeset("SetOne")
+        assert b.registered_interfaces[ "A.InterfaceA" ] is a
+        assert scenario.get_child_node("D") is d
+
+    def test_added_and_removed(self):
+        scenario = build_scenario(str(self.root_path))
+        self.write(a_attr="attrA" , d_attr="attrD" , with_e=True)
+        diff = rebuild_scenario(scenario , str(self.root_path))
+        assert (diff.changed , diff.added , diff.removed) == ([ ] , [ "E" ] , [ ])
+        scenario.notify_handlers("B" , "B.BEvent" , BEvent("msg"))
+        assert scenario.get_child_node("E").event_value == BEvent("msg")
+
+        self.write(a_attr="attrA" , d_attr="attrD")
+        diff = rebuild_scenario(scenario , str(self.root_path))
+        assert diff.removed == [ "E" ]
+        with pytest.raises(KeyError):
+            scenario.get_child_node("E")
+        assert len(scenario.event_emitter.listeners[ "B.BEvent" ]) == 1
+
+    def test_recorded_events_stay_recorded(self , tmp_path):
+        scenario = build_scenario(str(self.root_path))
+        log_path = str(tmp_path / "session.qclog")
+        with Recorder(log_path , scenario.event_emitter):
+            self.write(a_attr="attrA" , d_attr="attrD2")
+            rebuild_scenario(scenario , str(self.root_path))
+            scenario.notify_handlers("B" , "B.BEvent" , BEvent("msg"))
+
+        with EventLog(log_path) as log:
+            assert [ (e.name , e.args) for e in log.entries() ] == [ ("B.BEvent" , (BEvent("msg") ,)) ]
+
+    def test_out_of_process_change(self):
+        old = ConfigBuilder(str(self.root_path)).build()
+        new = ConfigBuilder(str(self.root_path)).build()
+        for config in (old , new):
+            config.get_nodeset_config("SetOne").out_of_process = True
+        new.get_child_component_config("A").attr = "attrA2"
+        with pytest.raises(Exception , match="out-of-process nodeset 'SetOne'"):
+            diff_configs(old , new)
@@ -0,0 +1,133 @@
+import itertools
+import time
+
+import pytest
+
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.node import NodeConfig
+from src.quantcerebro.nodeset import NodeSet , NodeSetConfig
+from src.quantcerebro.recording import Recorder , EventLog , replay
+from src.quantcerebro.utils import load_class
+
+numpy = pytest.importorskip("numpy")
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+FTick = load_class("tests.resources.node_f.FTick")
+
+
+def build() -> NodeSet:
+    # root(b , d , f) , b -> d pickled payload , b -> f fixed layout payload
+    root = NodeSetConfig("root" , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet")
+    root.add_child_config(BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" , "b" , ""))
+    root.add_child_config(DConfig("d" , "tests.resources.node_d.DConfig" , "tests.resources.node_d.D" , "d" , ""))
+    root.add_child_config(NodeConfig("f" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_f.F" , "f"))
+    root.add_edge_config(EdgeConfig("b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+    root.add_edge_config(EdgeConfig("b" , "f" , "tests.resources.node_f.FTick" , "event"))
+    return ScenarioBuilder(root).build()
+
+
+def session(scenario: NodeSet):
+    scenario.notify_handlers("b" , "B.FTick" , FTick(1 , 0.5 , numpy.arange(4.0)))
+    scenario.notify_handlers("b" , "B.BEvent" , BEvent("first"))
+    scenario.notify_handlers("b" , "B.FTick" , FTick(2 , 1.5 , numpy.ones(4)))
+    scenario.notify_handlers("b" , "B.BEvent" , BEvent("second"))
+
+
+class TestRecording:
+
+    def test_record_and_replay(self , tmp_path):
+        path = str(tmp_path / "session.qclog")
+        scenario = build()
+        clock = itertools.count(1_000 , 1_000)
+        with Recorder(path , scenario.event_emitter , clock=lambda: next(clock)) as recorder:
+            session(scenario)
+        assert recorder.count == 4
+        assert "emit" not in scenario.event_emitter.get_event("B.FTick").__dict__
+
+        with EventLog(path) as log:
+            entries = list(log.entries())
+            assert [ (e.timestamp , e.name , e.depth) for e in entries ] == [
+                (1_000 , "B.FTick" , 0) , (2_000 , "B.BEvent" , 0) , (3_000 , "B.FTick" , 0) , (4_000 , "B.BEvent" , 0) ]
+            assert entries[ 1 ].args == (BEvent("first") ,)
+            tick = entries[ 2 ].args[ 0 ]
+            assert (tick.seq , tick.price , tick.levels.tolist()) == (2 , 1.5 , [ 1.0 ] * 4)
+            # fixed layout payloads are views of the mapped log
+            assert not tick.levels.flags.writeable
+            del entries , tick
+
+        backtest = build()
+        assert replay(path , backtest) == 4
+        assert backtest.get_child_node("d").event_value == BEvent("second")
+        assert backtest.get_child_node("f").model.received == scenario.get_child_node("f").model.received
+
+    def test_depth(self , tmp_path):
+        path = str(tmp_path / "session.qclog")
+
+        def wire(scenario: NodeSet) -> list:
+            # a handler reacting to B.BEvent with an event of its own
+            emitter = scenario.event_emitter
+            echoes = [ ]
+            emitter.create_event("Echo.BEvent")
+            emitter.add_listener("B.BEvent" , lambda event: emitter.emit("Echo.BEvent" , event))
+            emitter.add_listener("Echo.BEvent" , echoes.append)
+            return echoes
+
+        scenario = build()
+        with Recorder(path , scenario.event_emitter) as recorder:
+            # created while recording
+            echoes = wire(scenario)
+            scenario.notify_handlers("b" , "B.BEvent" , BEvent("msg"))
+        assert echoes == [ BEvent("msg") ]
+
+        with EventLog(path) as log:
+            assert [ (e.name , e.depth) for e in log.entries() ] == [ ("B.BEvent" , 0) , ("Echo.BEvent" , 1) ]
+            assert [ e.name for e in log.entries(events=[ "Echo.BEvent" ]) ] == [ "Echo.BEvent" ]
+
+        # the echo is derived again from the replayed event, not replayed itself
+        backtest = build()
+        echoes = wire(backtest)
+        assert replay(path , backtest) == 1
+        assert echoes == [ BEvent("msg") ]
+
+        assert replay(path , backtest , depth=None) == 2
+        assert len(echoes) == 3
+
+    def test_unencodable_payload(self , tmp_path , caplog):
+        path = str(tmp_path / "session.qclog")
+        scenario = build()
+        emitter = scenario.event_emitter
+        emitter.create_event("Odd.Event")
+        received = [ ]
+        emitter.add_listener("Odd.Event" , received.append)
+
+        with Recorder(path , emitter) as recorder:
+            for _ in range(2):
+                emitter.emit("Odd.Event" , lambda: None)
+            scenario.notify_handlers("b" , "B.BEvent" , BEvent("msg"))
+        assert len(received) == 2 , "events that cannot be recorded are emitted all the same"
+        assert (recorder.count , recorder.failed) == (1 , 2)
+        assert len([ r for r in caplog.records if "Odd.Event" in r.getMessage() ]) == 1
+
+        with EventLog(path) as log:
+            assert [ e.name for e in log.entries() ] == [ "B.BEvent" ]
+
+    def test_scaled_replay(self , tmp_path):
+        path = str(tmp_path / "session.qclog")
+        scenario = build()
+        # recorded 100ms apart
+        clock = iter([ 0 , 100_000_000 ])
+        with Recorder(path , scenario.event_emitter , events=[ "B.BEvent" ] , clock=lambda: next(clock)):
+            session(scenario)
+
+        start = time.perf_counter()
+        assert replay(path , build() , speed=10) == 2
+        assert time.perf_counter() - start >= 0.009
+
+    def test_not_a_log(self , tmp_path):
+        path = tmp_path / "session.qclog"
+        path.write_bytes(b"not a log")
+        with pytest.raises(Exception , match="not an event log"):
+            EventLog(str(path))
@@ -0,0 +1,244 @@
+import threading
+
+import pytest
+
+from resources.node_a import AConfig
+from resources.node_b import BConfig
+from resources.node_d import DConfig
+from src.quantcerebro.builder import ScenarioBuilder , ConfigBuilder
+from src.quantcerebro.dependencies import EdgeConfig
+from src.quantcerebro.node import NodeConfig
+from src.quantcerebro.nodeset import NodeSetConfig
+from src.quantcerebro.remote import RemoteNodeSet , RemoteNode
+from src.quantcerebro.utils import load_class
+
+BEvent = load_class("tests.resources.node_b.BEvent")
+
+SUB_SCENARIO_YAML = """
+name: sub_scenario
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: A
+    nodeClass: tests.resources.node_a.A
+edges: []
+componentConfigs:
+  - name: A
+    configClass: tests.resources.node_a.AConfig
+    attr: attrA
+"""
+
+ROOT_SCENARIO_YAML = """
+name: root
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: SetOne
+    nodesetClass: src.quantcerebro.nodeset.NodeSet
+    outOfProcess: true
+edges: []
+componentConfigs:
+  - name: SetOne
+    nodesetPath: {path}
+"""
+
+
+def nodeset_config(name: str , out_of_process: bool = False) -> NodeSetConfig:
+    return NodeSetConfig(name , "src.quantcerebro.nodeset.NodeSetConfig" , "src.quantcerebro.nodeset.NodeSet" ,
+                         out_of_process=out_of_process)
+
+
+def b_config() -> BConfig:
+    return BConfig("b" , "tests.resources.node_b.BConfig" , "tests.resources.node_b.B" , "b" , "attrB")
+
+
+def d_config() -> DConfig:
+    return DConfig("d" , "tests.resources.node_d.DConfig" , "tests.resources.node_d.D" , "d" , "attrD")
+
+
+def f_config() -> NodeConfig:
+    return NodeConfig("f" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_f.F" , "f")
+
+
+def shm_edge(pred: str , succ: str) -> EdgeConfig:
+    return EdgeConfig(pred , succ , "tests.resources.node_f.FTick" , "event" , transport="shm" , ring_size=4)
+
+
+class TestRemote:
+
+    @pytest.fixture(autouse=True)
+    def teardown(self):
+        self.scenario = None
+        yield
+        if self.scenario is not None:
+            self.scenario.stop_remote()
+
+    def test_remote_predecessor(self):
+        # root(remote(b) , d) , b -> d
+        root = nodeset_config("root")
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(b_config())
+        root.add_child_config(remote_config)
+        root.add_child_config(d_config())
+        root.add_edge_config(EdgeConfig("remote.b" , "d" , "tests.resources.node_b.BEvent" , "event"))
+
+        self.scenario = ScenarioBuilder(root).build()
+        remote = self.scenario.get_nodeset("remote")
+        assert isinstance(remote , RemoteNodeSet)
+        assert isinstance(self.scenario.get_child_node("b") , RemoteNode)
+        assert type(self.scenario.get_child_node("b")).__name__ == "B"
+        assert remote.get("b" , "model.attr") == "attrB"
+
+        remote.call("b" , "notify_handlers" , "b" , "B.BEvent" , BEvent("msg"))
+        d = self.scenario.get_child_node("d")
+        # nothing is delivered until the parent pumps
+        assert d.event_value is None
+        self.scenario.sync_remote()
+        assert d.event_value == BEvent("msg")
+
+    def test_remote_successor_and_internal_edge(self):
+        # root(b , remote(a , d)) , b -> d , a -> d callable inside the worker
+        root = nodeset_config("root")
+        root.add_child_config(b_config())
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(
+            AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" , "a" , ""))
+        remote_config.add_child_config(d_config())
+        remote_config.add_edge_config(EdgeConfig("a" , "d" , "tests.resources.node_a.InterfaceA" , "callable"))
+        root.add_child_config(remote_config)
+        root.add_edge_config(EdgeConfig("b" , "remote.d" , "tests.resources.node_b.BEvent" , "event"))
+
+        self.scenario = ScenarioBuilder(root).build()
+        remote = self.scenario.get_nodeset("remote")
+
+        self.scenario.notify_handlers("b" , "B.BEvent" , BEvent("msg"))
+        self.scenario.sync_remote()
+        assert remote.get("d" , "event_value") == BEvent("msg")
+        assert remote.call("d" , "registered_interfaces.__contains__" , "A.InterfaceA")
+
+    def test_callable_edge_across_processes(self):
+        root = nodeset_config("root")
+        root.add_child_config(
+            AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" , "a" , ""))
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(b_config())
+        root.add_child_config(remote_config)
+        root.add_edge_config(EdgeConfig("a" , "remote.b" , "tests.resources.node_a.InterfaceA" , "callable"))
+
+        builder = ScenarioBuilder(root)
+        self.scenario = builder.build_components()
+        with pytest.raises(Exception , match="crosses a process boundary"):
+            builder.build_edges()
+
+    def test_failed_build_stops_workers(self):
+        # root(missing , remote(b)) , the remote is started before the missing node fails to load
+        root = nodeset_config("root")
+        root.add_child_config(NodeConfig("missing" , "src.quantcerebro.node.NodeConfig" ,
+                                         "tests.resources.node_a.Missing" , "missing"))
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(b_config())
+        root.add_child_config(remote_config)
+
+        builder = ScenarioBuilder(root)
+        with pytest.raises(Exception):
+            builder.build()
+        remote = builder.scenario.get_nodeset("remote")
+        assert remote.process is None
+
+    def test_out_of_process_yaml(self , tmp_path):
+        sub_path = tmp_path / "sub.yml"
+        sub_path.write_text(SUB_SCENARIO_YAML)
+        root_path = tmp_path / "root.yml"
+        root_path.write_text(ROOT_SCENARIO_YAML.format(path=sub_path))
+
+        scenario_config = ConfigBuilder(str(root_path)).build()
+        assert scenario_config.get_nodeset_config("SetOne").out_of_process
+        assert not scenario_config.out_of_process
+
+        self.scenario = ScenarioBuilder(scenario_config).build()
+        assert self.scenario.remote_nodesets() == [ self.scenario.get_nodeset("SetOne") ]
+        assert self.scenario.get_nodeset("SetOne").get("A" , "model.attr") == "attrA"
+
+    def test_shm_transport(self):
+        pytest.importorskip("numpy")
+        FTick = load_class("tests.resources.node_f.FTick")
+
+        # root(b , f , remote(a , f2)) , b -> f2 and a -> f through rings
+        root = nodeset_config("root")
+        root.add_child_config(b_config())
+        root.add_child_config(f_config())
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(
+            AConfig("a" , "tests.resources.node_a.AConfig" , "tests.resources.node_a.A" , "a" , ""))
+        remote_config.add_child_config(
+            NodeConfig("f2" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_f.F" , "f2"))
+        root.add_child_config(remote_config)
+        root.add_edge_config(shm_edge("b" , "remote.f2"))
+        root.add_edge_config(shm_edge("remote.a" , "f"))
+
+        self.scenario = ScenarioBuilder(root).build()
+        remote = self.scenario.get_nodeset("remote")
+        assert set(remote.rings) == {"A.FTick" , "B.FTick"}
+
+        # more ticks than slots, the producer waits for the consumer
+        for seq in range(10):
+            self.scenario.notify_handlers("b" , "B.FTick" , FTick(seq , seq / 2 , numpy_levels(seq)))
+            remote.call("a" , "notify_handlers" , "a" , "A.FTick" , FTick(seq , seq / 2 , numpy_levels(seq)))
+            self.scenario.sync_remote()
+
+        expected = [ (seq , seq / 2 , [ float(seq) ] * 4) for seq in range(10) ]
+        assert remote.get("f2" , "model.received") == expected
+        assert self.scenario.get_child_node("f").model.received == expected
+        assert all(stats[ "dropped" ] == 0 for stats in remote.transport_stats().values())
+
+    def test_concurrent_sends(self):
+        pytest.importorskip("numpy")
+        FTick = load_class("tests.resources.node_f.FTick")
+
+        # root(b , remote(f2)) , b -> f2 over the pipe, emitted from several threads while requests are in flight
+        root = nodeset_config("root")
+        root.add_child_config(b_config())
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(
+            NodeConfig("f2" , "src.quantcerebro.node.NodeConfig" , "tests.resources.node_f.F" , "f2"))
+        root.add_child_config(remote_config)
+        root.add_edge_config(EdgeConfig("b" , "remote.f2" , "tests.resources.node_f.FTick" , "event"))
+
+        self.scenario = ScenarioBuilder(root).build()
+        remote = self.scenario.get_nodeset("remote")
+
+        names = [ ]
+
+        def emit(offset: int):
+            for seq in range(offset , offset + 50):
+                self.scenario.notify_handlers("b" , "B.FTick" , FTick(seq , 0.0 , numpy_levels(seq)))
+                if seq % 10 == 0:
+                    names.append(remote.get("f2" , "name"))
+
+        threads = [ threading.Thread(target=emit , args=(offset ,)) for offset in range(0 , 200 , 50) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.scenario.sync_remote()
+        assert names == [ "f2" ] * 20
+        assert sorted(seq for seq , _ , _ in remote.get("f2" , "model.received")) == list(range(200))
+
+    def test_shm_transport_needs_fixed_layout(self):
+        root = nodeset_config("root")
+        root.add_child_config(b_config())
+        remote_config = nodeset_config("remote" , out_of_process=True)
+        remote_config.add_child_config(d_config())
+        root.add_child_config(remote_config)
+        root.add_edge_config(
+            EdgeConfig("b" , "remote.d" , "tests.resources.node_b.BEvent" , "event" , transport="shm"))
+
+        builder = ScenarioBuilder(root)
+        self.scenario = builder.build_components()
+        with pytest.raises(Exception , match="fixed layout"):
+            builder.build_edges()
+
+
+def numpy_levels(seq: int):
+    import numpy
+    return numpy.full(4 , float(seq))
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+from pytest_mock import MockFixture
+
+from src.quantcerebro import builder
+from src.quantcerebro.builder import build_scenario , compile_scenario
+from src.quantcerebro.snapshot import load_snapshot
+
+SUB_SCENARIO_YAML = """
+name: scenario_a_b
+nodesetClass: tests.resources.nodeset_ab.SetOne
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: A
+    nodeClass: tests.resources.node_a.A
+  - name: B
+    nodeClass: tests.resources.node_b.B
+edges:
+  - pred: A
+    succ: B
+    edgeType: callable
+    edgeClass: tests.resources.node_a.InterfaceA
+componentConfigs:
+  - name: A
+    configClass: tests.resources.node_a.AConfig
+    attr: attrA
+  - name: B
+    configClass: tests.resources.node_b.BConfig
+    attr: attrB
+"""
+
+ROOT_SCENARIO_YAML = """
+name: base_node
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: SetOne
+    nodesetClass: tests.resources.nodeset_ab.SetOne
+  - name: D
+    nodeClass: tests.resources.node_d.D
+edges:
+  - pred: SetOne.B
+    succ: D
+    edgeType: event
+    edgeClass: tests.resources.node_b.BEvent
+componentConfigs:
+  - name: SetOne
+    nodesetPath: {path}
+  - name: D
+    configClass: tests.resources.node_d.DConfig
+    attr: attrD
+"""
+
+
+class TestSnapshot:
+
+    @pytest.fixture(autouse=True)
+    def setup(self , tmp_path):
+        self.sub_path = tmp_path / "scenario_a_b.yml"
+        self.sub_path.write_text(SUB_SCENARIO_YAML)
+        self.root_path = tmp_path / "scenario_ab_d.yml"
+        self.root_path.write_text(ROOT_SCENARIO_YAML.format(path=self.sub_path))
+        self.snapshot_path = str(tmp_path / "scenario.snapshot")
+
+    def test_compile_scenario(self):
+        snapshot = compile_scenario(str(self.root_path) , self.snapshot_path)
+
+        assert os.path.exists(self.snapshot_path)
+        assert [ (name , e.pred) for name , e in snapshot.edges ] == [ ("base_node" , "SetOne.B") , ("SetOne" , "A") ]
+        assert "tests.resources.node_d.D" in snapshot.class_paths
+        assert str(self.sub_path.resolve()) in snapshot.files
+        assert any(f.endswith(os.path.join("resources" , "node_a.py")) for f in snapshot.files) , \
+            "modules of referenced classes should be tracked"
+
+        loaded = load_snapshot(self.snapshot_path , str(self.root_path))
+        assert loaded.nodeset_config == snapshot.nodeset_config
+        assert loaded.is_fresh()
+
+    def test_build_scenario_from_snapshot(self , mocker: MockFixture):
+        spy = mocker.spy(builder , "compile_scenario")
+        build_scenario(str(self.root_path) , self.snapshot_path)
+        scenario = build_scenario(str(self.root_path) , self.snapshot_path)
+        assert spy.call_count == 1 , "second build should load the snapshot"
+
+        assert scenario.get_child_node("B").registered_interfaces[ "A.InterfaceA" ].interface_method() == \
+               "interface_return_value"
+        scenario.notify_handlers("B" , "B.BEvent" , "emitted event")
+        assert scenario.get_child_node("D").event_value == "emitted event"
+
+    def test_stale_snapshot(self , mocker: MockFixture):
+        compile_scenario(str(self.root_path) , self.snapshot_path)
+        assert load_snapshot(self.snapshot_path , str(self.root_path)) is not None
+        assert load_snapshot(self.snapshot_path , str(self.sub_path)) is None , "snapshot of another file"
+
+        self.sub_path.write_text(SUB_SCENARIO_YAML.replace("attrB" , "attrC"))
+        os.utime(self.sub_path , ns=(0 , 0))
+        assert load_snapshot(self.snapshot_path , str(self.root_path)) is None
+
+        spy = mocker.spy(builder , "compile_scenario")
+        scenario = build_scenario(str(self.root_path) , self.snapshot_path)
+        assert spy.call_count == 1
+        assert scenario.get_child_node("B").model.return_attr() == "attrC"
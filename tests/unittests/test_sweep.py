@@ -0,0 +1,84 @@
+import pytest
+
+from resources.node_d import emit_b_event
+from src.quantcerebro.sweep import SweepRunner , grid , nest_overrides
+
+SCENARIO_YAML = """
+name: root
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: A
+    nodeClass: tests.resources.node_a.A
+  - name: B
+    nodeClass: tests.resources.node_b.B
+  - name: D
+    nodeClass: tests.resources.node_d.D
+edges:
+  - pred: A
+    succ: B
+    edgeType: callable
+    edgeClass: tests.resources.node_a.InterfaceA
+  - pred: B
+    succ: D
+    edgeType: event
+    edgeClass: tests.resources.node_b.BEvent
+componentConfigs:
+  - name: A
+    configClass: tests.resources.node_a.AConfig
+    attr: attrA
+  - name: B
+    configClass: tests.resources.node_b.BConfig
+    attr: attrB
+  - name: D
+    configClass: tests.resources.node_d.DConfig
+    attr: attrD
+"""
+
+
+def test_grid():
+    assert grid({"B.attr": [ "x" , "y" ] , "D.attr": [ 1 , 2 ]}) == [
+        {"B.attr": "x" , "D.attr": 1} , {"B.attr": "x" , "D.attr": 2} ,
+        {"B.attr": "y" , "D.attr": 1} , {"B.attr": "y" , "D.attr": 2}]
+    assert nest_overrides({"B.attr": "x" , "SetOne.D.attr": 1}) == {"B": {"attr": "x"} , "SetOne.D": {"attr": 1}}
+    with pytest.raises(Exception , match="<component name>.<config field>"):
+        nest_overrides({"attr": 1})
+
+
+class TestSweepRunner:
+
+    @pytest.fixture(autouse=True)
+    def setup(self , tmp_path):
+        self.path = str(tmp_path / "scenario.yml")
+        with open(self.path , "w") as stream:
+            stream.write(SCENARIO_YAML)
+        self.variants = grid({"B.attr": [ "x" , "y" ] , "D.attr": [ "d1" , "d2" ]})
+
+    def check(self , result):
+        assert [ (row[ "variant" ] , row[ "received" ] , row[ "d_attr" ]) for row in result.rows ] == [
+            (0 , "x" , "d1") , (1 , "x" , "d2") , (2 , "y" , "d1") , (3 , "y" , "d2")]
+        assert not result.failed
+        assert all(row[ "build_ms" ] >= 0 and row[ "run_ms" ] >= 0 for row in result.rows)
+        assert set(result.startup_ms) == set(result.column("worker"))
+
+    def test_in_process(self):
+        result = SweepRunner(self.path , emit_b_event , workers=0).run(self.variants)
+        self.check(result)
+        assert result.columns[ :3 ] == [ "variant" , "B.attr" , "D.attr" ]
+        assert result.table().splitlines()[ 1 ].split()[ :3 ] == [ "0" , "x" , "d1" ]
+
+    def test_process_pool(self):
+        result = SweepRunner(self.path , emit_b_event , workers=2).run(self.variants)
+        self.check(result)
+        assert 1 <= len(result.startup_ms) <= 2
+
+    def test_failing_variant(self):
+        result = SweepRunner(self.path , emit_b_event , workers=0).run(
+            [ {"D.attr": "fail"} , {"D.attr": "ok"} , {"E.attr": "x"} ])
+        assert [ row[ "error" ] for row in result.failed ] == [
+            "ValueError: failing variant" , "KeyError: \"child component: 'E' not found\""]
+        assert result.rows[ 1 ][ "d_attr" ] == "ok"
+
+    def test_failing_base_scenario(self , tmp_path):
+        result = SweepRunner(str(tmp_path / "missing.yml") , emit_b_event , workers=0).run([ {"D.attr": "ok"} ])
+        assert result.rows[ 0 ][ "error" ].startswith("base scenario: ")
@@ -0,0 +1,164 @@
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from src.quantcerebro.builder import ConfigBuilder
+from src.quantcerebro.conflation import Conflator
+from src.quantcerebro.event import GraphEventEmitter
+from src.quantcerebro.inbox import NodeInbox
+from src.quantcerebro.remote import drain_ring
+from src.quantcerebro.transport import RingBuffer , SlotLayout , is_fixed_layout , DROP_NEWEST , SPILL , BLOCK
+
+numpy = pytest.importorskip("numpy")
+
+from resources.node_f import FTick
+
+EDGE_YAML = """
+name: root
+nodesetClass: src.quantcerebro.nodeset.NodeSet
+nodesetConfigClass: src.quantcerebro.nodeset.NodeSetConfig
+components:
+  - name: F
+    nodeClass: tests.resources.node_f.F
+edges:
+  - pred: F
+    succ: F
+    edgeType: event
+    edgeClass: tests.resources.node_f.FTick
+    transport: shm
+    ringSize: 16
+    overflow: spill
+componentConfigs:
+  - name: F
+    configClass: src.quantcerebro.node.NodeConfig
+"""
+
+
+@dataclass
+class Quote:
+    seq: int
+    bid: float
+    ask: float
+    live: bool
+
+
+@dataclass
+class Named:
+    seq: int
+    name: str
+
+
+def tick(seq: int) -> FTick:
+    return FTick(seq , seq / 2 , numpy.arange(4.0) + seq)
+
+
+class TestSlotLayout:
+
+    def test_fixed_layout(self):
+        assert is_fixed_layout(Quote)
+        assert is_fixed_layout(FTick)
+        assert not is_fixed_layout(Named)
+        with pytest.raises(TypeError):
+            SlotLayout(Named)
+
+    def test_round_trip(self):
+        layout = SlotLayout(FTick)
+        # seq and price, then 4 float64 levels
+        assert layout.size == 48
+        buffer = memoryview(bytearray(layout.size * 2))
+        layout.write(buffer , layout.size , tick(3))
+
+        record = layout.read(buffer , layout.size)
+        assert (record.seq , record.price , record.levels.tolist()) == (3 , 1.5 , [ 3.0 , 4.0 , 5.0 , 6.0 ])
+        # array fields are views of the buffer
+        buffer[ layout.size + 16: layout.size + 24 ] = numpy.float64(42.0).tobytes()
+        assert record.levels[ 0 ] == 42.0
+
+        scalars = SlotLayout(Quote)
+        scalars.write(buffer , 0 , Quote(1 , 99.5 , 100.5 , True))
+        assert scalars.read(buffer , 0) == Quote(1 , 99.5 , 100.5 , True)
+
+
+class TestRingBuffer:
+
+    @pytest.fixture(autouse=True)
+    def rings(self):
+        self.created = [ ]
+        yield
+        for ring in self.created:
+            ring.unlink()
+
+    def ring(self , *args , **kwargs) -> RingBuffer:
+        ring = RingBuffer(*args , **kwargs)
+        self.created.append(ring)
+        return ring
+
+    def test_put_and_drain_across_handles(self):
+        ring = self.ring(FTick , 4)
+        consumer = pickle.loads(pickle.dumps(ring))
+        assert not consumer.owner and consumer.name == ring.name
+
+        for seq in range(6):
+            assert ring.put(tick(seq))
+            if seq % 2:
+                received = [ ]
+                assert consumer.drain(lambda t: received.append((t.seq , t.levels.tolist()))) == 2
+                assert received == [ (seq - 1 , (numpy.arange(4.0) + seq - 1).tolist()) ,
+                                     (seq , (numpy.arange(4.0) + seq).tolist()) ]
+        assert len(ring) == 0
+        assert ring.stats()[ "written" ] == 6
+        consumer.close()
+
+    def test_drain_limit(self):
+        ring = self.ring(Quote , 8)
+        for seq in range(5):
+            ring.put(Quote(seq , 1.0 , 2.0 , True))
+        received = [ ]
+        assert ring.drain(lambda q: received.append(q.seq) , limit=3) == 3
+        assert ring.drain(lambda q: received.append(q.seq)) == 2
+        assert received == [ 0 , 1 , 2 , 3 , 4 ]
+
+    @pytest.mark.parametrize("overflow , counter" , [ (DROP_NEWEST , "dropped") , (SPILL , "spilled") ,
+                                                      (BLOCK , "dropped") ])
+    def test_overflow(self , overflow , counter):
+        ring = self.ring(Quote , 2 , overflow , block_timeout=0.01)
+        assert ring.put(Quote(0 , 1.0 , 2.0 , True))
+        assert ring.put(Quote(1 , 1.0 , 2.0 , True))
+        assert not ring.put(Quote(2 , 1.0 , 2.0 , True))
+        assert ring.stats()[ counter ] == 1
+
+        received = [ ]
+        ring.drain(lambda q: received.append(q.seq))
+        assert received == [ 0 , 1 ]
+        assert ring.put(Quote(3 , 1.0 , 2.0 , True))
+
+    @pytest.mark.parametrize("deferred" , [ "inbox" , "conflator" ])
+    def test_deferred_listener_gets_copies(self , deferred):
+        # the handler runs after the listener returned, once the slot has been written again
+        received = [ ]
+        handler = lambda t: received.append((t.seq , t.levels.tolist()))
+        inbox = NodeInbox("F")
+        listener = inbox.route(handler) if deferred == "inbox" else Conflator(handler).route(inbox)
+        emitter = GraphEventEmitter()
+        emitter.create_event("F.FTick")
+        emitter.add_listener("F.FTick" , listener)
+
+        ring = self.ring(FTick , 1)
+        ring.put(tick(0))
+        assert drain_ring(ring , emitter , "F.FTick") == 1
+        ring.put(tick(9))
+        while inbox.depth:
+            queued_handler , args = inbox._items.popleft()
+            queued_handler(*args)
+        assert received == [ (0 , [ 0.0 , 1.0 , 2.0 , 3.0 ]) ]
+
+    def test_unknown_overflow(self):
+        with pytest.raises(ValueError):
+            RingBuffer(Quote , 2 , "drop-oldest")
+
+    def test_edge_keys(self , tmp_path):
+        path = tmp_path / "scenario.yml"
+        path.write_text(EDGE_YAML)
+        edge = ConfigBuilder(str(path)).build().edges[ 0 ]
+        assert (edge.transport , edge.ring_size , edge.overflow) == ("shm" , 16 , "spill")
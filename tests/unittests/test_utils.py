@@ -2,7 +2,11 @@ import pytest
 from pytest_mock import MockFixture
 from yaml.error import YAMLError
 
-from src.quantcerebro.utils import Singleton, load_class, load_yaml
+import os
+import sys
+
+from src.quantcerebro.utils import Singleton, load_class, load_yaml, YamlCache, import_time_report, \
+    clear_class_cache
 
 
 class Object(metaclass=Singleton):
@@ -37,6 +41,46 @@ def test_load_yaml(mocker_open_from_valid_path):
     assert out == dict() , "Value should be mocked"
 
 
+def test_yaml_cache(tmp_path):
+    path = tmp_path / "a.yml"
+    path.write_text("name: a\ncomponents:\n  - name: b\n")
+    cache = YamlCache(maxsize=2)
+
+    first = cache.load(str(path))
+    first["components"].append({"name": "c"})
+    second = cache.load(str(path))
+    assert second == {"name": "a", "components": [{"name": "b"}]}, "cached document should not be mutated by callers"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # a changed file is parsed again
+    path.write_text("name: changed\n")
+    os.utime(path, ns=(0, 0))
+    assert cache.load(str(path)) == {"name": "changed"}
+    assert cache.misses == 2
+
+    cache.invalidate(str(path))
+    assert len(cache) == 0
+
+
+def test_yaml_cache_bounded(tmp_path):
+    cache = YamlCache(maxsize=2)
+    for i in range(3):
+        path = tmp_path / f"{i}.yml"
+        path.write_text(f"name: {i}\n")
+        cache.load(str(path))
+    assert len(cache) == 2
+    cache.load(str(tmp_path / "0.yml"))
+    assert cache.misses == 4, "least recently used entry should have been evicted"
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_yaml_cache_invalid_path():
+    with pytest.raises(FileNotFoundError):
+        YamlCache().load("invalid_path")
+
+
 def test_load_class(mocker:MockFixture):
     import sys
     mocker.patch("src.quantcerebro.utils.import_module", return_value=sys.modules[__name__])
@@ -56,3 +100,15 @@ def test_load_class_invalid_path():
         clazz = load_class(f"{invalid_module_path}.Singleton")
 
 
+
+
+def test_load_class_cached(mocker: MockFixture):
+    clear_class_cache()
+    spy = mocker.spy(sys.modules["src.quantcerebro.utils"], "import_module")
+    assert load_class("src.quantcerebro.utils.Singleton") is Singleton
+    assert load_class("src.quantcerebro.utils.Singleton") is Singleton
+    assert spy.call_count == 1, "resolved class path should be served from the cache"
+
+    load_class("src.quantcerebro.utils.YamlCache")
+    assert spy.call_count == 2
+    assert [ module for module, _ in import_time_report() ] == [ "src.quantcerebro.utils" ]